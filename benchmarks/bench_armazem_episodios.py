@@ -0,0 +1,90 @@
+# benchmarks/bench_armazem_episodios.py
+"""
+Compara uma análise sobre todos os episódios ("nota média dos episódios assistidos de um
+gênero") percorrendo objetos Episodio e usando o armazém colunar (src/colunar.py).
+
+Uso:
+    python -m benchmarks.bench_armazem_episodios --series 2000 --temporadas 5 --episodios 100
+"""
+import argparse
+import random
+import time
+
+from src import colunar
+from src.colunar import ArmazemEpisodios
+from src.modelos import Serie, Temporada, Episodio
+
+GENEROS = ("Sci-Fi", "Drama", "Comédia", "Suspense", "Documentário")
+STATUS = ("NÃO ASSISTIDO", "ASSISTINDO", "ASSISTIDO")
+
+
+def gerar_series(qtd_series, temporadas_por_serie, episodios_por_temporada):
+    """Gera objetos Serie sintéticos (com ids) e o armazém colunar equivalente."""
+    aleatorio = random.Random(42)
+    series = []
+    armazem = ArmazemEpisodios()
+    for i in range(qtd_series):
+        serie = Serie(f"Serie {i:06d}", GENEROS[i % len(GENEROS)], 2000 + i % 25, "14", [])
+        serie.id = i + 1
+        for num_temp in range(1, temporadas_por_serie + 1):
+            temporada = Temporada(num_temp)
+            for num_ep in range(1, episodios_por_temporada + 1):
+                nota = round(aleatorio.uniform(0, 10), 1) if aleatorio.random() < 0.7 else None
+                temporada.adicionar_episodio(Episodio(num_ep, f"Ep {num_ep}", 45, None, nota,
+                                                      aleatorio.choice(STATUS)))
+            serie.adicionar_temporada(temporada)
+        series.append(serie)
+        armazem.adicionar_serie(serie)
+    return series, armazem
+
+
+def media_por_objetos(series, genero):
+    """Caminho antigo: percorre Serie -> Temporada -> Episodio."""
+    soma, quantidade = 0.0, 0
+    for serie in series:
+        if serie._genero != genero:
+            continue
+        for temporada in serie.temporadas.values():
+            for episodio in temporada._episodios.values():
+                if episodio.status == "ASSISTIDO" and episodio.nota is not None:
+                    soma += episodio.nota
+                    quantidade += 1
+    return round(soma / quantidade, 2) if quantidade else None
+
+
+def media_colunar(armazem, genero):
+    """Caminho novo: máscara e redução sobre as colunas."""
+    return armazem.todos().filtrar(genero=genero, status="ASSISTIDO").nota_media()
+
+
+def cronometrar(funcao, *args, repeticoes=5):
+    """Retorna o resultado e o melhor tempo (em ms) entre as repetições."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        decorrido = (time.perf_counter() - inicio) * 1000
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return resultado, melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=2000)
+    parser.add_argument("--temporadas", type=int, default=5)
+    parser.add_argument("--episodios", type=int, default=100)
+    args = parser.parse_args()
+
+    series, armazem = gerar_series(args.series, args.temporadas, args.episodios)
+    print(f"Episódios: {len(armazem)} | NumPy: {'sim' if colunar.np is not None else 'não (array.array)'}")
+
+    media_obj, tempo_obj = cronometrar(media_por_objetos, series, "Sci-Fi")
+    media_col, tempo_col = cronometrar(media_colunar, armazem, "Sci-Fi")
+    assert media_obj == media_col, (media_obj, media_col)
+
+    print(f"{'objetos Episodio':20s} {tempo_obj:10.1f} ms (média {media_obj})")
+    print(f"{'armazém colunar':20s} {tempo_col:10.1f} ms (média {media_col})")
+
+
+if __name__ == "__main__":
+    main()
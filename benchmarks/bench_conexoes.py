@@ -0,0 +1,139 @@
+# benchmarks/bench_conexoes.py
+"""
+Compara o acesso antigo ao banco (uma conexão nova por chamada, journal padrão DELETE)
+com o GerenciadorConexoes (conexão reutilizada por thread, WAL e PRAGMAs ajustados):
+- custo de uma consulta curta isolada (abrir/fechar a conexão a cada vez x reutilizá-la);
+- leituras de várias threads enquanto outra thread grava em transações seguidas.
+
+Uso:
+    python -m benchmarks.bench_conexoes --filmes 20000 --leitores 4 --segundos 3
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from src.conexao import GerenciadorConexoes
+
+CONSULTA = "SELECT id, titulo FROM filmes WHERE titulo >= ? ORDER BY titulo LIMIT 20"
+
+
+def criar_banco(caminho, quantidade, journal):
+    """Cria um banco sintético de filmes com o modo de journal informado."""
+    conn = sqlite3.connect(caminho)
+    conn.execute(f"PRAGMA journal_mode = {journal}")
+    conn.execute("CREATE TABLE filmes (id INTEGER PRIMARY KEY, titulo TEXT, nota REAL)")
+    conn.execute("CREATE INDEX idx_filmes_titulo ON filmes(titulo)")
+    conn.executemany("INSERT INTO filmes (titulo, nota) VALUES (?, ?)",
+                     ((f"Filme {i:07d}", i % 10) for i in range(quantidade)))
+    conn.commit()
+    conn.close()
+
+
+class ConexaoPorChamada:
+    """Caminho antigo: sqlite3.connect a cada operação, fechando a conexão em seguida."""
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def ler(self, prefixo):
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            return conn.execute(CONSULTA, (prefixo,)).fetchall()
+        finally:
+            conn.close()
+
+    def gravar(self, inicio, fim):
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conn.execute("UPDATE filmes SET nota = nota + 1 WHERE id BETWEEN ? AND ?", (inicio, fim))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class ConexaoReutilizada:
+    """Caminho novo: GerenciadorConexoes."""
+    def __init__(self, caminho):
+        self.gerenciador = GerenciadorConexoes(caminho, espera_segundos=30)
+
+    def ler(self, prefixo):
+        return self.gerenciador.conexao().execute(CONSULTA, (prefixo,)).fetchall()
+
+    def gravar(self, inicio, fim):
+        with self.gerenciador.transacao() as conn:
+            conn.execute("UPDATE filmes SET nota = nota + 1 WHERE id BETWEEN ? AND ?", (inicio, fim))
+
+
+def consulta_isolada(acesso, repeticoes):
+    """Tempo médio (em µs) de uma consulta curta, sem concorrência."""
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        acesso.ler(f"Filme {i:07d}")
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def leituras_durante_escritas(acesso, quantidade, leitores, segundos):
+    """Executa leitores e um escritor em paralelo; retorna (leituras/s, p95 da leitura em ms, escritas)."""
+    parar = threading.Event()
+    latencias = []
+    escritas = [0]
+    trava = threading.Lock()
+
+    def ler():
+        minhas = []
+        i = 0
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            acesso.ler(f"Filme {(i * 7919) % quantidade:07d}")
+            minhas.append(time.perf_counter() - inicio)
+            i += 1
+        with trava:
+            latencias.extend(minhas)
+
+    def gravar():
+        i = 0
+        while not parar.is_set():
+            inicio = (i * 1000) % quantidade
+            acesso.gravar(inicio, inicio + 999)
+            escritas[0] += 1
+            i += 1
+
+    threads = [threading.Thread(target=ler) for _ in range(leitores)] + [threading.Thread(target=gravar)]
+    for thread in threads:
+        thread.start()
+    time.sleep(segundos)
+    parar.set()
+    for thread in threads:
+        thread.join()
+
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0.0
+    return len(latencias) / segundos, p95, escritas[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filmes", type=int, default=20000)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    for nome, journal, classe in (("conexão por chamada (DELETE)", "DELETE", ConexaoPorChamada),
+                                  ("GerenciadorConexoes (WAL)", "WAL", ConexaoReutilizada)):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "bench.db")
+            criar_banco(caminho, args.filmes, journal)
+            acesso = classe(caminho)
+            isolada = consulta_isolada(acesso, args.repeticoes)
+            por_segundo, p95, escritas = leituras_durante_escritas(acesso, args.filmes, args.leitores, args.segundos)
+            if isinstance(acesso, ConexaoReutilizada):
+                acesso.gerenciador.fechar_todas()
+        print(f"{nome:30s} consulta isolada {isolada:8.1f} µs | com escritor: {por_segundo:9.0f} leituras/s, "
+              f"p95 {p95:7.2f} ms, {escritas} transações de escrita")
+
+
+if __name__ == "__main__":
+    main()
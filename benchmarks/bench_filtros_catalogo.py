@@ -0,0 +1,73 @@
+# benchmarks/bench_filtros_catalogo.py
+"""
+Compara consultas filtradas ("o que estou assistindo", "Sci-Fi não assistido de 2020")
+percorrendo o dicionário de mídias inteiro e usando os índices secundários do Catalogo.
+
+Uso:
+    python -m benchmarks.bench_filtros_catalogo --midias 100000
+"""
+import argparse
+import random
+import time
+
+from src.catalogo import Catalogo
+from src.modelos import Filme
+
+GENEROS = ("Sci-Fi", "Drama", "Comédia", "Suspense", "Documentário", "Terror", "Animação", "Romance")
+STATUS = ("NÃO ASSISTIDO", "ASSISTIDO")
+
+
+def gerar_filmes(quantidade):
+    """Gera filmes sintéticos; poucos ficam ASSISTINDO, como num catálogo real."""
+    aleatorio = random.Random(42)
+    filmes = []
+    for i in range(quantidade):
+        status = "ASSISTINDO" if aleatorio.random() < 0.001 else aleatorio.choice(STATUS)
+        nota = round(aleatorio.uniform(0, 10), 1) if status == "ASSISTIDO" else None
+        filmes.append(Filme(f"Filme {i:07d}", aleatorio.choice(GENEROS), 1980 + i % 45, "14",
+                            [], 100, status, nota))
+    return filmes
+
+
+def filtrar_varrendo(por_titulo, status=None, genero=None, ano=None):
+    """Caminho antigo: percorre todas as mídias do dicionário global."""
+    return sorted((m for m in por_titulo.values()
+                   if (status is None or m.status == status)
+                   and (genero is None or m._genero == genero)
+                   and (ano is None or m.ano == ano)), key=lambda m: m.titulo.casefold())
+
+
+def cronometrar(funcao, *args, repeticoes=5, **kwargs):
+    """Retorna o resultado e o melhor tempo (em ms) entre as repetições."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        decorrido = (time.perf_counter() - inicio) * 1000
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return resultado, melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--midias", type=int, default=100000)
+    args = parser.parse_args()
+
+    filmes = gerar_filmes(args.midias)
+    por_titulo = {filme.titulo: filme for filme in filmes}
+    catalogo = Catalogo(filmes)
+
+    consultas = {
+        "assistindo": {"status": "ASSISTINDO"},
+        "Sci-Fi não assistido 2020": {"status": "NÃO ASSISTIDO", "genero": "Sci-Fi", "ano": 2020},
+    }
+    for nome, filtros in consultas.items():
+        varredura, tempo_varredura = cronometrar(filtrar_varrendo, por_titulo, **filtros)
+        indexado, tempo_indice = cronometrar(catalogo.filtrar, **filtros)
+        assert varredura == indexado
+        print(f"{nome:28s} varredura {tempo_varredura:8.2f} ms | índices {tempo_indice:8.2f} ms "
+              f"({len(indexado)} resultados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_inicializacao.py
+"""
+Cold start do CLI: tempo de inicializar_sistema() (imports, verificação do esquema, consultas de
+carga, construção dos objetos, listas e índices) num processo Python novo, para bancos sintéticos
+com 10 mil, 100 mil e 1 milhão de episódios, comparado com a meta de cada tamanho.
+
+Cada banco é medido primeiro sem snapshot do catálogo (carga pelo SQLite, que grava o snapshot) e
+depois com o snapshot em dia (src/snapshot.py); a meta vale para a carga pelo SQLite.
+
+Cada série tem 10 temporadas de 10 episódios e há tantos filmes quanto séries; o usuário assistiu
+metade dos filmes (com histórico) e parte dos episódios de uma em cada três séries. Os episódios
+não são lidos na inicialização (carga sob demanda): eles pesam pelo número de séries e pelo estado.
+
+Uso:
+    python -m benchmarks.bench_inicializacao
+    python -m benchmarks.bench_inicializacao --episodios 1000000 --etapas --pasta /tmp/bancos
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src import dados
+from src.snapshot import caminho_snapshot
+
+#Meta de cold start (segundos, processo inteiro) por quantidade de episódios no banco
+METAS = {10_000: 0.1, 100_000: 0.2, 1_000_000: 0.75}
+
+TEMPORADAS_POR_SERIE = 10
+EPISODIOS_POR_TEMPORADA = 10
+GENEROS = ("Drama", "Sci-Fi", "Comédia", "Terror", "Documentário", "Animação")
+
+#Executado no processo novo: mede do primeiro import até o catálogo pronto
+CODIGO_MEDICAO = """
+import time
+inicio = time.perf_counter()
+import contextlib, io, json
+import src.cli as cli
+from src.perfil import PERFIL
+with contextlib.redirect_stdout(io.StringIO()):
+    cli.inicializar_sistema()
+print(json.dumps({"total": time.perf_counter() - inicio, "etapas": PERFIL.etapas(),
+                  "midias": len(cli.CATALOGO_GLOBAL), "historico": len(cli.HISTORICO_GLOBAL)}))
+"""
+
+
+def criar_banco(caminho, episodios):
+    """Cria, com SQL direto, um banco com `episodios` episódios (e as séries e filmes correspondentes)."""
+    por_serie = TEMPORADAS_POR_SERIE * EPISODIOS_POR_TEMPORADA
+    qtd_series = max(1, episodios // por_serie)
+
+    dados.DB_NAME = caminho
+    with contextlib.redirect_stdout(io.StringIO()):
+        dados.entrar_usuario("Davi")
+    with dados.transacao() as conn:
+        conn.executemany(
+            "INSERT INTO midias (titulo, tipo, genero, ano, classificacao, duracao) VALUES (?, 'FILME', ?, ?, '12', ?)",
+            ((f"Filme {i:07d}", GENEROS[i % len(GENEROS)], 1970 + i % 55, 80 + i % 70) for i in range(qtd_series)))
+        conn.executemany(
+            "INSERT INTO midias (titulo, tipo, genero, ano, classificacao) VALUES (?, 'SERIE', ?, ?, '14')",
+            ((f"Série {i:07d}", GENEROS[i % len(GENEROS)], 1990 + i % 35) for i in range(qtd_series)))
+        conn.executemany(
+            "INSERT INTO temporadas (serie_id, numero) SELECT id, ? FROM midias WHERE tipo = 'SERIE'",
+            ((numero,) for numero in range(1, TEMPORADAS_POR_SERIE + 1)))
+        conn.executemany(
+            "INSERT INTO episodios (temporada_id, numero, titulo, duracao) SELECT id, ?, ?, 45 FROM temporadas",
+            ((numero, f"Episódio {numero}") for numero in range(1, EPISODIOS_POR_TEMPORADA + 1)))
+
+        # Estado do usuário: metade dos filmes assistidos (com nota e histórico) e,
+        # em uma de cada três séries, as três primeiras temporadas assistidas
+        conn.execute("""
+            UPDATE estado_midias SET status = 'ASSISTIDO', nota = 5 + midia_id % 5
+            WHERE usuario_id = 1 AND midia_id IN (SELECT id FROM midias WHERE tipo = 'FILME' AND id % 2 = 0)
+        """)
+        conn.execute("""
+            INSERT INTO historico (usuario_id, midia_id, data_conclusao, duracao)
+            SELECT 1, m.id, datetime('2020-01-01', '+' || (m.id * 37 % 2000) || ' days',
+                                     '+' || (m.id % 86400) || ' seconds'), m.duracao
+            FROM midias m WHERE m.tipo = 'FILME' AND m.id % 2 = 0
+        """)
+        conn.execute("""
+            INSERT INTO estado_episodios (usuario_id, episodio_id, status)
+            SELECT 1, e.id, 'ASSISTIDO' FROM episodios e JOIN temporadas t ON t.id = e.temporada_id
+            WHERE t.serie_id % 3 = 0 AND t.numero <= 3
+        """)
+        conn.execute("""
+            UPDATE estado_midias SET status = 'ASSISTINDO'
+            WHERE usuario_id = 1 AND ep_assistidos > 0
+        """)
+    dados.fechar_conexoes()
+
+
+def medir_inicializacao(caminho):
+    """Roda inicializar_sistema() num processo novo; retorna o dicionário medido por CODIGO_MEDICAO."""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ambiente = dict(os.environ, CATALOGO_DB=caminho, CATALOGO_PERFIL="1")
+    saida = subprocess.run([sys.executable, "-c", CODIGO_MEDICAO], cwd=raiz, env=ambiente,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodios", type=int, action="append",
+                        help="Tamanho do banco (pode repetir; padrão: 10 mil, 100 mil e 1 milhão)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Medições com snapshot por banco (vale a menor)")
+    parser.add_argument("--etapas", action="store_true", help="Mostra o tempo de cada etapa")
+    parser.add_argument("--pasta", help="Pasta para os bancos gerados (reaproveitados se já existirem)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta = args.pasta or temporaria
+        os.makedirs(pasta, exist_ok=True)
+        for episodios in args.episodios or sorted(METAS):
+            caminho = os.path.join(pasta, f"inicializacao_{episodios}.db")
+            if not os.path.exists(caminho):
+                inicio = time.perf_counter()
+                criar_banco(caminho, episodios)
+                print(f"Banco com {episodios} episódios gerado em {time.perf_counter() - inicio:.1f}s")
+
+            snapshot = caminho_snapshot(caminho, 1)
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+            sem_snapshot = medir_inicializacao(caminho)
+            com_snapshot = min((medir_inicializacao(caminho) for _ in range(args.repeticoes)),
+                               key=lambda medicao: medicao["total"])
+            meta = METAS.get(episodios)
+            situacao = "" if meta is None else (f" | meta {meta:.2f}s " + ("✅" if sem_snapshot["total"] <= meta else "❌"))
+            print(f"{episodios:>9} episódios ({sem_snapshot['midias']} mídias, {sem_snapshot['historico']} no histórico): "
+                  f"{sem_snapshot['total']:.3f}s pelo SQLite, {com_snapshot['total']:.3f}s com snapshot{situacao}")
+            if args.etapas:
+                for titulo, medicao in (("pelo SQLite", sem_snapshot), ("com snapshot", com_snapshot)):
+                    print(f"  {titulo}:")
+                    for nome, segundos in medicao["etapas"].items():
+                        print(f"    {nome:<36s} {segundos * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_memoria_episodios.py
+"""
+Mede a memória por Episodio com a representação compacta (__slots__ e status compartilhados)
+e com a representação anterior (atributos em __dict__ e uma cópia do status por episódio).
+
+A versão "antes" é reconstruída a partir da própria classe Episodio: mesmos métodos e
+propriedades, mas sem __slots__ e com o setter de status original.
+
+Uso:
+    python -m benchmarks.bench_memoria_episodios --episodios 100000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from src.modelos import Episodio, STATUS_VALIDOS
+
+
+def _status_sem_compartilhar(self, novo_status):
+    """Setter de status como era antes: normaliza e guarda uma nova string por episódio."""
+    status_normalizado = novo_status.strip().upper()
+    if status_normalizado not in STATUS_VALIDOS:
+        raise ValueError("Status inválido para episódio.")
+    self._status = status_normalizado
+
+
+def criar_classe_com_dict():
+    """Cria uma cópia de Episodio com __dict__ por instância (a representação anterior)."""
+    atributos = {nome: valor for nome, valor in vars(Episodio).items()
+                 if nome not in ("__slots__", "__dict__", "__weakref__") and nome not in Episodio.__slots__}
+    atributos["status"] = Episodio.status.setter(_status_sem_compartilhar)
+    return type("EpisodioComDict", (), atributos)
+
+
+def medir(classe, titulos):
+    """Cria os episódios e retorna os bytes alocados (pico e retidos) por episódio."""
+    gc.collect()
+    tracemalloc.start()
+    episodios = [classe(i + 1, titulo, 45, None, None, "não assistido") for i, titulo in enumerate(titulos)]
+    retidos, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(episodios) == len(titulos)
+    return retidos / len(titulos), pico / len(titulos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodios", type=int, default=100_000)
+    args = parser.parse_args()
+
+    #Os títulos são criados antes da medição: o custo medido é o do objeto Episodio
+    titulos = [f"Episódio {i}" for i in range(args.episodios)]
+    print(f"Episódios: {args.episodios}")
+
+    resultados = {}
+    for nome, classe in (("antes (__dict__)", criar_classe_com_dict()), ("depois (__slots__)", Episodio)):
+        retidos, pico = medir(classe, titulos)
+        resultados[nome] = retidos
+        print(f"{nome:20s} {retidos:8.1f} bytes/episódio (pico {pico:8.1f})")
+
+    antes, depois = resultados.values()
+    print(f"Redução: {100 * (1 - depois / antes):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
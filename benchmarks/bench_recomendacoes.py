@@ -0,0 +1,60 @@
+# benchmarks/bench_recomendacoes.py
+"""
+Compara o "top 10 mais bem avaliados" ordenando o catálogo inteiro a cada consulta e lendo o
+topo do índice ordenado por nota do Catalogo, com notas mudando entre as consultas.
+
+Uso:
+    python -m benchmarks.bench_recomendacoes --midias 100000 --consultas 200
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_filtros_catalogo import gerar_filmes
+from src.catalogo import Catalogo
+
+NOTA_MINIMA = 8.0
+
+
+def top_ordenando(filmes, limite):
+    """Caminho sem índice: filtra e ordena todas as mídias avaliadas."""
+    avaliadas = [(f.nota, f) for f in filmes if f.nota is not None and f.nota >= NOTA_MINIMA]
+    avaliadas.sort(key=lambda t: t[0], reverse=True)
+    return [nota for nota, _ in avaliadas[:limite]]
+
+
+def top_indice(catalogo, limite):
+    """Caminho novo: topo do índice ordenado (mantido a cada nova nota)."""
+    return [nota for nota, _ in catalogo.por_nota(nota_minima=NOTA_MINIMA, limite=limite)]
+
+
+def executar(consulta, alvo, filmes, consultas):
+    """Alterna uma nova avaliação e uma consulta; retorna o tempo total em ms."""
+    aleatorio = random.Random(7)
+    inicio = time.perf_counter()
+    for _ in range(consultas):
+        aleatorio.choice(filmes).nota = round(aleatorio.uniform(0, 10), 1)
+        consulta(alvo, 10)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--midias", type=int, default=100000)
+    parser.add_argument("--consultas", type=int, default=200)
+    args = parser.parse_args()
+
+    filmes = gerar_filmes(args.midias)
+    tempo_ordenando = executar(top_ordenando, filmes, filmes, args.consultas)
+
+    catalogo = Catalogo(filmes)
+    tempo_indice = executar(top_indice, catalogo, filmes, args.consultas)
+    assert top_ordenando(filmes, 10) == top_indice(catalogo, 10)
+
+    print(f"{args.consultas} avaliações + consultas top-10 sobre {args.midias} mídias")
+    print(f"{'ordenando o catálogo':24s} {tempo_ordenando:10.1f} ms")
+    print(f"{'índice por nota':24s} {tempo_indice:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
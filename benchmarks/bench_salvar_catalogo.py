@@ -0,0 +1,84 @@
+# benchmarks/bench_salvar_catalogo.py
+"""
+Compara o salvamento do catálogo título a título (salvar_midia em laço, como era feito
+em salvar_e_encerrar) com o salvamento em lote (salvar_catalogo_completo).
+
+Uso:
+    python -m benchmarks.bench_salvar_catalogo --filmes 2000 --series 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src import dados
+from src.modelos import Filme, Serie, Temporada, Episodio
+
+
+def gerar_catalogo(qtd_filmes, qtd_series, temporadas_por_serie, episodios_por_temporada):
+    """Gera objetos Filme/Serie sintéticos para o benchmark."""
+    midias = []
+    for i in range(qtd_filmes):
+        midias.append(Filme(f"Filme {i:06d}", "Drama", 2000 + i % 25, "12", [], 90 + i % 60,
+                            "NÃO ASSISTIDO", None))
+    for i in range(qtd_series):
+        serie = Serie(f"Serie {i:06d}", "Sci-Fi", 2000 + i % 25, "14", [])
+        for num_temp in range(1, temporadas_por_serie + 1):
+            temporada = Temporada(num_temp)
+            for num_ep in range(1, episodios_por_temporada + 1):
+                temporada.adicionar_episodio(Episodio(num_ep, f"Episódio {num_ep}", 45))
+            serie.adicionar_temporada(temporada)
+        midias.append(serie)
+    return midias
+
+
+def salvar_por_titulo(midias):
+    """Caminho antigo: uma conexão e um commit por título."""
+    for midia in midias:
+        dados.salvar_midia(midia)
+
+
+def salvar_em_lote(midias):
+    """Caminho novo: uma conexão e uma transação para todo o catálogo."""
+    dados.salvar_catalogo_completo(midias)
+
+
+def medir(funcao, midias):
+    """Executa a função em um banco novo (inserção) e de novo (atualização), retornando os tempos."""
+    with tempfile.TemporaryDirectory() as pasta:
+        dados.DB_NAME = os.path.join(pasta, "bench.db")
+        dados.criar_tabelas()
+
+        tempos = []
+        for _ in range(2):
+            inicio = time.perf_counter()
+            # Suprime as mensagens impressas por mídia para não medir o terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                funcao(midias)
+            tempos.append(time.perf_counter() - inicio)
+        dados.fechar_conexoes() #As conexões são reutilizadas: fecha antes de apagar a pasta
+        return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filmes", type=int, default=2000)
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--temporadas", type=int, default=3)
+    parser.add_argument("--episodios", type=int, default=10)
+    args = parser.parse_args()
+
+    midias = gerar_catalogo(args.filmes, args.series, args.temporadas, args.episodios)
+    total_eps = args.series * args.temporadas * args.episodios
+    print(f"Catálogo: {args.filmes} filmes, {args.series} séries, {total_eps} episódios")
+
+    for nome, funcao in (("salvar_midia (por título)", salvar_por_titulo),
+                         ("salvar_catalogo_completo (lote)", salvar_em_lote)):
+        insercao, atualizacao = medir(funcao, midias)
+        print(f"{nome:34s} inserção: {insercao:8.3f}s | atualização: {atualizacao:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/carga_servico.py
+"""
+Teste de carga do modo serviço (src/servico.py): abre várias conexões keep-alive e dispara
+requisições GET em sequência por cada uma durante alguns segundos, medindo requisições por
+segundo e as latências p50/p99.
+
+Uso (com o serviço já rodando em outro terminal: python -m src.servico):
+    python -m benchmarks.carga_servico --conexoes 50 --segundos 10
+Ou iniciando uma instância local só para o teste (usa o banco configurado, ver CATALOGO_DB):
+    python -m benchmarks.carga_servico --iniciar
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+#Mistura de consultas: filtros e detalhes em memória, relatórios, recomendações e busca textual no banco
+CAMINHOS = ("/midias?status=ASSISTINDO", "/midias?tipo=SERIE", "/midias/1", "/continuar",
+            "/relatorios/tempo?dias=30", "/recomendacoes", "/busca?q=a")
+
+
+async def _requisitar(leitor, escritor, host, caminho):
+    escritor.write(f"GET {caminho} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        if nome.lower() == "content-length":
+            tamanho = int(valor)
+    await leitor.readexactly(tamanho)
+    return status
+
+
+async def _cliente(host, porta, caminhos, prazo, latencias, erros, deslocamento):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    i = deslocamento
+    try:
+        while time.perf_counter() < prazo:
+            caminho = caminhos[i % len(caminhos)]
+            inicio = time.perf_counter()
+            status = await _requisitar(leitor, escritor, host, caminho)
+            latencias.append(time.perf_counter() - inicio)
+            if status >= 500:
+                erros.append((caminho, status))
+            i += 1
+    finally:
+        escritor.close()
+
+
+async def medir(host, porta, conexoes, segundos, caminhos=CAMINHOS):
+    """Retorna (requisições/s, p50 em ms, p99 em ms, total de requisições, erros 5xx)."""
+    latencias = []
+    erros = []
+    inicio = time.perf_counter()
+    prazo = inicio + segundos
+    await asyncio.gather(*(_cliente(host, porta, caminhos, prazo, latencias, erros, i) for i in range(conexoes)))
+    decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    percentil = lambda p: latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000 if latencias else 0.0
+    return len(latencias) / decorrido, percentil(0.50), percentil(0.99), len(latencias), erros
+
+
+async def _aguardar_porta(host, porta, tempo_limite=30):
+    prazo = time.perf_counter() + tempo_limite
+    while True:
+        try:
+            _, escritor = await asyncio.open_connection(host, porta)
+            escritor.close()
+            return
+        except OSError:
+            if time.perf_counter() > prazo:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--conexoes", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=10.0)
+    parser.add_argument("--iniciar", action="store_true", help="Inicia uma instância local do serviço para o teste")
+    parser.add_argument("--caminho", action="append", help="Caminho a consultar (pode repetir; padrão: mistura)")
+    args = parser.parse_args()
+
+    processo = None
+    if args.iniciar:
+        processo = subprocess.Popen([sys.executable, "-m", "src.servico", "--host", args.host,
+                                     "--porta", str(args.porta)], env=os.environ.copy())
+    try:
+        if processo:
+            asyncio.run(_aguardar_porta(args.host, args.porta))
+        por_segundo, p50, p99, total, erros = asyncio.run(
+            medir(args.host, args.porta, args.conexoes, args.segundos, tuple(args.caminho or CAMINHOS)))
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait()
+
+    print(f"{total} requisições em {args.segundos:.0f}s com {args.conexoes} conexões: "
+          f"{por_segundo:.0f} req/s | p50 {p50:.2f} ms | p99 {p99:.2f} ms | {len(erros)} erros 5xx")
+
+
+if __name__ == "__main__":
+    main()
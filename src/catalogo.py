@@ -0,0 +1,242 @@
+# src/catalogo.py
+
+from bisect import bisect_left, insort
+
+from src.indice import IndiceTitulos
+
+
+class Catalogo:
+    """
+    Contêiner das mídias carregadas em memória, com índices secundários:
+    - hash por status, gênero (sem diferenciar maiúsculas), ano e tipo: cada consulta filtrada
+      percorre apenas o menor conjunto envolvido, e não o catálogo inteiro;
+    - ordenado por nota (Filme.nota ou Serie.calcular_nota_serie), para rankings;
+    - de títulos (IndiceTitulos), para busca exata, por prefixo e aproximada.
+    As mídias avisam o catálogo (observador) quando mudam, e os índices são ajustados na hora.
+    Cada mídia é guardada pela identidade do objeto; um título pode ter várias mídias (um filme e
+    uma série, ou refilmagens de outro ano), e a identidade única é Midia.chave (título, tipo e ano).
+    Mantém a interface de dicionário por título usada antes pelo CLI (in, len, values, etc.).
+    """
+    INDICES = ("status", "genero", "ano", "tipo")
+
+    def __init__(self, midias=None):
+        self._por_titulo = {}    #Chave: título, Valor: {id(midia): objeto Midia}
+        self._por_chave = {}     #Chave: Midia.chave (título, tipo e ano), Valor: objeto Midia
+        self._indices = {nome: {} for nome in self.INDICES} #Índice -> valor -> {id(midia): midia}
+        self._valores_indexados = {} #id(midia) -> {índice: valor indexado}, para saber de onde remover
+        self._notas = []         #Tuplas (nota, id(midia)) em ordem crescente
+        self._nota_indexada = {} #id(midia) -> nota atualmente no índice ordenado (ou None)
+        self._por_id = {}        #id(midia) -> midia
+        self._titulo_indexado = {} #id(midia) -> título com que a mídia foi indexada
+        self._chave_indexada = {} #id(midia) -> Midia.chave com que a mídia foi indexada
+        self.titulos = IndiceTitulos()
+
+        for midia in midias or []:
+            self.adicionar(midia)
+
+    #Valores de uma mídia para cada índice hash
+    @staticmethod
+    def _valores(midia):
+        return {"status": midia.status, "genero": (midia._genero or "").casefold(),
+                "ano": midia.ano, "tipo": midia._tipo}
+
+    #Nota usada no índice ordenado (None: mídia ainda não avaliada)
+    @staticmethod
+    def nota_da_midia(midia):
+        if midia._tipo == "SERIE":
+            return midia.calcular_nota_serie()
+        return midia.nota
+
+    #Manutenção dos índices:
+
+    def adicionar(self, midia):
+        """Inclui a mídia no catálogo e em todos os índices (substitui a de mesmo título, tipo e ano)."""
+        self.remover(midia)
+        if midia.chave in self._por_chave:
+            self.remover(self._por_chave[midia.chave])
+
+        chave = id(midia)
+        self._por_titulo.setdefault(midia.titulo, {})[chave] = midia
+        self._por_chave[midia.chave] = midia
+        self._por_id[chave] = midia
+        self._titulo_indexado[chave] = midia.titulo
+        self._chave_indexada[chave] = midia.chave
+        self.titulos.adicionar(midia)
+
+        valores = self._valores(midia)
+        for nome, valor in valores.items():
+            self._indices[nome].setdefault(valor, {})[chave] = midia
+        self._valores_indexados[chave] = valores
+
+        self._nota_indexada[chave] = None
+        self._reindexar_nota(midia)
+        midia._observador = self
+
+    def remover(self, midia):
+        """Retira a mídia do catálogo e de todos os índices (retorna False se ela não estava)."""
+        chave = id(midia)
+        if chave not in self._por_id:
+            return False
+
+        valores = self._valores_indexados.pop(chave)
+        for nome, valor in valores.items():
+            self._retirar_do_balde(nome, valor, chave)
+
+        nota = self._nota_indexada.pop(chave)
+        if nota is not None:
+            del self._notas[bisect_left(self._notas, (nota, chave))]
+
+        titulo = self._titulo_indexado.pop(chave)
+        self._retirar_do_titulo(titulo, chave)
+        self.titulos.remover(midia, titulo)
+        self._retirar_da_chave(self._chave_indexada.pop(chave), midia)
+        del self._por_id[chave]
+        midia._observador = None
+        return True
+
+    def _retirar_do_balde(self, nome, valor, chave):
+        balde = self._indices[nome][valor]
+        del balde[chave]
+        if not balde:
+            del self._indices[nome][valor]
+
+    def _retirar_do_titulo(self, titulo, chave):
+        mesmo_titulo = self._por_titulo[titulo]
+        del mesmo_titulo[chave]
+        if not mesmo_titulo:
+            del self._por_titulo[titulo]
+
+    def _retirar_da_chave(self, chave_midia, midia):
+        if self._por_chave.get(chave_midia) is midia:
+            del self._por_chave[chave_midia]
+
+    def _reindexar_nota(self, midia):
+        chave = id(midia)
+        antiga = self._nota_indexada[chave]
+        nova = self.nota_da_midia(midia)
+        if nova == antiga:
+            return
+        if antiga is not None:
+            del self._notas[bisect_left(self._notas, (antiga, chave))]
+        if nova is not None:
+            insort(self._notas, (nova, chave))
+        self._nota_indexada[chave] = nova
+
+    def _midia_alterada(self, midia):
+        """
+        Chamado pela mídia (observador) quando título, status, ano, nota ou os agregados de
+        episódios mudam. Ajusta apenas os índices cujo valor mudou.
+        """
+        chave = id(midia)
+        if chave not in self._por_id:
+            return
+
+        indexados = self._valores_indexados[chave]
+        for nome, valor in self._valores(midia).items():
+            if indexados[nome] != valor:
+                self._retirar_do_balde(nome, indexados[nome], chave)
+                self._indices[nome].setdefault(valor, {})[chave] = midia
+                indexados[nome] = valor
+
+        titulo_antigo = self._titulo_indexado[chave]
+        if titulo_antigo != midia.titulo:
+            self._retirar_do_titulo(titulo_antigo, chave)
+            self.titulos.remover(midia, titulo_antigo)
+            self._por_titulo.setdefault(midia.titulo, {})[chave] = midia
+            self.titulos.adicionar(midia)
+            self._titulo_indexado[chave] = midia.titulo
+
+        #Título ou ano mudaram a identidade (título, tipo e ano)
+        if self._chave_indexada[chave] != midia.chave:
+            self._retirar_da_chave(self._chave_indexada[chave], midia)
+            self._por_chave[midia.chave] = midia
+            self._chave_indexada[chave] = midia.chave
+
+        self._reindexar_nota(midia)
+
+    #Consultas:
+
+    def filtrar(self, status=None, genero=None, ano=None, tipo=None):
+        """
+        Mídias que atendem a todos os filtros informados. Começa pelo menor conjunto entre os
+        índices envolvidos e verifica os demais por pertinência (O(1) cada): custo O(resultado).
+
+        Returns:
+            list: Objetos Midia, em ordem alfabética de título.
+        """
+        criterios = {"status": status.strip().upper() if status else None,
+                     "genero": genero.casefold() if genero else None, "ano": ano,
+                     "tipo": tipo.strip().upper() if tipo else None}
+        baldes = [self._indices[nome].get(valor, {}) for nome, valor in criterios.items() if valor is not None]
+        if not baldes:
+            return sorted(self._por_id.values(), key=lambda m: m.titulo.casefold())
+
+        baldes.sort(key=len)
+        menor, demais = baldes[0], baldes[1:]
+        resultado = [midia for chave, midia in menor.items() if all(chave in balde for balde in demais)]
+        return sorted(resultado, key=lambda m: m.titulo.casefold())
+
+    def contar(self, indice, valor):
+        """Quantidade de mídias com o valor no índice (ex.: contar('status', 'ASSISTINDO')), em O(1)."""
+        if indice == "genero" and valor:
+            valor = valor.casefold()
+        return len(self._indices[indice].get(valor, {}))
+
+    def por_nota(self, nota_minima=None, limite=None):
+        """
+        Mídias avaliadas da maior para a menor nota, percorrendo o índice ordenado a partir do topo
+        e parando no limite ou na nota mínima (sem ordenar o catálogo a cada consulta).
+
+        Returns:
+            list: Tuplas (nota, midia).
+        """
+        resultado = []
+        for nota, chave in reversed(self._notas):
+            if nota_minima is not None and nota < nota_minima:
+                break
+            if limite is not None and len(resultado) >= limite:
+                break
+            resultado.append((nota, self._por_id[chave]))
+        return resultado
+
+    #Busca pela identidade e interface de dicionário por título:
+
+    def obter(self, titulo, tipo, ano):
+        """A mídia com esse título (sem diferenciar maiúsculas), tipo e ano, ou None."""
+        return self._por_chave.get((titulo.lower(), tipo, ano))
+
+    def buscar(self, titulo):
+        """Todas as mídias com o título, na ordem de inclusão (lista vazia se não houver)."""
+        return list(self._por_titulo.get(titulo, {}).values())
+
+    def get(self, titulo, padrao=None):
+        """Todas as mídias com o título (ver buscar), ou `padrao` se não houver nenhuma."""
+        return self.buscar(titulo) or padrao
+
+    def values(self):
+        return self._por_id.values()
+
+    def items(self):
+        """Pares (título, mídia), um por mídia: títulos repetidos aparecem uma vez para cada uma."""
+        return ((midia.titulo, midia) for midia in self._por_id.values())
+
+    #A única mídia com o título; KeyError se não houver nenhuma ou se houver mais de uma
+    def __getitem__(self, titulo):
+        midias = self.buscar(titulo)
+        if len(midias) != 1:
+            raise KeyError(f"{len(midias)} mídias com o título '{titulo}' (use buscar ou obter).")
+        return midias[0]
+
+    #Pertinência de uma mídia (pela identidade do objeto) ou de um título
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return item in self._por_titulo
+        return id(item) in self._por_id
+
+    #Percorre os títulos, sem repetir
+    def __iter__(self):
+        return iter(self._por_titulo)
+
+    #Quantidade de mídias (não de títulos)
+    def __len__(self):
+        return len(self._por_id)
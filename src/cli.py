@@ -1,66 +1,136 @@
 
+import time
+_INICIO_IMPORTS = time.perf_counter() #Para o perfil da inicialização (ver src/perfil.py)
+
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 #IMPORTAÇÃO DOS MÓDULOS DO PROJETO
 from src.modelos import Filme, Serie, Usuario,Temporada,Episodio, HistoricoItem, ListaPersonalizada #Importa todas as classes necessárias
-from src.dados import carregar_catalogo, salvar_midia, gerar_relatorio_tempo_assistido
+from src.dados import carregar_catalogo, salvar_catalogo_completo, buscar_texto
+from src.dados import carregar_armazem_episodios, pagina_catalogo, entrar_usuario, listar_usuarios
+from src.dados import fechar_conexoes, atualizar_snapshot
+from src.relatorios import MotorRelatorios
+from src.recomendacoes import MotorRecomendacoes
+from src.catalogo import Catalogo
 from src.config import SETTINGS #Importa as configurações do settings.json
+from src.perfil import PERFIL
+from src.diario import DiarioAlteracoes, caminho_diario, reaplicar_diario, descrever_midia, descrever_temporada
+from src.diario import identificar_midia
+from src import dados
+
+#Duração dos imports acima (src.importacao só é importado ao usar o menu de importação)
+TEMPO_IMPORTS = time.perf_counter() - _INICIO_IMPORTS
+PERFIL.registrar("imports", TEMPO_IMPORTS)
 
 #VARIÁVEIS GLOBAIS DE ESTADO
-CATALOGO_GLOBAL = {} 
+CATALOGO_GLOBAL = Catalogo() #Mídias por título, com índices de status, gênero, ano, tipo, nota e título
 HISTORICO_GLOBAL = []
 USUARIO_ATUAL = None 
+RELATORIO_GLOBAL = None #Motor de relatórios indexado pelo histórico do usuário
+RECOMENDACOES_GLOBAL = None #Motor de recomendações (notas do catálogo e gêneros do histórico)
+DIARIO = None #Diário das alterações ainda não gravadas no banco, com salvamento automático (ver src/diario.py)
 
 #FUNÇÕES DE CONTROLE
 
-def inicializar_sistema():
-    """Carrega dados persistidos do SQLite e inicializa o usuário."""
-    global CATALOGO_GLOBAL, HISTORICO_GLOBAL, USUARIO_ATUAL
+def inicializar_sistema(nome_usuario=None):
+    """
+    Seleciona o usuário (USUARIO_PADRAO do settings.json, se nenhum for informado) e carrega
+    do SQLite o catálogo com o status, as notas, o histórico e as listas desse usuário.
+    Alterações que uma execução anterior anotou no diário, mas não chegou a gravar, são reaplicadas.
+    """
+    global CATALOGO_GLOBAL, HISTORICO_GLOBAL, USUARIO_ATUAL, RELATORIO_GLOBAL, RECOMENDACOES_GLOBAL, DIARIO
     
+    #Troca de usuário ou recarga: grava o que o usuário anterior ainda tinha pendente
+    if DIARIO is not None:
+        DIARIO.encerrar()
+        DIARIO = None
+
     print("Iniciando sistema...")
     
-    #Carregar Catálogo e Histórico
+    #Selecionar o usuário antes de carregar: as leituras seguintes trazem apenas os dados dele
+    #(a primeira consulta também abre o banco e verifica o esquema)
+    with PERFIL.etapa("usuário"):
+        usuario_id, nome, limite = entrar_usuario(nome_usuario or SETTINGS.get('USUARIO_PADRAO', 'Davi'))
+
+    #Carregar Catálogo e Histórico (etapas de consulta e construção medidas em carregar_catalogo)
     # CATALOGO_GLOBAL aqui recebe o dicionário com IDs como chaves {id: objeto}
     CATALOGO_GLOBAL, HISTORICO_GLOBAL = carregar_catalogo()
     
     #Inicializar Usuário
-    limite = SETTINGS['LIMITE_LISTAS_PERSONALIZADAS']
-    USUARIO_ATUAL = Usuario(nome="Davi", limite_listas=limite)
+    if limite is None:
+        limite = SETTINGS['LIMITE_LISTAS_PERSONALIZADAS']
+    USUARIO_ATUAL = Usuario(nome=nome, limite_listas=limite, id=usuario_id)
     
     #Anexar Histórico carregado
     USUARIO_ATUAL._historico.extend(HISTORICO_GLOBAL)
 
     from src.dados import carregar_listas_personalizadas
-    carregar_listas_personalizadas(USUARIO_ATUAL, CATALOGO_GLOBAL)
+    with PERFIL.etapa("listas personalizadas"):
+        carregar_listas_personalizadas(USUARIO_ATUAL, CATALOGO_GLOBAL)
     
+    with PERFIL.etapa("índices do catálogo"):
+        CATALOGO_GLOBAL = Catalogo(CATALOGO_GLOBAL.values())
 
-    CATALOGO_GLOBAL = {midia.titulo: midia for midia in CATALOGO_GLOBAL.values()}
+    #Reaplicar as alterações anotadas e não gravadas (queda ou Ctrl+C na execução anterior)
+    caminho = caminho_diario(dados.DB_NAME, usuario_id)
+    with PERFIL.etapa("diário de alterações"):
+        recuperadas = reaplicar_diario(caminho, CATALOGO_GLOBAL, USUARIO_ATUAL)
+        DIARIO = DiarioAlteracoes(caminho, _salvar_alteracoes, SETTINGS.get('AUTOSALVAR_SEGUNDOS', 30),
+                                  SETTINGS.get('AUTOSALVAR_ALTERACOES', 20))
+    if recuperadas:
+        print(f"♻️ {recuperadas} alterações não salvas da última execução foram recuperadas.")
+        DIARIO.aplicar()
+    DIARIO.iniciar()
+
+    #Indexar o histórico (já com as alterações recuperadas) para relatórios e recomendações
+    with PERFIL.etapa("índice de relatórios"):
+        RELATORIO_GLOBAL = MotorRelatorios(USUARIO_ATUAL._historico)
+    with PERFIL.etapa("motor de recomendações"):
+        RECOMENDACOES_GLOBAL = MotorRecomendacoes(CATALOGO_GLOBAL, USUARIO_ATUAL._historico)
     
-    print(f"Sistema inicializado. {len(CATALOGO_GLOBAL)} mídias e listas carregadas.")
+    print(f"Sistema inicializado para {nome}. {len(CATALOGO_GLOBAL)} mídias e listas carregadas.")
+    if PERFIL.ativo:
+        print(PERFIL.relatorio())
+
+def _salvar_alteracoes():
+    """Gravação usada pelo diário (salvamento automático): o que mudou no catálogo e no usuário."""
+    return salvar_catalogo_completo(CATALOGO_GLOBAL.values(), USUARIO_ATUAL, avisar=False)
+
+def gravar_pendentes():
+    """
+    Grava as alterações anotadas no diário antes de uma leitura feita direto no banco
+    (paginação, busca textual, armazém de episódios), para que ela não mostre dados antigos.
+    """
+    if not DIARIO.aplicar():
+        print("⚠️ Não foi possível gravar as alterações pendentes; o resultado pode estar desatualizado.")
+
+def registrar_conclusao(midia_obj):
+    """Acrescenta a mídia concluída ao histórico do usuário (gravado pelo salvamento automático)."""
+    data_conclusao = datetime.now().replace(microsecond=0) #A mesma precisão gravada no banco
+    with DIARIO.trava:
+        item = USUARIO_ATUAL.adicionar_ao_historico(midia_obj, data_conclusao)
+        DIARIO.anotar("historico", **identificar_midia(midia_obj), data=data_conclusao.isoformat(sep=" "))
+    RELATORIO_GLOBAL.adicionar(item)
+    RECOMENDACOES_GLOBAL.adicionar(item)
 
 def salvar_e_encerrar():
     """Salva todo o estado do sistema no SQLite antes de sair."""
     print("\n💾 Salvando dados no banco de dados...")
     
     try:
-        #Salva cada mídia (Filmes/Séries)
-        for midia in CATALOGO_GLOBAL.values():
-            salvar_midia(midia)
-            
-        #Salva as Listas Personalizadas
-        from src.dados import salvar_listas_usuario
-        salvar_listas_usuario(USUARIO_ATUAL)
-        
-        #Salva o Histórico de visualização
-        from src.dados import salvar_historico_usuario
-        salvar_historico_usuario(USUARIO_ATUAL)
-        
-        print("✅ Tudo foi salvo com sucesso!")
+        #Grava as alterações do diário e para o salvamento automático
+        DIARIO.encerrar()
+        #Salva mídias (Filmes/Séries), Listas Personalizadas e Histórico em uma única transação
+        if salvar_catalogo_completo(CATALOGO_GLOBAL.values(), USUARIO_ATUAL):
+            print("✅ Tudo foi salvo com sucesso!")
+        #Deixa o snapshot em dia com o que acabou de ser gravado: a próxima inicialização não consulta o banco
+        atualizar_snapshot()
     except Exception as e:
         print(f"❌ Erro ao salvar: {e}")
 
+    fechar_conexoes()
     print("Encerrando o sistema. Até logo!")
     sys.exit(0)
 
@@ -84,15 +154,15 @@ def menu_exibir_detalhes_serie():
     print(f"📺 DETALHES DA SÉRIE: {midia_obj.titulo.upper()}")
     print(f"📂 Gênero: {midia_obj._genero} | 📅 Ano: {midia_obj.ano}")
     print(f"📊 Status Geral: {midia_obj.status}")
-    print(f"🔢 Total de Temporadas: {len(midia_obj._temporadas)}")
+    print(f"🔢 Total de Temporadas: {len(midia_obj.temporadas)}")
     print("="*50)
 
-    if not midia_obj._temporadas:
+    if not midia_obj.temporadas:
         print("ℹ️ Nenhuma temporada cadastrada para esta série.")
     else:
         # Ordena as temporadas por número para exibição correta
-        for num_temp in sorted(midia_obj._temporadas.keys()):
-            temporada = midia_obj._temporadas[num_temp]
+        for num_temp in sorted(midia_obj.temporadas.keys()):
+            temporada = midia_obj.temporadas[num_temp]
             print(f"\n🔹 Temporada {num_temp}")
             print("-" * 20)
             
@@ -122,6 +192,12 @@ def exibir_menu_principal():
     print("5. Gerenciar Listas Personalizadas")
     print("6. Menu de Séries detalhadas")  
     print("7. Remover Mídia do Catálogo") 
+    print("8. Buscar (título, gênero, elenco ou episódio)")
+    print("9. Importar Catálogo de Arquivo (CSV/JSONL)")
+    print("10. Filtrar Catálogo (status, gênero, ano, tipo)")
+    print("11. Recomendações")
+    print("12. Continuar Assistindo (próximo episódio de cada série)")
+    print("13. Trocar Usuário")
     print("0. Sair e Salvar")
     print("=" * 40)
 
@@ -147,6 +223,18 @@ def main_loop():
             menu_exibir_detalhes_serie()
         elif escolha == '7':
             menu_remover_midia_do_catalogo()
+        elif escolha == '8':
+            menu_buscar()
+        elif escolha == '9':
+            menu_importar_catalogo()
+        elif escolha == '10':
+            menu_filtrar_catalogo()
+        elif escolha == '11':
+            menu_recomendacoes()
+        elif escolha == '12':
+            menu_continuar_assistindo()
+        elif escolha == '13':
+            menu_trocar_usuario()
         elif escolha == '0':
             salvar_e_encerrar()
         else:
@@ -155,41 +243,311 @@ def main_loop():
 #FUNÇÕES DE VISUALIZAÇÃO/RELATÓRIOS
 
 def exibir_catalogo_completo():
-    """Exibe todas as mídias carregadas na memória, formatadas pelo __str__."""
+    """
+    Navega pelo catálogo em páginas, em ordem alfabética, direto do banco (paginação por chave):
+    próxima/anterior, salto para uma letra e filtros de tipo, status e gênero aplicados no SQL.
+    """
     if not CATALOGO_GLOBAL:
         print("O catálogo está vazio.")
         return
-        
-    print("\n--- Catálogo de Mídias ---")
-    
-    #Acessar os valores (objetos Midia) do dicionário CATALOGO_GLOBAL
-    midias_ordenadas = sorted(CATALOGO_GLOBAL.values(), key=lambda x: x.titulo)
+
+    tamanho = SETTINGS.get('ITENS_POR_PAGINA', 20)
+    filtros = {}
+    gravar_pendentes() #Nada muda em memória enquanto se navega: basta gravar uma vez
+    linhas, ha_anterior, ha_proxima = pagina_catalogo(tamanho=tamanho)
     
-    for i, midia in enumerate(midias_ordenadas, 1):
-        #Utiliza o __str__ de Midia/Filme/Serie
-        print(f"  {i}. {midia}") 
+    while True:
+        descricao_filtros = ", ".join(f"{campo}={valor}" for campo, valor in filtros.items())
+        print(f"\n--- Catálogo de Mídias {('(' + descricao_filtros + ')') if filtros else ''}---")
+        if not linhas:
+            print("  Nenhuma mídia encontrada.")
+        for midia_id, titulo, tipo, ano, genero, status in linhas:
+            #Mesmo formato do __str__ de Midia
+            print(f"  [{tipo}] {titulo} ({ano}) - Gênero: {genero} | Status: {status}")
+        print("--------------------------")
+
+        opcoes = (["[P]róxima"] if ha_proxima else []) + (["[A]nterior"] if ha_anterior else [])
+        print(" | ".join(opcoes + ["[L]etra", "[F]iltros", "[S]air"]))
+        escolha = input("Navegar: ").strip().upper()
+
+        if escolha == 'P' and ha_proxima:
+            ultima = linhas[-1]
+            linhas, ha_anterior, ha_proxima = pagina_catalogo(apos=(ultima[1], ultima[0]), tamanho=tamanho, **filtros)
+        elif escolha == 'A' and ha_anterior:
+            primeira = linhas[0]
+            linhas, ha_anterior, ha_proxima = pagina_catalogo(antes=(primeira[1], primeira[0]), tamanho=tamanho, **filtros)
+        elif escolha == 'L':
+            letra = input("Ir para a letra (ou início do título): ").strip()
+            linhas, ha_anterior, ha_proxima = pagina_catalogo(apos=(letra, 0), tamanho=tamanho, **filtros)
+        elif escolha == 'F':
+            filtros = {}
+            tipo = input("Tipo (FILME/SERIE, Enter para todos): ").strip().upper()
+            status = input("Status (NÃO ASSISTIDO/ASSISTINDO/ASSISTIDO, Enter para todos): ").strip().upper()
+            genero = input("Gênero (Enter para todos): ").strip()
+            for campo, valor in (("tipo", tipo), ("status", status), ("genero", genero)):
+                if valor:
+                    filtros[campo] = valor
+            linhas, ha_anterior, ha_proxima = pagina_catalogo(tamanho=tamanho, **filtros)
+        elif escolha == 'S':
+            return
+        else:
+            print("❌ Opção inválida.")
+
+def menu_buscar():
+    """
+    Busca textual no banco (FTS5) por título, gênero, elenco ou título de episódio,
+    exibindo os resultados em ordem de relevância.
+    """
+    texto = input("\n🔎 Buscar por: ").strip()
+    if not texto:
+        print("❌ Digite ao menos uma palavra.")
+        return
+
+    gravar_pendentes()
+    midias, episodios = buscar_texto(texto)
+    if not midias and not episodios:
+        print(f"Nenhum resultado para '{texto}'.")
+        return
+
+    if midias:
+        print("\n--- Mídias ---")
+        for i, (_, titulo, tipo, ano, genero) in enumerate(midias, 1):
+            print(f"  {i}. [{tipo}] {titulo} ({ano}) - {genero}")
+    if episodios:
+        print("\n--- Episódios ---")
+        for i, (_, titulo_serie, num_temp, num_ep, titulo_ep) in enumerate(episodios, 1):
+            print(f"  {i}. {titulo_serie} - T{num_temp}E{num_ep}: {titulo_ep}")
     print("--------------------------")
 
+def menu_filtrar_catalogo():
+    """
+    Filtra o catálogo em memória pelos índices secundários (status, gênero, ano e tipo),
+    ex.: "o que estou assistindo" ou "ficção científica não assistida". Filtros vazios são ignorados.
+    """
+    print("\n--- 🧭 Filtrar Catálogo (deixe em branco para ignorar) ---")
+    status = input("Status (NÃO ASSISTIDO/ASSISTINDO/ASSISTIDO): ").strip()
+    genero = input("Gênero: ").strip()
+    ano = input("Ano: ").strip()
+    tipo = input("Tipo (FILME/SERIE): ").strip()
+
+    if ano and not ano.isdigit():
+        print("❌ O ano deve ser um número inteiro.")
+        return
+
+    resultado = CATALOGO_GLOBAL.filtrar(status=status or None, genero=genero or None,
+                                        ano=int(ano) if ano else None, tipo=tipo or None)
+    if not resultado:
+        print("Nenhuma mídia atende aos filtros.")
+        return
+
+    print(f"\n{len(resultado)} mídia(s) encontrada(s):")
+    for i, midia in enumerate(resultado, 1):
+        nota = Catalogo.nota_da_midia(midia)
+        nota_str = f" | ⭐ {nota}" if nota is not None else ""
+        print(f"  {i}. {midia}{nota_str}")
+    print("--------------------------")
+
+def menu_recomendacoes():
+    """
+    Exibe os títulos mais bem avaliados (nota mínima NOTA_MINIMA_RECOMENDADO do settings.json)
+    e sugestões não assistidas dos gêneros que mais aparecem no histórico do usuário.
+    """
+    nota_minima = RECOMENDACOES_GLOBAL.nota_minima()
+    print(f"\n--- ⭐ Mais bem avaliados (nota >= {nota_minima}) ---")
+    melhores = RECOMENDACOES_GLOBAL.mais_bem_avaliadas()
+    if not melhores:
+        print("Nenhuma mídia atingiu a nota mínima ainda.")
+    for i, (nota, midia) in enumerate(melhores, 1):
+        print(f"  {i}. [{midia._tipo}] {midia.titulo} ({midia.ano}) - ⭐ {nota}")
+
+    print("\n--- 🎯 Sugestões pelos seus gêneros favoritos ---")
+    sugestoes = RECOMENDACOES_GLOBAL.sugestoes_por_genero()
+    if not sugestoes:
+        print("Assista a alguns títulos para receber sugestões por gênero.")
+    for i, (genero, midia) in enumerate(sugestoes, 1):
+        print(f"  {i}. [{midia._tipo}] {midia.titulo} ({midia.ano}) - {genero}")
+    print("--------------------------")
+
+def menu_continuar_assistindo():
+    """
+    Lista o próximo episódio de cada série em andamento (status ASSISTINDO), lido do cursor
+    de progresso de cada série, sem percorrer nem carregar os episódios.
+    Permite marcar o próximo episódio de uma delas como assistido.
+    """
+    em_andamento = [serie for serie in CATALOGO_GLOBAL.filtrar(status="ASSISTINDO", tipo="SERIE")
+                    if serie.proximo_episodio is not None]
+    if not em_andamento:
+        print("Nenhuma série em andamento.")
+        return
+
+    print("\n--- ▶️ Continuar Assistindo ---")
+    for i, serie in enumerate(em_andamento, 1):
+        num_temp, num_ep = serie.proximo_episodio
+        print(f"  {i}. {serie.titulo} - T{num_temp}E{num_ep}")
+
+    escolha = input("\nNúmero da série para marcar o próximo episódio como assistido (Enter para voltar): ").strip()
+    if not escolha:
+        return
+    if not escolha.isdigit() or not 1 <= int(escolha) <= len(em_andamento):
+        print("❌ Opção inválida.")
+        return
+    marcar_proximo_episodio(em_andamento[int(escolha) - 1])
+
+def marcar_proximo_episodio(serie):
+    """Marca como assistido o episódio apontado pelo cursor de progresso da série."""
+    episodio = serie.obter_proximo_episodio()
+    if episodio is None:
+        print("✅ Não há episódios pendentes nesta série.")
+        return
+
+    num_temp, num_ep = serie.proximo_episodio
+    with DIARIO.trava:
+        episodio.status = "ASSISTIDO"
+        serie.atualizar_status_automatico()
+        DIARIO.anotar("episodio", **identificar_midia(serie), temporada=num_temp, episodio=num_ep, status=episodio.status)
+    nota = input(f"Nota de T{num_temp}E{num_ep} - {episodio._titulo} (0-10) ou Enter para pular: ").strip()
+    if nota:
+        try:
+            with DIARIO.trava:
+                episodio.nota = float(nota)
+                serie.atualizar_status_automatico()
+                DIARIO.anotar("episodio", **identificar_midia(serie), temporada=num_temp, episodio=num_ep, nota=episodio.nota)
+        except ValueError as e:
+            print(f"❌ Nota ignorada: {e}")
+
+    proximo = serie.proximo_episodio
+    seguinte = f" Próximo: T{proximo[0]}E{proximo[1]}." if proximo else " Série concluída!"
+    print(f"✅ T{num_temp}E{num_ep} de '{serie.titulo}' assistido.{seguinte}")
+
+def menu_trocar_usuario():
+    """
+    Salva as alterações pendentes do usuário atual e recarrega o sistema com os dados de
+    outro usuário (criado na hora, se o nome ainda não existir).
+    """
+    print("\n--- 👤 Usuários cadastrados ---")
+    for _, nome in listar_usuarios():
+        marcador = " (atual)" if nome == USUARIO_ATUAL._nome else ""
+        print(f"  - {nome}{marcador}")
+
+    nome = input("\nNome do usuário (novo nome cria um usuário; Enter para voltar): ").strip()
+    if not nome or nome.casefold() == USUARIO_ATUAL._nome.casefold():
+        return
+
+    if not salvar_catalogo_completo(CATALOGO_GLOBAL.values(), USUARIO_ATUAL):
+        print("❌ Não foi possível salvar os dados do usuário atual. Troca cancelada.")
+        return
+    inicializar_sistema(nome)
+
+def menu_importar_catalogo():
+    """
+    Importa em massa filmes, séries, temporadas e episódios de um arquivo CSV ou JSON Lines
+    (formato descrito em src/importacao.py) e recarrega o catálogo em memória.
+    """
+    from src.importacao import importar_arquivo, salvar_rejeitados
+
+    caminho = input("\nCaminho do arquivo (.csv ou .jsonl): ").strip()
+    if not os.path.isfile(caminho):
+        print("❌ Arquivo não encontrado.")
+        return
+
+    #Grava o que estiver pendente antes de recarregar o catálogo a partir do banco
+    if not DIARIO.aplicar():
+        print("❌ Não foi possível salvar as alterações pendentes. Importação cancelada.")
+        return
+
+    try:
+        resultado = importar_arquivo(caminho)
+    except (ValueError, OSError) as e:
+        print(f"❌ Erro ao importar: {e}")
+        return
+
+    print(f"✅ Importação concluída: {resultado}")
+    for numero_linha, mensagem in resultado.rejeitadas[:10]:
+        print(f"   ⚠️ Linha {numero_linha}: {mensagem}")
+    if len(resultado.rejeitadas) > 10:
+        caminho_rejeitados = os.path.splitext(caminho)[0] + "_rejeitados.csv"
+        salvar_rejeitados(resultado, caminho_rejeitados)
+        print(f"   ... lista completa de rejeitados em {caminho_rejeitados}")
+
+    #Recarrega para o mesmo usuário (sem nome, voltaria ao USUARIO_PADRAO)
+    inicializar_sistema(USUARIO_ATUAL._nome)
+
 def menu_relatorios():
-    """Gera o Relatório de Tempo Assistido ."""
+    """
+    Gera os Relatórios de Tempo Assistido a partir do motor de relatórios (RELATORIO_GLOBAL),
+    que responde a qualquer período sem percorrer o histórico inteiro.
+    """
     print("\n--- Relatórios ---")
     print("1. Tempo Total Assistido (Últimos 30 dias)")
+    print("2. Tempo Total Assistido (Últimos 7 dias)")
+    print("3. Tempo Total Assistido em um Período")
+    print("4. Tempo Assistido por Dia/Semana/Mês")
+    print("5. Tempo Assistido por Gênero")
+    print("6. Estatísticas de Episódios por Gênero")
     print("0. Voltar")
     
     escolha = input("Selecione o relatório: ").strip()
     
-    if escolha == '1':
-        try:
-            #Chama a função de dados, que usa a constante do settings.json (via config.py)
-            minutos, horas = gerar_relatorio_tempo_assistido(USUARIO_ATUAL._historico, 'mes')
-            print(f"\n✅ Relatório de Tempo Assistido (Últimos 30 dias):")
+    try:
+        if escolha in ('1', '2'):
+            dias = 30 if escolha == '1' else 7
+            minutos, horas = RELATORIO_GLOBAL.tempo_ultimos_dias(dias)
+            print(f"\n✅ Relatório de Tempo Assistido (Últimos {dias} dias):")
             print(f"   Total assistido: **{horas:.2f} horas** ({minutos} minutos)")
-        except ValueError as e:
-            print(f"Erro ao gerar relatório: {e}")
-    elif escolha == '0':
-        return
-    else:
-        print("❌ Opção inválida.")
+
+        elif escolha == '3':
+            inicio, fim = ler_periodo()
+            minutos, horas = RELATORIO_GLOBAL.tempo_assistido(inicio, fim)
+            print(f"\n✅ Relatório de Tempo Assistido ({inicio:%d/%m/%Y} a {fim - timedelta(days=1):%d/%m/%Y}):")
+            print(f"   Total assistido: **{horas:.2f} horas** ({minutos} minutos)")
+
+        elif escolha == '4':
+            granularidade = input("Agrupar por (dia/semana/mes): ").strip().lower()
+            inicio, fim = ler_periodo()
+            print(f"\n📊 Tempo assistido por {granularidade}:")
+            for inicio_periodo, minutos in RELATORIO_GLOBAL.por_periodo(inicio, fim, granularidade):
+                horas = RELATORIO_GLOBAL.minutos_para_horas(minutos)
+                print(f"   {inicio_periodo:%d/%m/%Y}: {horas:.2f} horas ({minutos} minutos)")
+
+        elif escolha == '5':
+            inicio, fim = ler_periodo()
+            generos = RELATORIO_GLOBAL.por_genero(inicio, fim)
+            if not generos:
+                print("Nenhuma mídia concluída no período.")
+            for genero, minutos in generos:
+                horas = RELATORIO_GLOBAL.minutos_para_horas(minutos)
+                print(f"   {genero}: {horas:.2f} horas ({minutos} minutos)")
+
+        elif escolha == '6':
+            #Armazém colunar lido direto do banco: as reduções não criam objetos Episodio
+            gravar_pendentes()
+            armazem = carregar_armazem_episodios()
+            if not len(armazem):
+                print("Nenhum episódio cadastrado.")
+            for genero in armazem.generos:
+                visao = armazem.todos().filtrar(genero=genero)
+                assistidos = visao.filtrar(status="ASSISTIDO")
+                media = assistidos.nota_media()
+                media_str = f"{media:.2f}" if media is not None else "sem avaliações"
+                print(f"   {genero}: {visao.quantidade()} episódios, {assistidos.quantidade()} assistidos "
+                      f"({assistidos.duracao_total()} minutos) | Nota média dos assistidos: {media_str}")
+
+        elif escolha == '0':
+            return
+        else:
+            print("❌ Opção inválida.")
+
+    except ValueError as e:
+        print(f"Erro ao gerar relatório: {e}")
+
+def ler_periodo():
+    """
+    Pergunta as datas inicial e final (AAAA-MM-DD, ambas inclusivas) e
+    retorna o intervalo semiaberto [inicio, fim) usado pelo motor de relatórios.
+    """
+    inicio = datetime.strptime(input("Data inicial (AAAA-MM-DD): ").strip(), "%Y-%m-%d")
+    fim = datetime.strptime(input("Data final (AAAA-MM-DD): ").strip(), "%Y-%m-%d")
+    return inicio, fim + timedelta(days=1)
 
 #FUNÇÕES DE GESTÃO
 
@@ -211,15 +569,19 @@ def menu_gerenciar_status():
         if isinstance(midia_obj, Filme):
             print(f"\n🎬 Gerenciando Filme: {midia_obj.titulo}")
             novo_status = input(f"Novo status (Atual: {midia_obj.status}) [ASSISTIDO/ASSISTINDO/NÃO ASSISTIDO]: ").strip().upper()
-            midia_obj.status = novo_status 
+            with DIARIO.trava:
+                midia_obj.status = novo_status 
+                DIARIO.anotar("estado", **identificar_midia(midia_obj), status=midia_obj.status)
             
             if midia_obj.status == "ASSISTIDO":
                 nota_input = input("Nota (0 a 10) ou Enter para pular: ").strip()
                 if nota_input:
-                    midia_obj.nota = float(nota_input)
+                    with DIARIO.trava:
+                        midia_obj.nota = float(nota_input)
+                        DIARIO.anotar("estado", **identificar_midia(midia_obj), nota=midia_obj.nota)
                 
                 #Registra no histórico para o relatório de tempo
-                USUARIO_ATUAL.adicionar_ao_historico(midia_obj, datetime.now())
+                registrar_conclusao(midia_obj)
                 print("✅ Filme marcado como assistido e adicionado ao histórico.")
 
         #Logica para series
@@ -230,6 +592,7 @@ def menu_gerenciar_status():
                 print("1. Adicionar Nova Temporada")
                 print("2. Gerenciar Episódio Específico (Status/Nota)")
                 print("3. Marcar Série Inteira como Assistida")
+                print("4. Marcar Próximo Episódio como Assistido")
                 print("0. Voltar")
                 
                 sub_opcao = input("Escolha uma ação: ").strip()
@@ -245,34 +608,40 @@ def menu_gerenciar_status():
                         episodio = Episodio(i, nome_ep, duracao_ep, None) 
                         nova_temp.adicionar_episodio(episodio)
                     
-                    midia_obj.adicionar_temporada(nova_temp)
-                    midia_obj.atualizar_status_automatico()
-                    salvar_midia(midia_obj)
+                    with DIARIO.trava:
+                        midia_obj.adicionar_temporada(nova_temp)
+                        midia_obj.atualizar_status_automatico()
+                        DIARIO.anotar("temporada", **identificar_midia(midia_obj), temporada=descrever_temporada(nova_temp))
 
                     print(f"✅ Temporada {num_temp} adicionada!")
                     print(f"Status da série atualizado para: {midia_obj.status}")
 
                 elif sub_opcao == '2':
-                    if not midia_obj._temporadas:
+                    if not midia_obj.temporadas:
                         print("❌ Esta série não possui temporadas cadastradas.")
                         continue
                         
                     temp_num = int(input("Número da Temporada: "))
-                    if temp_num in midia_obj._temporadas:
-                        temp_obj = midia_obj._temporadas[temp_num]
+                    if temp_num in midia_obj.temporadas:
+                        temp_obj = midia_obj.temporadas[temp_num]
                         ep_num = int(input("Número do Episódio: "))
                         
                         if ep_num in temp_obj._episodios:
                             ep_obj = temp_obj._episodios[ep_num]
-                            ep_obj.status = "ASSISTIDO"
+                            #REGRA DE NEGÓCIO: A série atualiza seu status baseada nos episódios
+                            with DIARIO.trava:
+                                ep_obj.status = "ASSISTIDO"
+                                midia_obj.atualizar_status_automatico()
+                                DIARIO.anotar("episodio", **identificar_midia(midia_obj), temporada=temp_num,
+                                              episodio=ep_num, status=ep_obj.status)
                             
                             nota = input("Nota do Episódio (0-10) ou Enter para pular: ").strip()
                             if nota:
-                                ep_obj.nota = float(nota)
-                            
-                            #REGRA DE NEGÓCIO: A série atualiza seu status baseada nos episódios
-                            midia_obj.atualizar_status_automatico()
-                            salvar_midia(midia_obj)
+                                with DIARIO.trava:
+                                    ep_obj.nota = float(nota)
+                                    midia_obj.atualizar_status_automatico()
+                                    DIARIO.anotar("episodio", **identificar_midia(midia_obj), temporada=temp_num,
+                                                  episodio=ep_num, nota=ep_obj.nota)
                             print(f"✅ Episódio {ep_num} da Temporada {temp_num} atualizado!")
                         else:
                             print("❌ Episódio não encontrado.")
@@ -281,20 +650,23 @@ def menu_gerenciar_status():
 
                 elif sub_opcao == '3':
                     #Atalho para marcar tudo como concluído
-                    midia_obj.status = "ASSISTIDO"
-                    USUARIO_ATUAL.adicionar_ao_historico(midia_obj, datetime.now())
-                    salvar_midia(midia_obj)
+                    with DIARIO.trava:
+                        midia_obj.status = "ASSISTIDO"
+                        DIARIO.anotar("estado", **identificar_midia(midia_obj), status=midia_obj.status)
+                    registrar_conclusao(midia_obj)
                     print("✅ Série marcada como assistida.")
 
+                elif sub_opcao == '4':
+                    marcar_proximo_episodio(midia_obj)
+
                 elif sub_opcao == '0':
                     break
                 else:
                     print("❌ Opção inválida.")
 
         
-        #Salva qualquer alteração (seja Filme ou Série/Episódios) no SQLite
-        salvar_midia(midia_obj)
-        print(f"💾 Alterações em '{midia_obj.titulo}' salvas no banco de dados.")
+        #As alterações (seja Filme ou Série/Episódios) já estão no diário; o salvamento automático as grava
+        print(f"💾 Alterações em '{midia_obj.titulo}' registradas.")
 
     except ValueError as e:
         print(f"❌ Erro de validação: {e}")
@@ -308,14 +680,45 @@ def selecionar_midia_por_titulo():
     """
     midia_input = input("Digite o TÍTULO da mídia: ").strip()
     
-    # Itera sobre os objetos Midia no dicionário global
-    for midia in CATALOGO_GLOBAL.values():
-        if midia.titulo.lower() == midia_input.lower():
-            return midia
+    # Busca exata no índice de títulos (sem diferenciar maiúsculas/minúsculas)
+    midias = CATALOGO_GLOBAL.titulos.buscar(midia_input)
+    if len(midias) == 1:
+        return midias[0]
+    if midias:
+        return escolher_midia_homonima(midias)
+
+    # Sem resultado exato: sugere títulos por prefixo ou aproximados (erros de digitação, acentos)
+    sugestoes = CATALOGO_GLOBAL.titulos.sugerir(midia_input) if midia_input else []
+    if not sugestoes:
+        print("❌ Mídia não encontrada no catálogo. Verifique o título.")
+        return None
+
+    print("🔎 Título não encontrado. Você quis dizer:")
+    for i, sugestao in enumerate(sugestoes, 1):
+        print(f"  {i}. [{sugestao._tipo}] {sugestao.titulo} ({sugestao.ano})")
+    escolha = input("Número da mídia (ENTER para cancelar): ").strip()
+
+    if escolha.isdigit() and 1 <= int(escolha) <= len(sugestoes):
+        return sugestoes[int(escolha) - 1]
     
     print("❌ Mídia não encontrada no catálogo. Verifique o título.")
     return None
 
+def escolher_midia_homonima(midias):
+    """
+    Pergunta qual das mídias de mesmo título (um filme e uma série, ou refilmagens) o usuário quer.
+    """
+    print(f"🔎 Há {len(midias)} mídias com esse título:")
+    for i, midia in enumerate(midias, 1):
+        print(f"  {i}. [{midia._tipo}] {midia.titulo} ({midia.ano})")
+    escolha = input("Número da mídia (ENTER para cancelar): ").strip()
+
+    if escolha.isdigit() and 1 <= int(escolha) <= len(midias):
+        return midias[int(escolha) - 1]
+
+    print("❌ Nenhuma mídia selecionada.")
+    return None
+
 def menu_listas_personalizadas():
     """
     Menu para criar, exibir e gerenciar a adição de mídias em listas personalizadas.
@@ -327,6 +730,7 @@ def menu_listas_personalizadas():
         print("2. Exibir Listas Existentes (e seu conteúdo)")
         print("3. Adicionar Mídia a uma Lista")
         print("4. Remover Mídia de uma Lista")
+        print("5. Mudar a Posição de uma Mídia na Lista")
         print("0. Voltar ao Menu Principal")
         
         escolha = input("Selecione uma opção: ").strip()
@@ -335,7 +739,9 @@ def menu_listas_personalizadas():
             # --- CRIAR NOVA LISTA (Usa a Regra de Negócio) ---
             nome = input("Nome da nova lista: ").strip()
             try:
-                USUARIO_ATUAL.criar_lista(nome) 
+                with DIARIO.trava:
+                    nova_lista = USUARIO_ATUAL.criar_lista(nome) 
+                    DIARIO.anotar("lista_criar", lista=nova_lista._nome)
                 print(f"✅ Lista '{nome}' criada com sucesso.")
             except (ValueError, TypeError) as e:
                 print(f"❌ Não foi possível criar a lista: {e}")
@@ -347,16 +753,14 @@ def menu_listas_personalizadas():
                 
             print("\nListas do Usuário:")
             for nome, lista in USUARIO_ATUAL.listas.items():
-                print(f"\n--- Lista: {nome} ({len(lista)} mídias) ---")
-                
-                if not lista._midias:
-                    print("  (Vazia)")
-                    continue
-                    
-                #Exibe o conteúdo de cada lista
-                for i, midia in enumerate(lista._midias, 1):
-                    #Utiliza o __str__ de Midia/Filme/Serie
-                    print(f"  {i}. {midia}") 
+                print(f"  - {nome} ({len(lista)} mídias)")
+
+            #Exibe o conteúdo da lista escolhida, em páginas
+            lista_nome = input("Digite o NOME da lista para exibir (Enter para voltar): ").strip().upper()
+            if lista_nome in USUARIO_ATUAL.listas:
+                exibir_lista(USUARIO_ATUAL.listas[lista_nome])
+            elif lista_nome:
+                print(f"❌ Lista '{lista_nome}' não encontrada.")
 
         elif escolha == '3':
             
@@ -376,13 +780,18 @@ def menu_listas_personalizadas():
             if midia_obj:
                 try:
                     #Chama o método da classe ListaPersonalizada para adicionar
-                    USUARIO_ATUAL.listas[lista_nome].adicionar_midia(midia_obj)
+                    with DIARIO.trava:
+                        USUARIO_ATUAL.listas[lista_nome].adicionar_midia(midia_obj)
+                        DIARIO.anotar("lista_adicionar", lista=lista_nome, **identificar_midia(midia_obj))
                     print(f"✅ '{midia_obj.titulo}' adicionada à lista '{lista_nome}'.")
                 except ValueError as e:
                     print(f"❌ Erro ao adicionar: {e}") #Captura erro de duplicidade
 
         elif escolha == '4':
             menu_remover_midia_da_lista()
+
+        elif escolha == '5':
+            menu_mover_midia_na_lista()
         
         elif escolha == '0':
             return
@@ -403,15 +812,17 @@ def menu_adicionar_midia():
 
     try:
         titulo = input("Título: ").strip()
-        
-        #Verifica se a mídia já existe para evitar duplicatas
-        if titulo in CATALOGO_GLOBAL:
-            print(f"❌ A mídia '{titulo}' já existe no catálogo.")
-            return
-            
         genero = input("Gênero: ").strip()
         ano = int(input("Ano de Lançamento: "))
+
+        #Verifica se a mídia já existe para evitar duplicatas (mesmo título, tipo e ano)
+        if CATALOGO_GLOBAL.obter(titulo, tipo, ano) is not None:
+            print(f"❌ A mídia '{titulo}' ({tipo}, {ano}) já existe no catálogo.")
+            return
+
         classificacao = input("Classificação Indicativa (ex: 12, L): ").strip()
+        elenco_input = input("Elenco (nomes separados por vírgula, opcional): ")
+        elenco = [nome.strip() for nome in elenco_input.split(",") if nome.strip()]
         
         nova_midia = None
 
@@ -420,13 +831,13 @@ def menu_adicionar_midia():
             
             # Cria a instância do Filme
             nova_midia = Filme(
-                titulo, genero, ano, classificacao, elenco=[], 
+                titulo, genero, ano, classificacao, elenco=elenco, 
                 duracao_minutos=duracao, status="NÃO ASSISTIDO", nota=None
             )
             
         elif tipo == "SERIE":
             #Cria o objeto Série
-            nova_midia = Serie(titulo, genero, ano, classificacao, elenco=[])
+            nova_midia = Serie(titulo, genero, ano, classificacao, elenco=elenco)
             print("--- Adicionar Primeira Temporada ---")
             
             #Captura os dados da primeira Temporada
@@ -450,11 +861,10 @@ def menu_adicionar_midia():
             
         #Persistência e Atualização do Estado Global
         if nova_midia:
-            #Persistência: salvar_midia deve fazer um INSERT
-            salvar_midia(nova_midia) 
-            
-            #Atualiza a memória
-            CATALOGO_GLOBAL[nova_midia.titulo] = nova_midia 
+            #Atualiza a memória e anota no diário (o salvamento automático faz o INSERT)
+            with DIARIO.trava:
+                CATALOGO_GLOBAL.adicionar(nova_midia)
+                DIARIO.anotar("midia", midia=descrever_midia(nova_midia))
             
             print(f"✅ Mídia '{nova_midia.titulo}' adicionada com sucesso ao catálogo.")
 
@@ -463,6 +873,79 @@ def menu_adicionar_midia():
     except Exception as e:
         print(f"❌ Ocorreu um erro desconhecido: {e}")
 
+def exibir_lista(lista_obj):
+    """
+    Exibe o conteúdo de uma lista personalizada em páginas de ITENS_POR_PAGINA mídias,
+    na ordem da lista (acesso por posição, sem percorrer a lista inteira a cada página).
+    """
+    tamanho = SETTINGS.get('ITENS_POR_PAGINA', 20)
+    paginas = max(1, -(-len(lista_obj) // tamanho))
+    numero = 1
+
+    while True:
+        print(f"\n--- Lista: {lista_obj._nome} ({len(lista_obj)} mídias) | Página {numero}/{paginas} ---")
+        if not len(lista_obj):
+            print("  (Vazia)")
+        for i, midia in enumerate(lista_obj.pagina(numero, tamanho), (numero - 1) * tamanho + 1):
+            #Utiliza o __str__ de Midia/Filme/Serie
+            print(f"  {i}. {midia}")
+        if paginas == 1:
+            return
+
+        opcoes = (["[P]róxima"] if numero < paginas else []) + (["[A]nterior"] if numero > 1 else [])
+        print(" | ".join(opcoes + ["[S]air"]))
+        escolha = input("Navegar: ").strip().upper()
+
+        if escolha == 'P' and numero < paginas:
+            numero += 1
+        elif escolha == 'A' and numero > 1:
+            numero -= 1
+        elif escolha == 'S':
+            return
+        else:
+            print("❌ Opção inválida.")
+
+def selecionar_midia_da_lista(lista_obj, pergunta):
+    """
+    Pede o título de uma mídia da lista; se a lista tiver mais de uma com esse título, pergunta qual.
+    """
+    titulo = input(pergunta).strip()
+    midias = lista_obj.buscar_todas(titulo)
+    if not midias:
+        print(f"❌ Mídia '{titulo}' não encontrada na lista.")
+        return None
+    if len(midias) == 1:
+        return midias[0]
+    return escolher_midia_homonima(midias)
+
+def menu_mover_midia_na_lista():
+    """
+    Muda a posição de uma mídia dentro de uma lista personalizada (a ordem é gravada no banco).
+    """
+    if not USUARIO_ATUAL.listas:
+        print("❌ Você não possui listas criadas.")
+        return
+
+    print("\nSuas listas:", ", ".join(USUARIO_ATUAL.listas.keys()))
+    lista_nome = input("Em qual lista? ").strip().upper()
+    if lista_nome not in USUARIO_ATUAL.listas:
+        print("❌ Lista não encontrada.")
+        return
+
+    lista_obj = USUARIO_ATUAL.listas[lista_nome]
+    exibir_lista(lista_obj)
+    midia_obj = selecionar_midia_da_lista(lista_obj, "\nDigite o TÍTULO da mídia para mover: ")
+    if midia_obj is None:
+        return
+    try:
+        posicao = int(input(f"Nova posição (1 a {len(lista_obj)}): ").strip()) - 1
+        with DIARIO.trava:
+            lista_obj.mover(midia_obj, posicao)
+            DIARIO.anotar("lista_mover", lista=lista_nome, **identificar_midia(midia_obj), posicao=posicao)
+        print(f"✅ '{midia_obj.titulo}' agora está na posição {posicao + 1} da lista '{lista_nome}'.")
+    except ValueError as e:
+        print(f"❌ Erro: {e}")
+
 def menu_remover_midia_da_lista():
     """
     Remove uma mídia de uma lista personalizada específica do usuário.
@@ -478,26 +961,61 @@ def menu_remover_midia_da_lista():
         lista_obj = USUARIO_ATUAL.listas[lista_nome]
         
         #Exibe o que tem na lista para ajudar o usuário
-        if not lista_obj._midias:
+        if not len(lista_obj):
             print(f"⚠️ A lista '{lista_nome}' já está vazia.")
             return
 
-        print(f"\nConteúdo de {lista_nome}:")
-        for i, m in enumerate(lista_obj._midias, 1):
-            print(f"  {i}. {m.titulo}")
+        exibir_lista(lista_obj)
 
-        titulo_remover = input("\nDigite o TÍTULO exato da mídia para remover: ").strip()
+        midia_remover = selecionar_midia_da_lista(lista_obj, "\nDigite o TÍTULO da mídia para remover: ")
+        if midia_remover is None:
+            return
         
         try:
             #Chama o método da classe ListaPersonalizada
-            lista_obj.remover_midia(titulo_remover)
-            print(f"✅ '{titulo_remover}' removido da lista '{lista_nome}'.")
+            with DIARIO.trava:
+                lista_obj.remover_midia(midia_remover)
+                DIARIO.anotar("lista_remover", lista=lista_nome, **identificar_midia(midia_remover))
+            print(f"✅ '{midia_remover.titulo}' removido da lista '{lista_nome}'.")
         except ValueError as e:
             print(f"❌ Erro: {e}")
     else:
         print("❌ Lista não encontrada.")
 
-from src.dados import excluir_midia_do_banco
+from src.dados import excluir_midias
+
+def remover_midias(midias):
+    """
+    Exclui as mídias do banco em UMA transação (temporadas, episódios, estado, histórico e listas
+    saem em cascata) e as retira de toda a memória: catálogo e seus índices, listas e histórico
+    do usuário, relatórios e recomendações.
+
+    Returns:
+        int: Quantidade de mídias excluídas do banco.
+    """
+    global RELATORIO_GLOBAL, RECOMENDACOES_GLOBAL
+    #Grava antes o que estiver pendente (ex.: mídias incluídas nesta sessão, ainda sem id)
+    if not DIARIO.aplicar():
+        print("❌ Não foi possível gravar as alterações pendentes; exclusão cancelada.")
+        return 0
+
+    midias = list(midias)
+    removidas = excluir_midias([midia.id for midia in midias if midia.id is not None])
+    if not removidas:
+        return 0
+
+    with DIARIO.trava:
+        for midia in midias:
+            CATALOGO_GLOBAL.remover(midia)
+        retirados = USUARIO_ATUAL.esquecer_midias(midias)
+        excluidas = {id(midia) for midia in midias}
+        HISTORICO_GLOBAL[:] = [item for item in HISTORICO_GLOBAL if id(item.midia) not in excluidas]
+
+    #Relatórios e recomendações só acumulam: são reindexados sem os registros retirados
+    if retirados:
+        RELATORIO_GLOBAL = MotorRelatorios(USUARIO_ATUAL._historico)
+        RECOMENDACOES_GLOBAL = MotorRecomendacoes(CATALOGO_GLOBAL, USUARIO_ATUAL._historico)
+    return removidas
 
 def menu_remover_midia_do_catalogo():
     """
@@ -512,14 +1030,8 @@ def menu_remover_midia_do_catalogo():
         confirmar = input(f"⚠️ Tem certeza que deseja excluir '{midia_obj.titulo}'? (S/N): ").strip().upper()
         
         if confirmar == 'S':
-            #Remove do Banco de Dados
-            sucesso = excluir_midia_do_banco(midia_obj.titulo, midia_obj.ano)
-            
-            if sucesso:
-                #Remove da Memória (Dicionário Global
-                if midia_obj.titulo in CATALOGO_GLOBAL:
-                    del CATALOGO_GLOBAL[midia_obj.titulo]
-                
+            #Remove do Banco de Dados e da Memória (catálogo, listas, histórico e relatórios)
+            if remover_midias([midia_obj]):
                 print(f"✅ '{midia_obj.titulo}' foi removida com sucesso de todos os registros.")
             else:
                 print("❌ Erro ao processar a exclusão no banco de dados.")
@@ -527,4 +1039,8 @@ def menu_remover_midia_do_catalogo():
             print("Operação cancelada.")
 
 if __name__ == "__main__":
+    #--perfil: mostra o tempo de cada etapa da inicialização (o mesmo que CATALOGO_PERFIL=1)
+    if "--perfil" in sys.argv[1:] and not PERFIL.ativo:
+        PERFIL.ativar()
+        PERFIL.registrar("imports", TEMPO_IMPORTS)
     main_loop()
\ No newline at end of file
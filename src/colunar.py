@@ -0,0 +1,230 @@
+# src/colunar.py
+
+from array import array
+from bisect import bisect_right
+from itertools import compress, filterfalse, islice
+from math import isnan, nan
+from operator import itemgetter
+
+#NumPy é opcional: quando instalado, as reduções são vetorizadas; sem ele, usa-se array.array puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ArmazemEpisodios:
+    """
+    Armazém colunar de episódios para análises sobre o catálogo inteiro.
+    Cada atributo de episódio é uma coluna contígua (array.array), em vez de um objeto Episodio:
+    id da série, temporada, número, duração, nota (NaN = não avaliado) e código do status.
+    As linhas de uma mesma série (e de uma mesma temporada) ficam contíguas, então Serie e
+    Temporada são expostas como visões de intervalos, e o gênero (da série) vira uma lista de faixas.
+    Com NumPy instalado as colunas são reduzidas de forma vetorizada.
+    """
+    CODIGOS_STATUS = {"NÃO ASSISTIDO": 0, "ASSISTINDO": 1, "ASSISTIDO": 2}
+
+    def __init__(self):
+        self._serie_id = array("q")
+        self._temporada = array("H")
+        self._numero = array("H")
+        self._duracao = array("l")
+        self._nota = array("d")
+        self._status = array("b")
+
+        self._generos = []          #Código -> gênero
+        self._codigos_genero = {}   #Gênero -> código
+        self._intervalos_serie = {}      #Chave: serie_id, Valor: [inicio, fim)
+        self._intervalos_temporada = {}  #Chave: (serie_id, temporada), Valor: [inicio, fim)
+        self._faixas_genero = {}         #Chave: código do gênero, Valor: lista ordenada de [inicio, fim)
+        self._cache_numpy = None
+
+    #Devolve (criando se preciso) o código numérico de um gênero
+    def _codigo_genero(self, genero):
+        genero = genero or "SEM GÊNERO"
+        if genero not in self._codigos_genero:
+            self._codigos_genero[genero] = len(self._generos)
+            self._generos.append(genero)
+        return self._codigos_genero[genero]
+
+    #Estende o intervalo [inicio, fim) da chave até a linha informada
+    @staticmethod
+    def _estender_intervalo(intervalos, chave, linha):
+        if chave in intervalos:
+            intervalos[chave][1] = linha + 1
+        else:
+            intervalos[chave] = [linha, linha + 1]
+
+    def adicionar(self, serie_id, genero, temporada, numero, duracao, nota, status):
+        """Acrescenta a linha de um episódio. As linhas devem vir agrupadas por série e temporada."""
+        if status not in self.CODIGOS_STATUS:
+            raise ValueError("Status inválido para episódio.")
+
+        #Só são aceitas chaves novas ou continuações da última linha (mantém os intervalos contíguos)
+        linha = len(self._serie_id)
+        for intervalos, chave in ((self._intervalos_serie, serie_id),
+                                  (self._intervalos_temporada, (serie_id, temporada))):
+            if chave in intervalos and intervalos[chave][1] != linha:
+                raise ValueError("Os episódios de cada série e temporada devem ser adicionados em sequência.")
+        self._estender_intervalo(self._intervalos_serie, serie_id, linha)
+        self._estender_intervalo(self._intervalos_temporada, (serie_id, temporada), linha)
+
+        self._serie_id.append(serie_id)
+        codigo_genero = self._codigo_genero(genero)
+        faixas = self._faixas_genero.setdefault(codigo_genero, [])
+        if faixas and faixas[-1][1] == linha:
+            faixas[-1][1] = linha + 1
+        else:
+            faixas.append([linha, linha + 1])
+        self._temporada.append(temporada)
+        self._numero.append(numero)
+        self._duracao.append(duracao or 0)
+        self._nota.append(nan if nota is None else nota)
+        self._status.append(self.CODIGOS_STATUS[status])
+        self._cache_numpy = None
+
+    def adicionar_serie(self, serie):
+        """Acrescenta todos os episódios de um objeto Serie já gravado (com id)."""
+        if serie.id is None:
+            raise ValueError("A série precisa estar gravada no banco (com id) para entrar no armazém.")
+        for num_temp, temporada in sorted(serie.temporadas.items()):
+            for num_ep, episodio in sorted(temporada._episodios.items()):
+                self.adicionar(serie.id, serie._genero, num_temp, num_ep,
+                               episodio.duracao, episodio.nota, episodio.status)
+
+    #Cópias NumPy das colunas (refeitas apenas após novas inserções)
+    def _colunas_numpy(self):
+        if self._cache_numpy is None:
+            self._cache_numpy = {nome: np.array(getattr(self, "_" + nome))
+                                 for nome in ("serie_id", "temporada", "numero", "duracao", "nota", "status")}
+        return self._cache_numpy
+
+    #Visões:
+
+    def todos(self):
+        """Visão sobre todos os episódios do armazém."""
+        return VisaoEpisodios(self, 0, len(self))
+
+    def visao_serie(self, serie_id):
+        """Visão sobre os episódios de uma série (vazia se a série não estiver no armazém)."""
+        inicio, fim = self._intervalos_serie.get(serie_id, (0, 0))
+        return VisaoEpisodios(self, inicio, fim)
+
+    def visao_temporada(self, serie_id, temporada):
+        """Visão sobre os episódios de uma temporada de uma série."""
+        inicio, fim = self._intervalos_temporada.get((serie_id, temporada), (0, 0))
+        return VisaoEpisodios(self, inicio, fim)
+
+    @property
+    def generos(self):
+        return list(self._generos)
+
+    #Método Especial para retornar o número de episódios armazenados
+    def __len__(self):
+        return len(self._serie_id)
+
+
+class VisaoEpisodios:
+    """
+    Intervalo [inicio, fim) de linhas de um ArmazemEpisodios, opcionalmente filtrado por
+    gênero e/ou status. As reduções (quantidade, duração, nota média) operam sobre as colunas,
+    sem criar objetos Episodio.
+    """
+    def __init__(self, armazem, inicio, fim, genero=None, status=None):
+        self._armazem = armazem
+        self._inicio = inicio
+        self._fim = fim
+        self._genero = genero
+        self._status = status
+
+    def filtrar(self, genero=None, status=None):
+        """Nova visão restrita a um gênero e/ou status (combinados com os filtros atuais)."""
+        if status is not None and status not in ArmazemEpisodios.CODIGOS_STATUS:
+            raise ValueError("Status inválido para episódio.")
+        return VisaoEpisodios(self._armazem, self._inicio, self._fim,
+                              genero if genero is not None else self._genero,
+                              status if status is not None else self._status)
+
+    #Faixas [a, b) de linhas da visão já restritas ao gênero. Como o gênero é da série e as linhas
+    #de cada série são contíguas, o filtro por gênero é um recorte de intervalos, sem comparar linha a linha.
+    def _faixas(self):
+        if self._genero is None:
+            return [(self._inicio, self._fim)]
+        codigo = self._armazem._codigos_genero.get(self._genero)
+        faixas_genero = self._armazem._faixas_genero.get(codigo, [])
+        faixas = []
+        for a, b in islice(faixas_genero, bisect_right(faixas_genero, self._inicio, key=itemgetter(1)), None):
+            if a >= self._fim:
+                break
+            faixas.append((max(a, self._inicio), min(b, self._fim)))
+        return faixas
+
+    #Devolve a coluna recortada pelas faixas e filtrada pelo status, pronta para a redução
+    def _coluna(self, nome):
+        faixas = self._faixas()
+        valores = _recortar(self._armazem, nome, faixas)
+        if self._status is None:
+            return valores
+        codigo = ArmazemEpisodios.CODIGOS_STATUS[self._status]
+        status = _recortar(self._armazem, "status", faixas)
+        if np is not None:
+            return valores[status == codigo]
+        #Sem NumPy: compress/map percorrem as colunas em C, sem laço Python
+        return list(compress(valores, map(codigo.__eq__, status)))
+
+    #Reduções:
+
+    def quantidade(self):
+        """Número de episódios na visão."""
+        faixas = self._faixas()
+        if self._status is None:
+            return sum(b - a for a, b in faixas)
+        status = _recortar(self._armazem, "status", faixas)
+        codigo = ArmazemEpisodios.CODIGOS_STATUS[self._status]
+        return int((status == codigo).sum()) if np is not None else status.count(codigo)
+
+    def duracao_total(self):
+        """Soma das durações (em minutos)."""
+        duracoes = self._coluna("duracao")
+        return int(duracoes.sum()) if np is not None else sum(duracoes)
+
+    def nota_media(self):
+        """Média das notas dos episódios avaliados (None se nenhum foi avaliado)."""
+        notas = self._coluna("nota")
+        if np is not None:
+            avaliadas = notas[~np.isnan(notas)]
+            return round(float(avaliadas.mean()), 2) if avaliadas.size else None
+        avaliadas = list(filterfalse(isnan, notas))
+        return round(sum(avaliadas) / len(avaliadas), 2) if avaliadas else None
+
+    def contagem_por_status(self):
+        """Quantidade de episódios por status, ex.: {'ASSISTIDO': 10, 'ASSISTINDO': 0, 'NÃO ASSISTIDO': 3}."""
+        codigos = self._coluna("status")
+        if np is not None:
+            contagens = np.bincount(codigos, minlength=len(ArmazemEpisodios.CODIGOS_STATUS))
+        else:
+            contagens = [codigos.count(codigo) for codigo in range(len(ArmazemEpisodios.CODIGOS_STATUS))]
+        return {status: int(contagens[codigo]) for status, codigo in ArmazemEpisodios.CODIGOS_STATUS.items()}
+
+    #Método Especial para retornar o número de episódios na visão
+    def __len__(self):
+        return self.quantidade()
+
+
+#Concatena os trechos [a, b) de uma coluna do armazém (NumPy quando disponível)
+def _recortar(armazem, nome, faixas):
+    if np is not None:
+        coluna = armazem._colunas_numpy()[nome]
+        if len(faixas) == 1:
+            a, b = faixas[0]
+            return coluna[a:b]
+        return np.concatenate([coluna[a:b] for a, b in faixas]) if faixas else coluna[0:0]
+
+    coluna = getattr(armazem, "_" + nome)
+    if len(faixas) == 1:
+        a, b = faixas[0]
+        return coluna[a:b]
+    recorte = array(coluna.typecode)
+    for a, b in faixas:
+        recorte.extend(coluna[a:b])
+    return recorte
@@ -0,0 +1,87 @@
+# src/conexao.py
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class GerenciadorConexoes:
+    """
+    Conexões SQLite reutilizadas por thread, para uso concorrente do banco:
+    - cada thread recebe sempre a MESMA conexão (threading.local), aberta na primeira vez
+      em que pede uma, em vez de abrir e fechar o arquivo a cada função;
+    - o banco usa WAL (journal_mode=WAL): leitores (ex.: um relatório) continuam lendo a última
+      versão confirmada enquanto outra thread grava, sem esperar o fim da transação;
+    - synchronous=NORMAL, cache_size e mmap_size ajustados e cache de comandos preparados
+      (cached_statements) por conexão, aproveitado justamente porque a conexão é reutilizada;
+    - foreign_keys=ON: as chaves estrangeiras são verificadas e as exclusões se propagam em cascata;
+    - transacao() é um gerenciador de contexto: confirma ao sair do bloco e desfaz em caso de erro.
+    """
+    def __init__(self, caminho, cache_kib=16384, mmap_bytes=64 * 1024 * 1024,
+                 comandos_em_cache=256, espera_segundos=5.0):
+        self.caminho = caminho
+        self._cache_kib = cache_kib
+        self._mmap_bytes = mmap_bytes
+        self._comandos_em_cache = comandos_em_cache
+        self._espera_segundos = espera_segundos
+        self._local = threading.local()
+        self._abertas = []          #Todas as conexões abertas (de qualquer thread), para fechar_todas()
+        self._trava = threading.Lock()
+
+    def conexao(self):
+        """Retorna a conexão da thread atual, abrindo-a (e aplicando os PRAGMAs) na primeira chamada."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._abrir()
+            self._local.conn = conn
+            self._local.profundidade = 0
+            with self._trava:
+                self._abertas.append(conn)
+        return conn
+
+    def _abrir(self):
+        # check_same_thread=False apenas para que fechar_todas() possa fechar conexões de outras
+        # threads ao encerrar; durante o uso, cada conexão só é usada pela thread que a abriu.
+        conn = sqlite3.connect(self.caminho, timeout=self._espera_segundos, check_same_thread=False,
+                               cached_statements=self._comandos_em_cache)
+        # journal_mode é persistente no arquivo; os demais valem por conexão
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL") #Seguro em WAL: só o último commit pode se perder numa queda de energia
+        conn.execute(f"PRAGMA cache_size = -{int(self._cache_kib)}") #Negativo: tamanho em KiB, não em páginas
+        conn.execute(f"PRAGMA mmap_size = {int(self._mmap_bytes)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON") #Exclusões em cascata (ver a migração 12 em src/dados.py)
+        return conn
+
+    @contextmanager
+    def transacao(self):
+        """
+        Bloco transacional na conexão da thread atual:
+
+            with gerenciador.transacao() as conn:
+                conn.execute(...)
+
+        Confirma (commit) ao sair normalmente e desfaz (rollback) se o bloco levantar uma exceção,
+        que é repassada ao chamador. Blocos aninhados participam da transação do bloco externo.
+        """
+        conn = self.conexao()
+        self._local.profundidade += 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.profundidade -= 1
+            if self._local.profundidade == 0:
+                conn.rollback()
+            raise
+        else:
+            self._local.profundidade -= 1
+            if self._local.profundidade == 0:
+                conn.commit()
+
+    def fechar_todas(self):
+        """Fecha as conexões de todas as threads (ex.: ao encerrar ou ao trocar de arquivo de banco)."""
+        with self._trava:
+            abertas, self._abertas = self._abertas, []
+        for conn in abertas:
+            conn.close()
+        self._local = threading.local()
@@ -2,32 +2,70 @@
 
 import json
 import os
+from collections.abc import Mapping
+from functools import lru_cache
 
 SETTINGS_FILE = 'settings.json'
 
+# Valores usados quando o settings.json não existe (ou não define a chave)
+PADROES = {
+    "NOTA_MINIMA_RECOMENDADO": 8.0,
+    "LIMITE_LISTAS_PERSONALIZADAS": 5,
+    "MULTIPLICADOR_MIN_PARA_HORAS": 60,
+    "ITENS_POR_PAGINA": 20,
+    "USUARIO_PADRAO": "Davi",
+    "CAMINHO_BANCO": "catalogo.db",
+    "USAR_SNAPSHOT": True,
+    "AUTOSALVAR_SEGUNDOS": 30,
+    "AUTOSALVAR_ALTERACOES": 20
+}
+
 def load_settings():
     """
     Carrega as configurações do arquivo JSON que está na raiz do projeto.
     """
     # 1. Obter o diretório do arquivo ATUAL (src/)
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # 2. Navegar para o diretório PAI (raiz do projeto)
     root_dir = os.path.dirname(current_dir)
-    
+
     # 3. Construir o caminho completo para settings.json
     settings_path = os.path.join(root_dir, SETTINGS_FILE)
-    
+
     try:
         with open(settings_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            return {**PADROES, **json.load(f)}
     except FileNotFoundError:
-        print(f"ERRO: Arquivo de configuração '{SETTINGS_FILE}' não encontrado em {root_dir}. Usando padrões.")
-        # Retorna valores padrão em caso de erro para não quebrar o programa
-        return {
-            "NOTA_MINIMA_RECOMENDADO": 8.0,
-            "LIMITE_LISTAS_PERSONALIZADAS": 5,
-            "MULTIPLICADOR_MIN_PARA_HORAS": 60
-        }
-
-SETTINGS = load_settings()
\ No newline at end of file
+        # Usa os valores padrão para não quebrar o programa
+        return dict(PADROES)
+
+@lru_cache(maxsize=None)
+def carregar_configuracoes():
+    """
+    Lê o settings.json na primeira chamada e guarda o resultado: importar este módulo não
+    acessa o disco, e as chamadas seguintes não relêem o arquivo.
+    """
+    return load_settings()
+
+class _Configuracoes(Mapping):
+    """Acesso às configurações como dicionário (SETTINGS['CHAVE'], SETTINGS.get), carregadas no primeiro uso."""
+    def __getitem__(self, chave):
+        return carregar_configuracoes()[chave]
+
+    def __iter__(self):
+        return iter(carregar_configuracoes())
+
+    def __len__(self):
+        return len(carregar_configuracoes())
+
+def caminho_banco():
+    """
+    Caminho do arquivo SQLite: a variável de ambiente CATALOGO_DB ou, na falta dela, CAMINHO_BANCO
+    do settings.json. Caminhos relativos partem da raiz do projeto, e não do diretório atual.
+    """
+    caminho = os.environ.get('CATALOGO_DB') or carregar_configuracoes().get('CAMINHO_BANCO', 'catalogo.db')
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root_dir, caminho)
+
+SETTINGS = _Configuracoes()
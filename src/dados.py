@@ -1,26 +1,85 @@
-from src.modelos import Midia, Filme, Serie, Temporada, Episodio, Usuario, HistoricoItem
+from src.modelos import Midia, Filme, Serie, Temporada, Episodio, Usuario, HistoricoItem, AgregadosEpisodios
+from src.colunar import ArmazemEpisodios
+from src.config import SETTINGS, caminho_banco
+from src.conexao import GerenciadorConexoes
+from src.perfil import PERFIL
+from src.snapshot import caminho_snapshot, ler_snapshot, gravar_snapshot
 import sqlite3
+import threading
 from datetime import datetime
+from functools import partial
 from datetime import timedelta
 
-DB_NAME = 'catalogo.db'
+#Caminho do arquivo .db (CATALOGO_DB ou CAMINHO_BANCO do settings.json; ver config.caminho_banco).
+#Resolvido no primeiro get_conn(), para que importar este módulo não leia o settings.json
+DB_NAME = None
+
+#Usuário cujo estado (status, notas, progresso, histórico e listas) é lido e gravado (ver entrar_usuario)
+USUARIO_ID = 1
+
+#Conexões reutilizadas por thread, em modo WAL (ver src/conexao.py); criado no primeiro get_conn()
+_CONEXOES = None
+
+#Caminho do banco cujo esquema já foi verificado nesta execução (ver get_conn)
+_ESQUEMA_VERIFICADO = None
+_TRAVA_ESQUEMA = threading.Lock()
 
 def get_conn():
-    """Retorna a conexão com o banco de dados SQLite."""
-    # A conexão é estabelecida, e o arquivo .db é criado se não existir
-    return sqlite3.connect(DB_NAME)
+    """
+    Retorna a conexão da thread atual com o banco de dados SQLite. A conexão é aberta
+    (e o arquivo .db criado, se não existir) na primeira chamada de cada thread e depois
+    reutilizada: as funções deste módulo não a fecham.
+    Na primeira chamada para cada arquivo, o esquema é verificado e migrado (ver criar_tabelas),
+    em vez de ao importar o módulo: quem só importa dados.py não paga a abertura do banco.
+    """
+    global _CONEXOES, DB_NAME
+    if DB_NAME is None:
+        DB_NAME = caminho_banco()
+    if _CONEXOES is None or _CONEXOES.caminho != DB_NAME:
+        # Primeiro uso, ou DB_NAME foi trocado (ex.: benchmarks e scripts apontando para outro arquivo)
+        if _CONEXOES is not None:
+            _CONEXOES.fechar_todas()
+        _CONEXOES = GerenciadorConexoes(DB_NAME)
+    if _ESQUEMA_VERIFICADO != DB_NAME:
+        _verificar_esquema()
+    return _CONEXOES.conexao()
+
+def _verificar_esquema():
+    global _ESQUEMA_VERIFICADO
+    with _TRAVA_ESQUEMA:
+        # Outra thread pode ter verificado enquanto esta esperava a trava
+        if _ESQUEMA_VERIFICADO != DB_NAME:
+            with PERFIL.etapa("conexão e verificação do esquema"):
+                aplicar_migracoes(_CONEXOES.conexao())
+            _ESQUEMA_VERIFICADO = DB_NAME
+
+def transacao():
+    """
+    Gerenciador de contexto transacional na conexão da thread atual:
+    confirma ao sair do bloco e desfaz se ele levantar uma exceção.
+
+        with transacao() as conn:
+            conn.execute(...)
+    """
+    get_conn()
+    return _CONEXOES.transacao()
+
+def fechar_conexoes():
+    """Fecha as conexões abertas por todas as threads (ao encerrar o programa)."""
+    if _CONEXOES is not None:
+        _CONEXOES.fechar_todas()
 
 # ----------------------------------------------------
-# 1. CRIAÇÃO DE TABELAS (ESQUEMA SQL)
+# 1. CRIAÇÃO DE TABELAS E MIGRAÇÕES DE ESQUEMA (SQL)
 # ----------------------------------------------------
+# A versão do esquema fica gravada no próprio arquivo .db (PRAGMA user_version).
+# Cada migração é aplicada uma única vez, em ordem, dentro de uma transação.
 
-def criar_tabelas():
+def _migracao_1_tabelas_base(cursor):
     """
     Cria todas as tabelas necessárias para persistir a estrutura de POO (Midia, Composicao, Historico).
+    Usa IF NOT EXISTS para também servir bancos criados antes do controle de versão.
     """
-    conn = get_conn()
-    cursor = conn.cursor()
-
     # Tabela 1: MIDIAS (Base para Filmes e Séries)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS midias (
@@ -82,11 +141,683 @@ def criar_tabelas():
         )
     """)
 
-    conn.commit()
-    conn.close()
+def _migracao_2_indices(cursor):
+    """
+    Cria os índices usados nas buscas do sistema, que antes faziam varredura completa:
+    - midias(titulo, ano): UNIQUE, garante a regra de duplicidade e atende a busca por título
+      (trocado por midias(titulo, tipo, ano) na migração 14);
+    - historico(midia_id, data_conclusao) e listas_conteudo(midia_id, nome_lista): índices
+      de cobertura para as consultas e exclusões por mídia.
+    """
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_midias_titulo_ano ON midias(titulo, ano)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_midia ON historico(midia_id, data_conclusao)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listas_midia ON listas_conteudo(midia_id, nome_lista)")
+
+def _migracao_3_listas_unicas(cursor):
+    """
+    Torna (nome_lista, midia_id) único em listas_conteudo, permitindo gravar as listas
+    por delta (INSERT das adições / DELETE das remoções) em vez de regravá-las inteiras.
+    Linhas duplicadas de versões anteriores são descartadas antes da criação do índice.
+    """
+    cursor.execute("""
+        DELETE FROM listas_conteudo WHERE id NOT IN
+        (SELECT MIN(id) FROM listas_conteudo GROUP BY nome_lista, midia_id)
+    """)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_listas_nome_midia ON listas_conteudo(nome_lista, midia_id)")
 
-# Garante que as tabelas existem ao iniciar o módulo
-criar_tabelas()
+def _migracao_4_duracao_historico(cursor):
+    """
+    Guarda a duração concluída de cada registro do histórico, para que os relatórios
+    não precisem reconstruir temporadas e episódios das séries ao carregar o histórico.
+    Registros antigos ficam com NULL e têm a duração calculada sob demanda.
+    """
+    cursor.execute("ALTER TABLE historico ADD COLUMN duracao INTEGER")
+
+def _migracao_5_agregados_series(cursor):
+    """
+    Guarda em midias os totais de episódios de cada série (quantidade, assistidos, avaliados,
+    soma das notas e duração), mantidos por triggers em episodios. Assim a nota média, o status
+    automático e a duração de uma série saem da própria linha, sem carregar seus episódios.
+    """
+    for coluna, tipo in (("ep_total", "INTEGER"), ("ep_assistidos", "INTEGER"), ("ep_avaliados", "INTEGER"),
+                         ("ep_soma_notas", "REAL"), ("ep_duracao", "INTEGER")):
+        cursor.execute(f"ALTER TABLE midias ADD COLUMN {coluna} {tipo} NOT NULL DEFAULT 0")
+
+    # Preenche os totais das séries já existentes
+    cursor.execute("""
+        UPDATE midias SET (ep_total, ep_assistidos, ep_avaliados, ep_soma_notas, ep_duracao) = (
+            SELECT COUNT(e.id), COALESCE(SUM(e.status = 'ASSISTIDO'), 0), COUNT(e.nota),
+                   COALESCE(SUM(e.nota), 0), COALESCE(SUM(e.duracao), 0)
+            FROM temporadas t JOIN episodios e ON e.temporada_id = t.id
+            WHERE t.serie_id = midias.id
+        )
+        WHERE tipo = 'SERIE'
+    """)
+
+    # Mantém os totais a cada inserção, alteração e exclusão de episódio
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_agregados_insert AFTER INSERT ON episodios
+        BEGIN
+            UPDATE midias SET ep_total = ep_total + 1,
+                              ep_assistidos = ep_assistidos + (NEW.status = 'ASSISTIDO'),
+                              ep_avaliados = ep_avaliados + (NEW.nota IS NOT NULL),
+                              ep_soma_notas = ep_soma_notas + COALESCE(NEW.nota, 0),
+                              ep_duracao = ep_duracao + COALESCE(NEW.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_agregados_update AFTER UPDATE ON episodios
+        BEGIN
+            UPDATE midias SET ep_assistidos = ep_assistidos + (NEW.status = 'ASSISTIDO') - (OLD.status = 'ASSISTIDO'),
+                              ep_avaliados = ep_avaliados + (NEW.nota IS NOT NULL) - (OLD.nota IS NOT NULL),
+                              ep_soma_notas = ep_soma_notas + COALESCE(NEW.nota, 0) - COALESCE(OLD.nota, 0),
+                              ep_duracao = ep_duracao + COALESCE(NEW.duracao, 0) - COALESCE(OLD.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_agregados_delete AFTER DELETE ON episodios
+        BEGIN
+            UPDATE midias SET ep_total = ep_total - 1,
+                              ep_assistidos = ep_assistidos - (OLD.status = 'ASSISTIDO'),
+                              ep_avaliados = ep_avaliados - (OLD.nota IS NOT NULL),
+                              ep_soma_notas = ep_soma_notas - COALESCE(OLD.nota, 0),
+                              ep_duracao = ep_duracao - COALESCE(OLD.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = OLD.temporada_id);
+        END
+    """)
+
+def _migracao_6_busca_textual(cursor):
+    """
+    Adiciona o elenco em midias e cria os índices de texto completo (FTS5) sobre
+    título/gênero/elenco das mídias e título dos episódios. As tabelas FTS usam o conteúdo
+    das próprias tabelas (content=...), sem duplicar os textos, e são mantidas por triggers.
+    """
+    cursor.execute("ALTER TABLE midias ADD COLUMN elenco TEXT")
+
+    # remove_diacritics: "acao" encontra "Ação"
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS midias_fts USING fts5(
+            titulo, genero, elenco,
+            content='midias', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS episodios_fts USING fts5(
+            titulo,
+            content='episodios', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+
+    # Sincronização: em tabelas de conteúdo externo, a remoção precisa dos valores antigos
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_midias_fts_insert AFTER INSERT ON midias
+        BEGIN
+            INSERT INTO midias_fts(rowid, titulo, genero, elenco) VALUES (NEW.id, NEW.titulo, NEW.genero, NEW.elenco);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_midias_fts_delete AFTER DELETE ON midias
+        BEGIN
+            INSERT INTO midias_fts(midias_fts, rowid, titulo, genero, elenco)
+            VALUES ('delete', OLD.id, OLD.titulo, OLD.genero, OLD.elenco);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_midias_fts_update AFTER UPDATE OF titulo, genero, elenco ON midias
+        WHEN OLD.titulo IS NOT NEW.titulo OR OLD.genero IS NOT NEW.genero OR OLD.elenco IS NOT NEW.elenco
+        BEGIN
+            INSERT INTO midias_fts(midias_fts, rowid, titulo, genero, elenco)
+            VALUES ('delete', OLD.id, OLD.titulo, OLD.genero, OLD.elenco);
+            INSERT INTO midias_fts(rowid, titulo, genero, elenco) VALUES (NEW.id, NEW.titulo, NEW.genero, NEW.elenco);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_fts_insert AFTER INSERT ON episodios
+        BEGIN
+            INSERT INTO episodios_fts(rowid, titulo) VALUES (NEW.id, NEW.titulo);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_fts_delete AFTER DELETE ON episodios
+        BEGIN
+            INSERT INTO episodios_fts(episodios_fts, rowid, titulo) VALUES ('delete', OLD.id, OLD.titulo);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_fts_update AFTER UPDATE OF titulo ON episodios
+        WHEN OLD.titulo IS NOT NEW.titulo
+        BEGIN
+            INSERT INTO episodios_fts(episodios_fts, rowid, titulo) VALUES ('delete', OLD.id, OLD.titulo);
+            INSERT INTO episodios_fts(rowid, titulo) VALUES (NEW.id, NEW.titulo);
+        END
+    """)
+
+    # Indexa o conteúdo que já existia antes da migração
+    cursor.execute("INSERT INTO midias_fts(midias_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO episodios_fts(episodios_fts) VALUES ('rebuild')")
+
+def _migracao_7_nota_midias(cursor):
+    """
+    Guarda a nota individual dos Filmes (antes ela se perdia ao reiniciar o sistema).
+    Séries continuam calculando a nota a partir dos episódios.
+    """
+    cursor.execute("ALTER TABLE midias ADD COLUMN nota REAL")
+
+def _migracao_8_indice_paginacao(cursor):
+    """
+    Índice de paginação por chave (keyset) do catálogo: ordem alfabética sem diferenciar
+    maiúsculas/minúsculas, com o id como desempate. Cada página é uma busca no índice a partir
+    da última chave exibida, com o mesmo custo em qualquer ponto do catálogo.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_midias_titulo_nocase ON midias(titulo COLLATE NOCASE, id)")
+
+def _migracao_9_progresso_series(cursor):
+    """
+    Guarda em midias o cursor de progresso de cada série: (temporada, episódio) do primeiro
+    episódio não assistido, ou NULL se não houver. É mantido por triggers em episodios, como os
+    totais ep_*: um episódio pendente antes do cursor passa a ser o cursor, e o cursor só é
+    recalculado (a partir da sua temporada) quando o episódio apontado é assistido ou excluído.
+    """
+    cursor.execute("ALTER TABLE midias ADD COLUMN prox_temporada INTEGER")
+    cursor.execute("ALTER TABLE midias ADD COLUMN prox_episodio INTEGER")
+
+    # Primeiro episódio pendente da série a partir da temporada do cursor (ou do início)
+    recalcular = """
+        UPDATE midias SET (prox_temporada, prox_episodio) = (
+            SELECT t.numero, e.numero
+            FROM temporadas t JOIN episodios e ON e.temporada_id = t.id
+            WHERE t.serie_id = midias.id AND t.numero >= COALESCE(midias.prox_temporada, 0)
+              AND e.status IS NOT 'ASSISTIDO'
+            ORDER BY t.numero, e.numero LIMIT 1
+        )
+    """
+    # O episódio pendente NEW vira o cursor se vier antes dele
+    recuar = """
+        UPDATE midias SET prox_temporada = (SELECT numero FROM temporadas WHERE id = NEW.temporada_id),
+                          prox_episodio = NEW.numero
+        WHERE id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id)
+          AND (prox_temporada IS NULL OR (prox_temporada, prox_episodio) >
+               ((SELECT numero FROM temporadas WHERE id = NEW.temporada_id), NEW.numero));
+    """
+
+    # Preenche o cursor das séries já existentes
+    cursor.execute(recalcular + " WHERE tipo = 'SERIE'")
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_progresso_insert AFTER INSERT ON episodios
+        WHEN NEW.status IS NOT 'ASSISTIDO'
+        BEGIN
+            {recuar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_progresso_pendente AFTER UPDATE OF status ON episodios
+        WHEN OLD.status IS 'ASSISTIDO' AND NEW.status IS NOT 'ASSISTIDO'
+        BEGIN
+            {recuar}
+        END
+    """)
+    for nome, evento, linha, condicao in (("assistido", "UPDATE OF status", "NEW",
+                                           "OLD.status IS NOT 'ASSISTIDO' AND NEW.status IS 'ASSISTIDO'"),
+                                          ("delete", "DELETE", "OLD", "OLD.status IS NOT 'ASSISTIDO'")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_episodios_progresso_{nome} AFTER {evento} ON episodios
+            WHEN {condicao}
+            BEGIN
+                {recalcular}
+                WHERE id = (SELECT serie_id FROM temporadas WHERE id = {linha}.temporada_id)
+                  AND prox_temporada = (SELECT numero FROM temporadas WHERE id = {linha}.temporada_id)
+                  AND prox_episodio = {linha}.numero;
+            END
+        """)
+
+# Trechos SQL das triggers de estado por usuário. {ep} é a expressão do id do episódio.
+_SERIE_DO_EPISODIO = "(SELECT t.serie_id FROM episodios e JOIN temporadas t ON t.id = e.temporada_id WHERE e.id = {ep})"
+_TEMPORADA_DO_EPISODIO = "(SELECT t.numero FROM episodios e JOIN temporadas t ON t.id = e.temporada_id WHERE e.id = {ep})"
+
+# Recalcula o cursor das linhas de estado_midias selecionadas pelo WHERE que vier em seguida:
+# primeiro episódio que o usuário não assistiu, a partir da temporada do cursor atual
+_RECALCULAR_PROGRESSO = """
+    UPDATE estado_midias SET (prox_temporada, prox_episodio) = (
+        SELECT t.numero, e.numero
+        FROM temporadas t JOIN episodios e ON e.temporada_id = t.id
+        WHERE t.serie_id = estado_midias.midia_id AND t.numero >= COALESCE(estado_midias.prox_temporada, 0)
+          AND NOT EXISTS (SELECT 1 FROM estado_episodios s WHERE s.usuario_id = estado_midias.usuario_id
+                          AND s.episodio_id = e.id AND s.status = 'ASSISTIDO')
+        ORDER BY t.numero, e.numero LIMIT 1
+    )
+"""
+
+def _migracao_10_usuarios(cursor):
+    """
+    Suporte a vários usuários sobre um catálogo compartilhado:
+    - usuarios: o usuário 1 ('Davi', o antigo usuário fixo) recebe os dados já existentes;
+    - historico e listas_conteudo ganham usuario_id, com índices por (usuário, mídia);
+    - o estado de visualização sai de midias/episodios e passa para estado_midias (status, nota,
+      totais de episódios assistidos/avaliados e cursor de progresso) e estado_episodios
+      (status e nota), uma linha por (usuário, item). Episódio sem linha = não assistido.
+    As triggers das migrações 5 e 9 são refeitas: midias guarda só os totais compartilhados
+    (quantidade e duração dos episódios); os totais e o cursor de cada usuário ficam em estado_midias.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            limite_listas INTEGER
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO usuarios (id, nome) VALUES (1, 'Davi')")
+
+    # Histórico e listas: os registros existentes pertencem ao usuário 1
+    cursor.execute("ALTER TABLE historico ADD COLUMN usuario_id INTEGER NOT NULL DEFAULT 1 REFERENCES usuarios(id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_historico_usuario ON historico(usuario_id, midia_id, data_conclusao)")
+    cursor.execute("ALTER TABLE listas_conteudo ADD COLUMN usuario_id INTEGER NOT NULL DEFAULT 1 REFERENCES usuarios(id)")
+    cursor.execute("DROP INDEX IF EXISTS idx_listas_nome_midia")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_listas_usuario ON listas_conteudo(usuario_id, nome_lista, midia_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listas_usuario_midia ON listas_conteudo(usuario_id, midia_id)")
+
+    # Estado de visualização por usuário (WITHOUT ROWID: a chave é o próprio par usuário/item)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS estado_midias (
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+            midia_id INTEGER NOT NULL REFERENCES midias(id),
+            status TEXT NOT NULL DEFAULT 'NÃO ASSISTIDO',
+            nota REAL,
+            ep_assistidos INTEGER NOT NULL DEFAULT 0,
+            ep_avaliados INTEGER NOT NULL DEFAULT 0,
+            ep_soma_notas REAL NOT NULL DEFAULT 0,
+            prox_temporada INTEGER,
+            prox_episodio INTEGER,
+            PRIMARY KEY (usuario_id, midia_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_estado_midias_midia ON estado_midias(midia_id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS estado_episodios (
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+            episodio_id INTEGER NOT NULL REFERENCES episodios(id),
+            status TEXT NOT NULL DEFAULT 'NÃO ASSISTIDO',
+            nota REAL,
+            PRIMARY KEY (usuario_id, episodio_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_estado_episodios_episodio ON estado_episodios(episodio_id)")
+
+    # Copia o estado atual para o usuário 1 (antes das triggers, que somariam tudo de novo)
+    cursor.execute("""
+        INSERT INTO estado_midias (usuario_id, midia_id, status, nota, ep_assistidos, ep_avaliados,
+                                   ep_soma_notas, prox_temporada, prox_episodio)
+        SELECT 1, id, COALESCE(status, 'NÃO ASSISTIDO'), nota, ep_assistidos, ep_avaliados,
+               ep_soma_notas, prox_temporada, prox_episodio
+        FROM midias
+    """)
+    cursor.execute("""
+        INSERT INTO estado_episodios (usuario_id, episodio_id, status, nota)
+        SELECT 1, id, COALESCE(status, 'NÃO ASSISTIDO'), nota FROM episodios
+        WHERE status IS NOT 'NÃO ASSISTIDO' OR nota IS NOT NULL
+    """)
+
+    # Remove as triggers e colunas do estado compartilhado
+    for trigger in ("agregados_insert", "agregados_update", "agregados_delete",
+                    "progresso_insert", "progresso_pendente", "progresso_assistido", "progresso_delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_episodios_{trigger}")
+    for coluna in ("status", "nota", "ep_assistidos", "ep_avaliados", "ep_soma_notas",
+                   "prox_temporada", "prox_episodio"):
+        cursor.execute(f"ALTER TABLE midias DROP COLUMN {coluna}")
+    for coluna in ("status", "nota"):
+        cursor.execute(f"ALTER TABLE episodios DROP COLUMN {coluna}")
+
+    # Toda mídia tem uma linha de estado para cada usuário (e vice-versa)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_midias_estado_insert AFTER INSERT ON midias
+        BEGIN
+            INSERT INTO estado_midias (usuario_id, midia_id) SELECT id, NEW.id FROM usuarios;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_midias_estado_delete AFTER DELETE ON midias
+        BEGIN
+            DELETE FROM estado_midias WHERE midia_id = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_usuarios_estado_insert AFTER INSERT ON usuarios
+        BEGIN
+            INSERT INTO estado_midias (usuario_id, midia_id) SELECT NEW.id, id FROM midias;
+            {_RECALCULAR_PROGRESSO}
+            WHERE usuario_id = NEW.id AND midia_id IN (SELECT id FROM midias WHERE tipo = 'SERIE');
+        END
+    """)
+
+    # Totais compartilhados (quantidade e duração) e cursores de todos os usuários
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_totais_insert AFTER INSERT ON episodios
+        BEGIN
+            UPDATE midias SET ep_total = ep_total + 1, ep_duracao = ep_duracao + COALESCE(NEW.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id);
+            -- Episódio novo ainda não foi assistido por ninguém
+            UPDATE estado_midias SET prox_temporada = (SELECT numero FROM temporadas WHERE id = NEW.temporada_id),
+                                     prox_episodio = NEW.numero
+            WHERE midia_id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id)
+              AND (prox_temporada IS NULL OR (prox_temporada, prox_episodio) >
+                   ((SELECT numero FROM temporadas WHERE id = NEW.temporada_id), NEW.numero));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_totais_update AFTER UPDATE OF duracao ON episodios
+        BEGIN
+            UPDATE midias SET ep_duracao = ep_duracao + COALESCE(NEW.duracao, 0) - COALESCE(OLD.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = NEW.temporada_id);
+        END
+    """)
+    # Antes de excluir o episódio, remove o estado de cada usuário (as triggers de estado_episodios
+    # ainda encontram a série do episódio e descontam os totais)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_estado_delete BEFORE DELETE ON episodios
+        BEGIN
+            DELETE FROM estado_episodios WHERE episodio_id = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_episodios_totais_delete AFTER DELETE ON episodios
+        BEGIN
+            UPDATE midias SET ep_total = ep_total - 1, ep_duracao = ep_duracao - COALESCE(OLD.duracao, 0)
+            WHERE id = (SELECT serie_id FROM temporadas WHERE id = OLD.temporada_id);
+            {_RECALCULAR_PROGRESSO}
+            WHERE midia_id = (SELECT serie_id FROM temporadas WHERE id = OLD.temporada_id)
+              AND prox_temporada = (SELECT numero FROM temporadas WHERE id = OLD.temporada_id)
+              AND prox_episodio = OLD.numero;
+        END
+    """)
+
+    # Totais e cursor de UM usuário, a cada mudança no seu estado de episódio
+    serie = _SERIE_DO_EPISODIO.format(ep="{linha}.episodio_id")
+    temporada = _TEMPORADA_DO_EPISODIO.format(ep="{linha}.episodio_id")
+    numero = "(SELECT numero FROM episodios WHERE id = {linha}.episodio_id)"
+    somar = """
+        UPDATE estado_midias SET ep_assistidos = ep_assistidos {sinal} ({linha}.status = 'ASSISTIDO'),
+                                 ep_avaliados = ep_avaliados {sinal} ({linha}.nota IS NOT NULL),
+                                 ep_soma_notas = ep_soma_notas {sinal} COALESCE({linha}.nota, 0)
+        WHERE usuario_id = {linha}.usuario_id AND midia_id = """ + serie + ";"
+    # Episódio que voltou a ficar pendente vira o cursor se vier antes dele
+    recuar = """
+        UPDATE estado_midias SET prox_temporada = """ + temporada + """, prox_episodio = """ + numero + """
+        WHERE {condicao} AND usuario_id = {linha}.usuario_id AND midia_id = """ + serie + """
+          AND (prox_temporada IS NULL OR (prox_temporada, prox_episodio) > (""" + temporada + ", " + numero + "));"
+    # Episódio do cursor foi assistido: o cursor avança
+    avancar = _RECALCULAR_PROGRESSO + """
+        WHERE {condicao} AND usuario_id = {linha}.usuario_id AND midia_id = """ + serie + """
+          AND prox_temporada = """ + temporada + " AND prox_episodio = " + numero + ";"
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estado_episodios_insert AFTER INSERT ON estado_episodios
+        BEGIN
+            {somar.format(sinal="+", linha="NEW")}
+            {avancar.format(condicao="NEW.status = 'ASSISTIDO'", linha="NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estado_episodios_update AFTER UPDATE ON estado_episodios
+        BEGIN
+            {somar.format(sinal="-", linha="OLD")}
+            {somar.format(sinal="+", linha="NEW")}
+            {recuar.format(condicao="OLD.status = 'ASSISTIDO' AND NEW.status != 'ASSISTIDO'", linha="NEW")}
+            {avancar.format(condicao="OLD.status != 'ASSISTIDO' AND NEW.status = 'ASSISTIDO'", linha="NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estado_episodios_delete AFTER DELETE ON estado_episodios
+        BEGIN
+            {somar.format(sinal="-", linha="OLD")}
+            {recuar.format(condicao="OLD.status = 'ASSISTIDO'", linha="OLD")}
+        END
+    """)
+
+def _migracao_11_contador_alteracoes(cursor):
+    """
+    Contador de alterações do banco, usado para validar o snapshot do catálogo (ver src/snapshot.py):
+    triggers o incrementam a cada linha inserida, alterada ou excluída nas tabelas lidas na carga
+    (mídias, estado, histórico, listas e usuários), seja pelo programa ou por qualquer outro cliente.
+    O identificador aleatório distingue este banco de outro arquivo com o mesmo contador.
+    (PRAGMA data_version não serve: ele só vale dentro de uma mesma conexão.)
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS controle_alteracoes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            banco_id TEXT NOT NULL,
+            contador INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO controle_alteracoes (id, banco_id) VALUES (1, lower(hex(randomblob(8))))")
+    for tabela in ("midias", "estado_midias", "historico", "listas_conteudo", "usuarios"):
+        for operacao in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_alteracao_{operacao.lower()} AFTER {operacao} ON {tabela}
+                BEGIN
+                    UPDATE controle_alteracoes SET contador = contador + 1 WHERE id = 1;
+                END
+            """)
+
+# Tabelas dependentes de midias (e de usuarios), refeitas pela migração 12 com ON DELETE CASCADE.
+# A ordem das colunas é a dos bancos existentes; {tabela} é o nome da tabela a criar.
+_TABELAS_EM_CASCATA = {
+    "temporadas": """
+        CREATE TABLE {tabela} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            serie_id INTEGER REFERENCES midias(id) ON DELETE CASCADE,
+            numero INTEGER NOT NULL,
+            UNIQUE(serie_id, numero)
+        )
+    """,
+    "episodios": """
+        CREATE TABLE {tabela} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            temporada_id INTEGER REFERENCES temporadas(id) ON DELETE CASCADE,
+            numero INTEGER NOT NULL,
+            titulo TEXT,
+            duracao INTEGER,
+            UNIQUE(temporada_id, numero)
+        )
+    """,
+    "historico": """
+        CREATE TABLE {tabela} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            midia_id INTEGER REFERENCES midias(id) ON DELETE CASCADE,
+            data_conclusao TEXT,
+            duracao INTEGER,
+            usuario_id INTEGER NOT NULL DEFAULT 1 REFERENCES usuarios(id) ON DELETE CASCADE
+        )
+    """,
+    "listas_conteudo": """
+        CREATE TABLE {tabela} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome_lista TEXT NOT NULL,
+            midia_id INTEGER REFERENCES midias(id) ON DELETE CASCADE,
+            usuario_id INTEGER NOT NULL DEFAULT 1 REFERENCES usuarios(id) ON DELETE CASCADE
+        )
+    """,
+    "estado_midias": """
+        CREATE TABLE {tabela} (
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+            midia_id INTEGER NOT NULL REFERENCES midias(id) ON DELETE CASCADE,
+            status TEXT NOT NULL DEFAULT 'NÃO ASSISTIDO',
+            nota REAL,
+            ep_assistidos INTEGER NOT NULL DEFAULT 0,
+            ep_avaliados INTEGER NOT NULL DEFAULT 0,
+            ep_soma_notas REAL NOT NULL DEFAULT 0,
+            prox_temporada INTEGER,
+            prox_episodio INTEGER,
+            PRIMARY KEY (usuario_id, midia_id)
+        ) WITHOUT ROWID
+    """,
+    "estado_episodios": """
+        CREATE TABLE {tabela} (
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+            episodio_id INTEGER NOT NULL REFERENCES episodios(id) ON DELETE CASCADE,
+            status TEXT NOT NULL DEFAULT 'NÃO ASSISTIDO',
+            nota REAL,
+            PRIMARY KEY (usuario_id, episodio_id)
+        ) WITHOUT ROWID
+    """,
+}
+
+def _reconstruir_tabela(cursor, tabela, criacao):
+    """
+    Refaz uma tabela com uma nova definição (o SQLite não altera restrições com ALTER TABLE):
+    cria a nova, copia as linhas, troca uma pela outra e recria seus índices e triggers.
+    Requer foreign_keys desligado (ver aplicar_migracoes).
+    """
+    dependentes = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (tabela,)).fetchall()
+    sequencia = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabela,)).fetchone()
+
+    nova = f"{tabela}_nova"
+    cursor.execute(criacao.format(tabela=nova))
+    existentes = {coluna[1] for coluna in cursor.execute(f"PRAGMA table_info({tabela})")}
+    colunas = ", ".join(coluna[1] for coluna in cursor.execute(f"PRAGMA table_info({nova})")
+                        if coluna[1] in existentes)
+    cursor.execute(f"INSERT INTO {nova} ({colunas}) SELECT {colunas} FROM {tabela}")
+    cursor.execute(f"DROP TABLE {tabela}")
+    # Sem o modo legado, o RENAME validaria as triggers das outras tabelas, que ainda citam
+    # a tabela excluída (ex.: as de estado_episodios citam episodios) e falharia
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    cursor.execute(f"ALTER TABLE {nova} RENAME TO {tabela}")
+    cursor.execute("PRAGMA legacy_alter_table = OFF")
+    for (sql,) in dependentes:
+        cursor.execute(sql)
+    # Preserva o maior id já usado (AUTOINCREMENT não reaproveita ids de linhas excluídas)
+    if sequencia is not None:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequencia[0], tabela))
+
+def _migracao_12_exclusao_em_cascata(cursor):
+    """
+    Chaves estrangeiras com ON DELETE CASCADE (e PRAGMA foreign_keys=ON em cada conexão, ver
+    src/conexao.py): excluir uma mídia remove, no próprio SQLite, suas temporadas, episódios,
+    o estado de cada usuário, o histórico e as entradas das listas, sem um DELETE por tabela.
+    Linhas órfãs deixadas pelas exclusões antigas (ex.: listas_conteudo) são removidas antes,
+    e as tabelas dependentes são refeitas, com os mesmos índices e triggers.
+    """
+    orfaos = (("temporadas", "serie_id", "midias"), ("episodios", "temporada_id", "temporadas"),
+              ("estado_episodios", "episodio_id", "episodios"), ("estado_episodios", "usuario_id", "usuarios"),
+              ("estado_midias", "midia_id", "midias"), ("estado_midias", "usuario_id", "usuarios"),
+              ("historico", "midia_id", "midias"), ("historico", "usuario_id", "usuarios"),
+              ("listas_conteudo", "midia_id", "midias"), ("listas_conteudo", "usuario_id", "usuarios"))
+    for tabela, coluna, pai in orfaos:
+        cursor.execute(f"DELETE FROM {tabela} WHERE {coluna} NOT IN (SELECT id FROM {pai})")
+
+    for tabela, criacao in _TABELAS_EM_CASCATA.items():
+        _reconstruir_tabela(cursor, tabela, criacao)
+
+    # O estado das mídias agora sai pela cascata
+    cursor.execute("DROP TRIGGER IF EXISTS trg_midias_estado_delete")
+
+    violacoes = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if violacoes:
+        raise sqlite3.IntegrityError(f"{len(violacoes)} linhas sem registro correspondente (ex.: {violacoes[0]})")
+
+def _migracao_13_posicao_listas(cursor):
+    """
+    Guarda a posição de cada mídia na sua lista personalizada, para que a ordem escolhida pelo
+    usuário (ListaPersonalizada.mover) sobreviva ao reinício. As linhas existentes mantêm a ordem
+    de inclusão (posição = id); uma trigger coloca cada linha nova no fim da lista, inclusive as
+    gravadas pela importação ou por outro cliente, e o índice atende o MAX e a leitura em ordem.
+    """
+    cursor.execute("ALTER TABLE listas_conteudo ADD COLUMN posicao INTEGER")
+    cursor.execute("UPDATE listas_conteudo SET posicao = id")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listas_posicao ON listas_conteudo(usuario_id, nome_lista, posicao)")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_listas_conteudo_posicao AFTER INSERT ON listas_conteudo
+        WHEN NEW.posicao IS NULL
+        BEGIN
+            UPDATE listas_conteudo SET posicao = (
+                SELECT COALESCE(MAX(posicao), -1) + 1 FROM listas_conteudo
+                WHERE usuario_id = NEW.usuario_id AND nome_lista = NEW.nome_lista
+            )
+            WHERE id = NEW.id;
+        END
+    """)
+
+def _migracao_14_chave_titulo_tipo_ano(cursor):
+    """
+    A regra de duplicidade passa a ser (título, tipo, ano), a mesma identidade de Midia.chave:
+    um filme e uma série de mesmo título e ano são mídias diferentes. O índice UNIQUE(titulo, ano)
+    é refeito sobre as três colunas; os dados existentes já o satisfazem, pois a regra antiga era mais estrita.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_midias_titulo_ano")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_midias_titulo_tipo_ano ON midias(titulo, tipo, ano)")
+
+# Lista ordenada de migrações: (versão, descrição, função)
+MIGRACOES = [
+    (1, "Tabelas base", _migracao_1_tabelas_base),
+    (2, "Índices de busca por título e por mídia", _migracao_2_indices),
+    (3, "Conteúdo de listas único por (lista, mídia)", _migracao_3_listas_unicas),
+    (4, "Duração concluída no histórico", _migracao_4_duracao_historico),
+    (5, "Totais de episódios por série", _migracao_5_agregados_series),
+    (6, "Elenco e busca textual (FTS5)", _migracao_6_busca_textual),
+    (7, "Nota dos filmes", _migracao_7_nota_midias),
+    (8, "Índice de paginação do catálogo", _migracao_8_indice_paginacao),
+    (9, "Cursor de progresso das séries", _migracao_9_progresso_series),
+    (10, "Usuários e estado de visualização por usuário", _migracao_10_usuarios),
+    (11, "Contador de alterações (validação do snapshot)", _migracao_11_contador_alteracoes),
+    (12, "Exclusão em cascata pelas chaves estrangeiras", _migracao_12_exclusao_em_cascata),
+    (13, "Posição das mídias nas listas", _migracao_13_posicao_listas),
+    (14, "Mídias únicas por (título, tipo, ano)", _migracao_14_chave_titulo_tipo_ano),
+]
+
+# Versão do esquema esperada por este código
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+
+def versao_esquema(conn):
+    """Retorna a versão do esquema gravada no banco (0 para bancos nunca migrados)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def aplicar_migracoes(conn):
+    """
+    Aplica, em ordem, as migrações ainda não aplicadas no banco.
+    Cada migração roda em sua própria transação junto com a atualização do user_version,
+    de modo que uma falha não deixa o esquema pela metade.
+    As chaves estrangeiras ficam desligadas durante as migrações: refazer uma tabela (DROP TABLE)
+    com elas ligadas excluiria em cascata as linhas das tabelas dependentes.
+
+    Returns:
+        int: A versão do esquema após as migrações.
+    """
+    versao_atual = versao_esquema(conn)
+    if versao_atual >= VERSAO_ESQUEMA:
+        return versao_atual
+
+    # foreign_keys não muda dentro de uma transação: é desligado antes da primeira
+    chaves_estrangeiras = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for versao, descricao, migracao in MIGRACOES:
+            if versao <= versao_atual:
+                continue
+            try:
+                conn.execute("BEGIN")
+                migracao(conn.cursor())
+                # PRAGMA não aceita parâmetros; a versão é um inteiro definido no código
+                conn.execute(f"PRAGMA user_version = {int(versao)}")
+                conn.commit()
+                versao_atual = versao
+            except sqlite3.Error as e:
+                conn.rollback()
+                raise sqlite3.DatabaseError(f"Falha na migração {versao} ({descricao}): {e}") from e
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {int(chaves_estrangeiras)}")
+
+    return versao_atual
+
+def criar_tabelas():
+    """
+    Garante que o banco está na versão de esquema atual, criando as tabelas
+    e aplicando as migrações pendentes. Feito automaticamente pela primeira get_conn()
+    de cada arquivo; chamá-la explicitamente apenas antecipa a verificação.
+    """
+    get_conn()
 
 # ----------------------------------------------------
 # 2. ROTINA DE SEED (DADOS DE TESTE)
@@ -105,22 +836,26 @@ def rotina_seed():
     try:
         # --- A. FILME DE TESTE (CONCLUÍDO) ---
         cursor.execute("""
-            INSERT INTO midias (titulo, tipo, genero, ano, duracao, status)
-            VALUES (?, 'FILME', ?, ?, ?, ?)
-        """, ('Parasita', 'Drama/Suspense', 2019, 132, 'ASSISTIDO'))
+            INSERT INTO midias (titulo, tipo, genero, ano, duracao)
+            VALUES (?, 'FILME', ?, ?, ?)
+        """, ('Parasita', 'Drama/Suspense', 2019, 132))
         filme_parasita_id = cursor.lastrowid 
+        cursor.execute("UPDATE estado_midias SET status = 'ASSISTIDO' WHERE usuario_id = ? AND midia_id = ?",
+                       (USUARIO_ID, filme_parasita_id))
 
         # Adiciona o filme ao Histórico (Essencial para o Relatório de Tempo)
         hoje = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute("INSERT INTO historico (midia_id, data_conclusao) VALUES (?, ?)", 
-                       (filme_parasita_id, hoje))
+        cursor.execute("INSERT INTO historico (usuario_id, midia_id, data_conclusao) VALUES (?, ?, ?)", 
+                       (USUARIO_ID, filme_parasita_id, hoje))
 
         # --- B. SÉRIE DE TESTE (EM ANDAMENTO) ---
         cursor.execute("""
-            INSERT INTO midias (titulo, tipo, genero, ano, duracao, status)
-            VALUES (?, 'SERIE', ?, ?, ?, ?)
-        """, ('Stranger Things', 'Sci-Fi', 2016, 0, 'ASSISTINDO'))
+            INSERT INTO midias (titulo, tipo, genero, ano, duracao)
+            VALUES (?, 'SERIE', ?, ?, ?)
+        """, ('Stranger Things', 'Sci-Fi', 2016, 0))
         serie_st_id = cursor.lastrowid
+        cursor.execute("UPDATE estado_midias SET status = 'ASSISTINDO' WHERE usuario_id = ? AND midia_id = ?",
+                       (USUARIO_ID, serie_st_id))
 
         # Temporada 1 da Série
         cursor.execute("INSERT INTO temporadas (serie_id, numero) VALUES (?, ?)",
@@ -129,14 +864,18 @@ def rotina_seed():
 
         # Episódio 1 (ASSISTIDO e AVALIADO)
         cursor.execute("""
-            INSERT INTO episodios (temporada_id, numero, titulo, duracao, nota, status)
-            VALUES (?, 1, 'O Desaparecimento de Will Byers', 49, 9.2, 'ASSISTIDO')
+            INSERT INTO episodios (temporada_id, numero, titulo, duracao)
+            VALUES (?, 1, 'O Desaparecimento de Will Byers', 49)
         """, (temp1_st_id,))
+        cursor.execute("""
+            INSERT INTO estado_episodios (usuario_id, episodio_id, status, nota)
+            VALUES (?, ?, 'ASSISTIDO', 9.2)
+        """, (USUARIO_ID, cursor.lastrowid))
         
-        # Episódio 2 (NÃO ASSISTIDO)
+        # Episódio 2 (NÃO ASSISTIDO: sem linha de estado)
         cursor.execute("""
-            INSERT INTO episodios (temporada_id, numero, titulo, duracao, nota, status)
-            VALUES (?, 2, 'A Estranha da Rua Maple', 50, NULL, 'NÃO ASSISTIDO')
+            INSERT INTO episodios (temporada_id, numero, titulo, duracao)
+            VALUES (?, 2, 'A Estranha da Rua Maple', 50)
         """, (temp1_st_id,))
         
         conn.commit()
@@ -145,9 +884,6 @@ def rotina_seed():
     except sqlite3.Error as e:
         print(f"Erro no SQLite durante o seed (pode ser duplicidade se rodou 2x): {e}")
         conn.rollback()
-    
-    finally:
-        conn.close()
 
 # Descomente e execute esta linha UMA VEZ para popular o banco de dados para testes
 # rotina_seed()
@@ -158,102 +894,190 @@ def rotina_seed():
 
 # Necessário que as classes de modelos.py estejam importadas no topo.
 
-def carregar_catalogo():
+def entrar_usuario(nome):
+    """
+    Seleciona o usuário cujos dados serão lidos e gravados a partir de agora, criando-o se
+    ainda não existir. O catálogo (mídias, temporadas, episódios) é compartilhado; status,
+    notas, progresso, histórico e listas pertencem a cada usuário.
+
+    Returns:
+        tuple: (usuario_id, nome, limite_listas), com limite_listas None quando o usuário
+               usa o padrão LIMITE_LISTAS_PERSONALIZADAS do settings.json.
+    """
+    global USUARIO_ID
+    consulta = "SELECT id, nome, limite_listas FROM usuarios WHERE nome = ?"
+    usuario = get_conn().execute(consulta, (nome,)).fetchone()
+    if usuario is None:
+        with transacao() as conn:
+            # O trigger trg_usuarios_estado_insert cria o estado inicial do novo usuário
+            conn.execute("INSERT INTO usuarios (nome) VALUES (?)", (nome,))
+            usuario = conn.execute(consulta, (nome,)).fetchone()
+    USUARIO_ID = usuario[0]
+    return usuario
+
+def listar_usuarios():
+    """Retorna os usuários cadastrados como tuplas (id, nome), em ordem alfabética."""
+    return get_conn().execute("SELECT id, nome FROM usuarios ORDER BY nome").fetchall()
+
+#Linhas das listas lidas junto com o catálogo (DB_NAME, USUARIO_ID, linhas), usadas em seguida por
+#carregar_listas_personalizadas para não consultar o banco de novo
+_LISTAS_CARREGADAS = None
+
+def _ler_imagem_catalogo():
     """
-    Carrega todos os dados do SQLite e reconstrói a hierarquia de objetos de POO.
+    Linhas a partir das quais o catálogo do usuário atual é montado: {'midias', 'historico', 'listas'}.
+    Vêm do snapshot (src/snapshot.py) quando ele corresponde ao contador de alterações atual do banco,
+    sem nenhuma consulta de carga; senão, do SQLite, e um novo snapshot é gravado para a próxima vez.
     """
+    usar_snapshot = SETTINGS.get('USAR_SNAPSHOT', True)
     conn = get_conn()
-    cursor = conn.cursor()
+    # O contador é lido ANTES das linhas: se algo for gravado no meio da leitura, o snapshot fica
+    # marcado com o contador antigo e será apenas descartado, nunca aceito com dados velhos
+    banco_id, contador = conn.execute("SELECT banco_id, contador FROM controle_alteracoes").fetchone()
+    caminho = caminho_snapshot(DB_NAME, USUARIO_ID)
+    if usar_snapshot:
+        with PERFIL.etapa("leitura do snapshot"):
+            imagem = ler_snapshot(caminho, VERSAO_ESQUEMA, USUARIO_ID, banco_id, contador)
+        if imagem is not None:
+            return imagem
+
+    with PERFIL.etapa("consulta de mídias"):
+        midias = conn.execute("""
+            SELECT m.id, m.titulo, m.tipo, m.genero, m.ano, m.classificacao, m.duracao,
+                   COALESCE(s.status, 'NÃO ASSISTIDO'), m.elenco, s.nota,
+                   COALESCE(s.ep_soma_notas, 0), COALESCE(s.ep_avaliados, 0), COALESCE(s.ep_assistidos, 0),
+                   m.ep_total, m.ep_duracao, s.prox_temporada, s.prox_episodio
+            FROM midias m
+            LEFT JOIN estado_midias s ON s.usuario_id = ? AND s.midia_id = m.id
+        """, (USUARIO_ID,)).fetchall()
+    with PERFIL.etapa("consulta do histórico"):
+        historico = conn.execute("""
+            SELECT id, midia_id, data_conclusao, duracao FROM historico
+            WHERE usuario_id = ? ORDER BY data_conclusao
+        """, (USUARIO_ID,)).fetchall()
+    with PERFIL.etapa("consulta das listas"):
+        listas = conn.execute("""
+            SELECT nome_lista, midia_id FROM listas_conteudo WHERE usuario_id = ? ORDER BY nome_lista, posicao
+        """, (USUARIO_ID,)).fetchall()
+
+    imagem = {'midias': midias, 'historico': historico, 'listas': listas}
+    if usar_snapshot:
+        with PERFIL.etapa("gravação do snapshot"):
+            gravar_snapshot(caminho, VERSAO_ESQUEMA, USUARIO_ID, banco_id, contador, imagem)
+    return imagem
+
+def atualizar_snapshot():
+    """
+    Regrava o snapshot do usuário atual se o banco mudou desde o último (ex.: ao encerrar, depois
+    de salvar), para que a próxima inicialização já o encontre em dia.
+    """
+    if SETTINGS.get('USAR_SNAPSHOT', True):
+        _ler_imagem_catalogo()
+
+def carregar_catalogo():
+    """
+    Carrega as mídias e o histórico e reconstrói os objetos de POO: do snapshot do catálogo,
+    se ele estiver em dia com o banco, ou do SQLite (ver _ler_imagem_catalogo).
+    As temporadas e episódios de cada Série NÃO são lidos aqui: cada Série recebe um
+    carregador e busca sua composição no banco apenas quando ela for necessária;
+    até lá, os totais de episódios (nota média, status, duração) vêm das colunas ep_* de midias
+    (compartilhados) e de estado_midias (do usuário atual, USUARIO_ID).
+    """
+    global _LISTAS_CARREGADAS
+    imagem = _ler_imagem_catalogo()
+    _LISTAS_CARREGADAS = (DB_NAME, USUARIO_ID, imagem['listas'])
 
-    # Dicionários para armazenar e facilitar a reconstrução
-    episodios_por_temp = {}
-    temporadas_por_serie = {}
-    
     midias_catalogo = {} # Dicionário final de todas as Midias (Filmes e Séries)
     historico_items = []
     
     # ----------------------------------------------------
-    # 1. CARREGAR EPISÓDIOS
+    # 1. RECONSTRUIR MÍDIAS (Filmes e Séries)
     # ----------------------------------------------------
-    cursor.execute("SELECT id, temporada_id, numero, titulo, duracao, nota, status FROM episodios")
-    for row in cursor.fetchall():
-        ep_id, temp_id, numero, titulo, duracao, nota, status = row
+    with PERFIL.etapa("construção das mídias"):
+        for row in imagem['midias']:
+            midia_id, titulo, tipo, genero, ano, classificacao, duracao, status, elenco, nota = row[:10]
+            elenco = _texto_para_elenco(elenco)
         
-        # Cria a instância do objeto Episodio
-        # Nota: É crucial que o __init__ do Episodio seja capaz de receber os dados brutos.
-        episodio = Episodio(numero, titulo, duracao, None, nota, status)
-        
-        # Agrupa os episódios pelo ID da temporada
-        if temp_id not in episodios_por_temp:
-            episodios_por_temp[temp_id] = []
-        episodios_por_temp[temp_id].append(episodio)
-
-    # ----------------------------------------------------
-    # 2. CARREGAR TEMPORADAS
-    # ----------------------------------------------------
-    cursor.execute("SELECT id, serie_id, numero FROM temporadas")
-    for row in cursor.fetchall():
-        temp_id, serie_id, numero = row
-        
-        # Cria a instância do objeto Temporada
-        temporada = Temporada(numero) 
-        
-        # Adiciona os episódios reconstruídos à temporada
-        if temp_id in episodios_por_temp:
-            for episodio in episodios_por_temp[temp_id]:
-                temporada.adicionar_episodio(episodio) # Usa o método de Composição
-                
-        # Agrupa as temporadas pelo ID da série
-        if serie_id not in temporadas_por_serie:
-            temporadas_por_serie[serie_id] = []
-        temporadas_por_serie[serie_id].append(temporada)
-        
-    # ----------------------------------------------------
-    # 3. CARREGAR MÍDIAS (Filmes e Séries)
-    # ----------------------------------------------------
-    cursor.execute("SELECT id, titulo, tipo, genero, ano, classificacao, duracao, status FROM midias")
-    for row in cursor.fetchall():
-        midia_id, titulo, tipo, genero, ano, classificacao, duracao, status = row
-        
-        # Reconstrução de Séries
-        if tipo == 'SERIE':
-            serie = Serie(titulo, genero, ano, classificacao, [])
-            serie.status = status
+            # Reconstrução de Séries
+            if tipo == 'SERIE':
+                serie = Serie(titulo, genero, ano, classificacao, elenco)
+                serie.status = status
             
-            # Adiciona as temporadas reconstruídas à série
-            if midia_id in temporadas_por_serie:
-                for temporada in temporadas_por_serie[midia_id]:
-                    serie.adicionar_temporada(temporada) # Usa o método de Composição
+                # As temporadas serão carregadas sob demanda (ver carregar_temporadas_serie)
+                serie.definir_carregador(partial(carregar_temporadas_serie, midia_id))
+                serie.definir_agregados(AgregadosEpisodios(*row[10:15]))
+                prox_temporada, prox_episodio = row[15:]
+                serie.definir_progresso((prox_temporada, prox_episodio) if prox_temporada is not None else None)
             
-            midias_catalogo[midia_id] = serie
+                serie.id = midia_id
+                serie.marcar_salvo() # Recém-carregada: nada a gravar
+                midias_catalogo[midia_id] = serie
             
-        # Reconstrução de Filmes
-        elif tipo == 'FILME':
-            # Nota: O construtor do Filme precisa do parâmetro 'status' que você já definiu.
-            filme = Filme(titulo, genero, ano, classificacao, [], duracao, status, None) # nota é None
-            midias_catalogo[midia_id] = filme
+            # Reconstrução de Filmes
+            elif tipo == 'FILME':
+                # Nota: O construtor do Filme precisa do parâmetro 'status' que você já definiu.
+                filme = Filme(titulo, genero, ano, classificacao, elenco, duracao, status, nota)
+                filme.id = midia_id
+                filme.marcar_salvo() # Recém-carregado: nada a gravar
+                midias_catalogo[midia_id] = filme
             
     # ----------------------------------------------------
-    # 4. CARREGAR HISTÓRICO
+    # 2. RECONSTRUIR HISTÓRICO
     # ----------------------------------------------------
-    cursor.execute("SELECT midia_id, data_conclusao FROM historico")
-    for midia_id, data_conclusao_str in cursor.fetchall():
-        # Converte a string de volta para objeto datetime
-        data_conclusao = datetime.strptime(data_conclusao_str, '%Y-%m-%d %H:%M:%S')
+    with PERFIL.etapa("construção do histórico"):
+        for item_id, midia_id, data_conclusao_str, duracao in imagem['historico']:
+            # Converte a string de volta para objeto datetime ('AAAA-MM-DD HH:MM:SS' é ISO 8601;
+            # fromisoformat é bem mais rápido que strptime, o que pesa em históricos longos)
+            data_conclusao = datetime.fromisoformat(data_conclusao_str)
         
-        # Associa o item de histórico ao objeto Midia reconstruído
-        if midia_id in midias_catalogo:
-            midia_obj = midias_catalogo[midia_id]
-            
-            # Cria a instância do HistoricoItem
-            historico_item = HistoricoItem(midia_obj, data_conclusao)
-            historico_items.append(historico_item)
+            # Associa o item de histórico ao objeto Midia reconstruído
+            if midia_id in midias_catalogo:
+                midia_obj = midias_catalogo[midia_id]
             
-    conn.close()
+                # Cria a instância do HistoricoItem
+                historico_item = HistoricoItem(midia_obj, data_conclusao, duracao)
+                historico_item.id = item_id
+                historico_items.append(historico_item)
     
     # Retornar o catálogo reconstruído e o histórico para a aplicação principal
     return midias_catalogo, historico_items
 
+def carregar_temporadas_serie(serie_id):
+    """
+    Carrega do SQLite as Temporadas (com seus Episódios) de UMA série.
+    Usada como carregador sob demanda das Séries criadas em carregar_catalogo().
+
+    Returns:
+        list: Objetos Temporada já marcados como salvos.
+    """
+    conn = get_conn()
+    cursor = conn.cursor()
+
+    # Uma única consulta, ordenada pelos índices UNIQUE(serie_id, numero) e UNIQUE(temporada_id, numero)
+    # O estado (status/nota) de cada episódio é o do usuário atual; sem linha = não assistido
+    cursor.execute("""
+        SELECT t.id, t.numero, e.numero, e.titulo, e.duracao, s.nota, COALESCE(s.status, 'NÃO ASSISTIDO')
+        FROM temporadas t
+        LEFT JOIN episodios e ON e.temporada_id = t.id
+        LEFT JOIN estado_episodios s ON s.usuario_id = ? AND s.episodio_id = e.id
+        WHERE t.serie_id = ?
+        ORDER BY t.numero, e.numero
+    """, (USUARIO_ID, serie_id))
+
+    temporadas = {}
+    for temp_id, num_temp, num_ep, titulo, duracao, nota, status in cursor.fetchall():
+        if num_temp not in temporadas:
+            temporadas[num_temp] = Temporada(num_temp)
+            temporadas[num_temp].id = temp_id
+
+        # LEFT JOIN: temporadas sem episódios vêm com as colunas do episódio nulas
+        if num_ep is not None:
+            temporadas[num_temp].adicionar_episodio(Episodio(num_ep, titulo, duracao, None, nota, status))
+
+    for temporada in temporadas.values():
+        temporada.marcar_salvo() # Recém-carregada: nada a gravar
+    return list(temporadas.values())
+
 # NOTA: O carregamento de Usuário e Listas Personalizadas seria feito em paralelo,
 # mas esta função já cobre a complexidade da estrutura de Mídias/Composição.
 
@@ -261,10 +1085,84 @@ def carregar_catalogo():
 
 # ... (restante das funções e imports) ...
 
+def pagina_catalogo(apos=None, antes=None, tamanho=20, tipo=None, status=None, genero=None):
+    """
+    Retorna uma página do catálogo em ordem alfabética por paginação de chave (keyset):
+    em vez de OFFSET, a consulta parte da chave (titulo, id) da borda da página atual,
+    usando o índice idx_midias_titulo_nocase. Os filtros são aplicados no próprio SQL.
+
+    Args:
+        apos: Chave (titulo, id) da última linha exibida: retorna a página seguinte.
+              Para saltar para uma letra, use (letra, 0).
+        antes: Chave (titulo, id) da primeira linha exibida: retorna a página anterior.
+        (sem apos/antes: primeira página)
+
+    Returns:
+        tuple: (linhas, ha_anterior, ha_proxima), com linhas = [(id, titulo, tipo, ano, genero, status)].
+    """
+    condicoes = []
+    parametros = []
+    for coluna, valor in (("m.tipo", tipo), ("COALESCE(s.status, 'NÃO ASSISTIDO')", status), ("m.genero", genero)):
+        if valor is not None:
+            condicoes.append(f"{coluna} = ?")
+            parametros.append(valor)
+
+    def consulta(chave, direcao, limite):
+        # A forma "titulo >= ? AND (titulo > ? OR id > ?)" permite ao SQLite buscar direto no índice
+        maior, ordem = (">", "ASC") if direcao == "proxima" else ("<", "DESC")
+        filtros = list(condicoes)
+        valores = list(parametros)
+        if chave is not None:
+            filtros.append(f"m.titulo {maior}= ? COLLATE NOCASE AND (m.titulo {maior} ? COLLATE NOCASE OR m.id {maior} ?)")
+            valores += [chave[0], chave[0], chave[1]]
+        where = ("WHERE " + " AND ".join(filtros)) if filtros else ""
+        # O status é o do usuário atual (busca pela chave primária de estado_midias)
+        return conn.execute(f"""
+            SELECT m.id, m.titulo, m.tipo, m.ano, m.genero, COALESCE(s.status, 'NÃO ASSISTIDO')
+            FROM midias m LEFT JOIN estado_midias s ON s.usuario_id = ? AND s.midia_id = m.id {where}
+            ORDER BY m.titulo COLLATE NOCASE {ordem}, m.id {ordem} LIMIT ?
+        """, [USUARIO_ID] + valores + [limite]).fetchall()
+
+    conn = get_conn()
+    if antes is not None:
+        # Página anterior: busca para trás e inverte; a página seguinte existe (é a atual)
+        linhas = consulta(antes, "anterior", tamanho + 1)
+        ha_anterior = len(linhas) > tamanho
+        linhas = linhas[:tamanho][::-1]
+        ha_proxima = True
+    else:
+        linhas = consulta(apos, "proxima", tamanho + 1)
+        ha_proxima = len(linhas) > tamanho
+        linhas = linhas[:tamanho]
+        ha_anterior = bool(linhas) and bool(consulta((linhas[0][1], linhas[0][0]), "anterior", 1))
+    return linhas, ha_anterior, ha_proxima
+
+def carregar_armazem_episodios():
+    """
+    Lê todos os episódios do banco em um ArmazemEpisodios (colunas contíguas), sem criar
+    objetos Serie/Temporada/Episodio. As linhas vêm ordenadas por série, temporada e número,
+    como o armazém exige, e são consumidas do cursor sem materializar a consulta inteira.
+    """
+    armazem = ArmazemEpisodios()
+    conn = get_conn()
+    cursor = conn.execute("""
+        SELECT m.id, m.genero, t.numero, e.numero, e.duracao, s.nota, COALESCE(s.status, 'NÃO ASSISTIDO')
+        FROM episodios e
+        JOIN temporadas t ON t.id = e.temporada_id
+        JOIN midias m ON m.id = t.serie_id
+        LEFT JOIN estado_episodios s ON s.usuario_id = ? AND s.episodio_id = e.id
+        ORDER BY m.id, t.numero, e.numero
+    """, (USUARIO_ID,))
+    for serie_id, genero, num_temp, num_ep, duracao, nota, status in cursor:
+        armazem.adicionar(serie_id, genero, num_temp, num_ep, duracao, nota, status)
+    return armazem
+
 def gerar_relatorio_tempo_assistido(historico: list, periodo: str = 'mes'):
     """
     Calcula o tempo total assistido (em minutos e horas) no período especificado.
     O período pode ser 'semana' ou 'mes' (ou datas específicas, se o CLI filtrar).
+    Para intervalos arbitrários e quebras por dia/semana/mês/gênero sem reler todo o
+    histórico a cada chamada, use src.relatorios.MotorRelatorios.
     
     Args:
         historico (list): Lista de objetos HistoricoItem.
@@ -295,10 +1193,8 @@ def gerar_relatorio_tempo_assistido(historico: list, periodo: str = 'mes'):
             total_minutos += item.duracao_concluida
 
     # 4. Conversão para Horas (Requisito: Conversão de tempo total em horas )
-    # O multiplicador de duração pode vir do settings.json (multiplicador para min -> horas [cite: 40])
-    
-    # Para fins da Entrega 3, assumimos o multiplicador padrão (60 minutos por hora)
-    multiplicador_horas = 60 
+    # O multiplicador de duração vem do settings.json (multiplicador para min -> horas)
+    multiplicador_horas = SETTINGS.get('MULTIPLICADOR_MIN_PARA_HORAS', 60)
     total_horas = total_minutos / multiplicador_horas
     
     # O arredondamento é configurável (Requisito: arredondamento configurável )
@@ -310,214 +1206,768 @@ def salvar_midia(midia_obj):
     """
     Persiste (INSERT ou UPDATE) um objeto Midia (Filme/Serie) e seus detalhes
     no banco de dados SQLite.
+
+    Returns:
+        bool: True se a mídia foi gravada; False se a transação falhou (e foi revertida).
     """
-    conn = get_conn()
-    cursor = conn.cursor()
+    novos_ids = [] # (objeto, id) gerados nesta transação; aplicados só após o commit
     
     try:
-        # 1. BUSCA O ID: Garante que o objeto seja vinculado ao registro correto no banco
-        cursor.execute("SELECT id FROM midias WHERE titulo = ? AND ano = ?", 
-                       (midia_obj.titulo, midia_obj.ano))
-        midia_id_result = cursor.fetchone()
-        
-        if midia_id_result:
-            # --- RAMO DE UPDATE (Mídia Existente) ---
-            midia_id = midia_id_result[0]
+        # Confirma a transação no arquivo .db ao sair do bloco (ou reverte em caso de erro)
+        with transacao() as conn:
+            cursor = conn.cursor()
+            # 1. BUSCA O ID: usa a chave primária guardada no objeto (ou o índice de título para objetos novos)
+            midia_id = _buscar_id_midia(cursor, midia_obj)
             
-            # ATUALIZAÇÃO CRUCIAL: Salva o status consolidado da série (ex: 'ASSISTINDO')
-            cursor.execute("""
-                UPDATE midias 
-                SET status = ?, genero = ?, classificacao = ?, duracao = ?
-                WHERE id = ?
-            """, (midia_obj.status, midia_obj._genero, midia_obj._classificacao, 
-                  midia_obj._duracao, midia_id))
-            
-            # Atualiza ou Insere novos elementos da composição (Temporadas/Episódios)
-            if midia_obj._tipo == 'SERIE':
-                _atualizar_composicao_serie(cursor, midia_obj, midia_id)
+            if midia_id is not None:
+                # --- RAMO DE UPDATE (Mídia Existente) ---
+                _atualizar_midia(cursor, midia_obj, midia_id)
                 
-            print(f"✅ Banco: '{midia_obj.titulo}' atualizado com sucesso.")
+                # Atualiza ou Insere novos elementos da composição (Temporadas/Episódios)
+                if midia_obj._tipo == 'SERIE':
+                    _atualizar_composicao_serie(cursor, midia_obj, midia_id, novos_ids)
+                mensagem = f"✅ Banco: '{midia_obj.titulo}' atualizado com sucesso."
 
-        else:
-            # --- RAMO DE INSERT (Nova Mídia) ---
-            cursor.execute("""
-                INSERT INTO midias (titulo, tipo, genero, ano, classificacao, duracao, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (midia_obj.titulo, midia_obj._tipo, midia_obj._genero, midia_obj.ano, 
-                  midia_obj._classificacao, midia_obj._duracao, midia_obj.status))
-            
-            midia_id = cursor.lastrowid
+            else:
+                # --- RAMO DE INSERT (Nova Mídia) ---
+                midia_id = _inserir_midia(cursor, midia_obj)
 
-            if midia_obj._tipo == 'SERIE':
-                _inserir_composicao_serie(cursor, midia_obj, midia_id)
-                
-            print(f"🚀 Banco: '{midia_obj.titulo}' inserido com sucesso.")
+                if midia_obj._tipo == 'SERIE':
+                    _inserir_composicao_serie(cursor, midia_obj, midia_id, novos_ids)
+                mensagem = f"🚀 Banco: '{midia_obj.titulo}' inserido com sucesso."
             
-        conn.commit() # Confirma a transação no arquivo .db
+        print(mensagem)
+        midia_obj.id = midia_id
+        _aplicar_novos_ids(novos_ids)
+        midia_obj.marcar_salvo()
+        return True
         
     except sqlite3.Error as e:
         print(f"❌ Erro ao salvar dados no SQLite: {e}")
-        conn.rollback() # Reverte em caso de erro para evitar dados corrompidos
-        
-    finally:
-        conn.close()
+        return False
+
+def _buscar_id_midia(cursor, midia_obj):
+    """
+    Retorna o id da mídia no banco: a chave primária guardada no objeto ou, para objetos
+    que ainda não a conhecem, a busca pelo índice UNIQUE(titulo, tipo, ano). None se não existir.
+    """
+    if midia_obj.id is not None:
+        return midia_obj.id
+
+    cursor.execute("SELECT id FROM midias WHERE titulo = ? AND tipo = ? AND ano = ?",
+                   (midia_obj.titulo, midia_obj._tipo, midia_obj.ano))
+    midia_id_result = cursor.fetchone()
+    return midia_id_result[0] if midia_id_result else None
+
+def _inserir_midia(cursor, midia_obj):
+    """Função auxiliar que insere a linha da mídia (e o estado do usuário atual) e retorna o id gerado."""
+    cursor.execute("""
+        INSERT INTO midias (titulo, tipo, genero, ano, classificacao, duracao, elenco)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (midia_obj.titulo, midia_obj._tipo, midia_obj._genero, midia_obj.ano, 
+          midia_obj._classificacao, midia_obj._duracao, _elenco_para_texto(midia_obj)))
+    midia_id = cursor.lastrowid
+    _gravar_estado_midias(cursor, [(midia_obj, midia_id)])
+    return midia_id
+
+def _atualizar_midia(cursor, midia_obj, midia_id):
+    """Função auxiliar que atualiza a linha da mídia pela chave primária."""
+    cursor.execute("""
+        UPDATE midias 
+        SET titulo = ?, ano = ?, genero = ?, classificacao = ?, duracao = ?, elenco = ?
+        WHERE id = ?
+    """, (midia_obj.titulo, midia_obj.ano, midia_obj._genero,
+          midia_obj._classificacao, midia_obj._duracao, _elenco_para_texto(midia_obj), midia_id))
+    # ATUALIZAÇÃO CRUCIAL: Salva o status consolidado da série (ex: 'ASSISTINDO') para o usuário atual
+    _gravar_estado_midias(cursor, [(midia_obj, midia_id)])
+
+def _gravar_estado_midias(cursor, midias_com_id):
+    """Função auxiliar que grava status e nota das mídias para o usuário atual (UPSERT em estado_midias)."""
+    cursor.executemany("""
+        INSERT INTO estado_midias (usuario_id, midia_id, status, nota) VALUES (?, ?, ?, ?)
+        ON CONFLICT(usuario_id, midia_id) DO UPDATE SET status = excluded.status, nota = excluded.nota
+    """, [(USUARIO_ID, midia_id, midia.status, _nota_midia(midia)) for midia, midia_id in midias_com_id])
+
+def _gravar_episodios(cursor, linhas):
+    """
+    Função auxiliar que grava episódios a partir de linhas (temporada_id, numero, titulo, duracao, nota, status):
+    a linha compartilhada em episodios (inserida se ainda não existir) e o estado do usuário atual
+    (ver _gravar_estado_episodios).
+    """
+    linhas = list(linhas)
+    cursor.executemany("""
+        INSERT INTO episodios (temporada_id, numero, titulo, duracao) VALUES (?, ?, ?, ?)
+        ON CONFLICT(temporada_id, numero) DO NOTHING
+    """, [linha[:4] for linha in linhas])
+    _gravar_estado_episodios(cursor, linhas)
+
+def _gravar_estado_episodios(cursor, linhas):
+    """
+    Função auxiliar que grava status e nota dos episódios para o usuário atual. estado_episodios
+    é esparsa: episódio sem linha = não assistido e sem nota. Estados não padrão usam UPSERT pela
+    chave (usuario_id, episodio_id); voltar ao padrão apaga a linha (os triggers ajustam os agregados).
+    """
+    cursor.executemany("""
+        INSERT INTO estado_episodios (usuario_id, episodio_id, status, nota)
+        SELECT ?, id, ?, ? FROM episodios WHERE temporada_id = ? AND numero = ?
+        ON CONFLICT(usuario_id, episodio_id) DO UPDATE SET status = excluded.status, nota = excluded.nota
+    """, [(USUARIO_ID, status, nota, temp_id, numero) for temp_id, numero, _, _, nota, status in linhas
+          if status != "NÃO ASSISTIDO" or nota is not None])
+    cursor.executemany("""
+        DELETE FROM estado_episodios WHERE usuario_id = ?
+            AND episodio_id = (SELECT id FROM episodios WHERE temporada_id = ? AND numero = ?)
+    """, [(USUARIO_ID, temp_id, numero) for temp_id, numero, _, _, nota, status in linhas
+          if status == "NÃO ASSISTIDO" and nota is None])
 
-def _inserir_composicao_serie(cursor, serie_obj, serie_id):
+def _nota_midia(midia_obj):
+    """Função auxiliar: apenas Filmes têm nota própria (a da Série vem dos episódios)."""
+    return midia_obj.nota if isinstance(midia_obj, Filme) else None
+
+def _elenco_para_texto(midia_obj):
+    """Função auxiliar: o elenco (lista de nomes) é gravado como texto separado por vírgulas."""
+    return ", ".join(midia_obj._elenco) if midia_obj._elenco else None
+
+def _texto_para_elenco(texto):
+    """Função auxiliar inversa de _elenco_para_texto."""
+    return [nome.strip() for nome in texto.split(",") if nome.strip()] if texto else []
+
+def _aplicar_novos_ids(novos_ids):
+    """Guarda nos objetos os ids gerados pela transação (chamada somente após o commit)."""
+    for objeto, novo_id in novos_ids:
+        objeto.id = novo_id
+
+def _inserir_composicao_serie(cursor, serie_obj, serie_id, novos_ids):
     """Função auxiliar para inserir Temporadas e Episódios de uma nova Série."""
     for temporada in serie_obj._temporadas.values():
         # INSERT Temporada
         cursor.execute("INSERT INTO temporadas (serie_id, numero) VALUES (?, ?)",
                        (serie_id, temporada.numero))
         temp_id = cursor.lastrowid
+        novos_ids.append((temporada, temp_id))
         
         # INSERT Episódios
-        for episodio in temporada._episodios.values():
-            cursor.execute("""
-                INSERT INTO episodios (temporada_id, numero, titulo, duracao, nota, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (temp_id, episodio.numero, episodio._titulo, episodio.duracao, episodio.nota, episodio.status))
+        _gravar_episodios(cursor, [(temp_id, episodio.numero, episodio._titulo, episodio.duracao,
+                                    episodio.nota, episodio.status)
+                                   for episodio in temporada._episodios.values()])
 
-def _atualizar_composicao_serie(cursor, serie_obj, serie_id):
+def _atualizar_composicao_serie(cursor, serie_obj, serie_id, novos_ids):
     """
     Função auxiliar que lida com a atualização de episódios existentes 
     E a inserção de temporadas novas em séries já cadastradas.
+    Apenas as temporadas e episódios marcados como alterados são gravados.
     """
-    for temporada in serie_obj._temporadas.values():
-        # Verifica se esta temporada específica já existe no banco
-        cursor.execute("SELECT id FROM temporadas WHERE serie_id = ? AND numero = ?",
-                       (serie_id, temporada.numero))
-        temp_id_result = cursor.fetchone()
-        
-        if temp_id_result:
-            # TEMPORADA EXISTE: Apenas atualiza status/notas dos episódios
-            temp_id = temp_id_result[0]
-            for episodio in temporada._episodios.values():
-                cursor.execute("""
-                    UPDATE episodios SET status = ?, nota = ?
-                    WHERE temporada_id = ? AND numero = ?
-                """, (episodio.status, episodio.nota, temp_id, episodio.numero))
-        else:
-            # TEMPORADA NOVA: Insere a temporada e todos os seus episódios
-            cursor.execute("INSERT INTO temporadas (serie_id, numero) VALUES (?, ?)",
-                           (serie_id, temporada.numero))
-            nova_temp_id = cursor.lastrowid
-            
-            for episodio in temporada._episodios.values():
-                cursor.execute("""
-                    INSERT INTO episodios (temporada_id, numero, titulo, duracao, nota, status)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (nova_temp_id, episodio.numero, episodio._titulo, 
-                      episodio.duracao, episodio.nota, episodio.status))
+    _gravar_episodios(cursor, _linhas_episodios_alterados(cursor, serie_obj, serie_id, novos_ids))
+
+def _linhas_episodios_alterados(cursor, serie_obj, serie_id, novos_ids):
+    """
+    Gera as linhas (temporada_id, numero, titulo, duracao, nota, status) dos episódios
+    alterados de uma série, inserindo as temporadas novas no caminho.
+    Os episódios são localizados pela chave UNIQUE(temporada_id, numero).
+    """
+    for temporada in serie_obj._temporadas_alteradas:
+        temp_id = temporada.id
+        if temp_id is None:
+            temp_id = _obter_id_temporada(cursor, serie_id, temporada.numero)
+            novos_ids.append((temporada, temp_id))
+
+        # Temporada nova: todos os episódios; temporada existente: só os alterados
+        episodios = temporada._episodios.values() if temporada._alterado else temporada._episodios_alterados
+        for episodio in episodios:
+            yield (temp_id, episodio.numero, episodio._titulo,
+                   episodio.duracao, episodio.nota, episodio.status)
+
+def _obter_id_temporada(cursor, serie_id, numero):
+    """Busca o ID da temporada pelo índice UNIQUE(serie_id, numero), inserindo-a se ainda não existir."""
+    cursor.execute("SELECT id FROM temporadas WHERE serie_id = ? AND numero = ?", (serie_id, numero))
+    temp_id_result = cursor.fetchone()
+    if temp_id_result:
+        return temp_id_result[0]
+
+    cursor.execute("INSERT INTO temporadas (serie_id, numero) VALUES (?, ?)", (serie_id, numero))
+    return cursor.lastrowid
                 
 def salvar_listas_usuario(usuario_obj):
-    """Percorre as listas personalizadas do usuário e salva no SQLite."""
-    conn = get_conn()
-    cursor = conn.cursor()
+    """
+    Percorre as listas personalizadas do usuário e grava no SQLite apenas
+    o delta de cada lista (mídias adicionadas e removidas desde o último salvamento).
+    """
     try:
-        # Limpa as listas antigas para evitar duplicatas ao salvar novamente
-        cursor.execute("DELETE FROM listas_conteudo")
-        
-        for nome_lista, lista_obj in usuario_obj.listas.items():
-            for midia in lista_obj._midias:
-                # Busca o ID da mídia para salvar a referência
-                cursor.execute("SELECT id FROM midias WHERE titulo = ?", (midia.titulo,))
-                res = cursor.fetchone()
-                if res:
-                    midia_id = res[0]
-                    cursor.execute("""
-                        INSERT INTO listas_conteudo (nome_lista, midia_id) 
-                        VALUES (?, ?)
-                    """, (nome_lista, midia_id))
-
-        conn.commit()
+        with transacao() as conn:
+            listas_gravadas = _gravar_listas(conn.cursor(), usuario_obj)
+        for lista_obj in listas_gravadas:
+            lista_obj.marcar_salvo()
 
     except sqlite3.Error as e:
         print(f"Erro ao salvar listas: {e}")
-    finally:
-        conn.close()
 
 def salvar_historico_usuario(usuario_obj):
     """
     Percorre a lista de objetos HistoricoItem do usuário 
-    e persiste no banco de dados.
+    e persiste no banco de dados apenas os itens ainda não gravados (append-only).
     """
-    conn = get_conn()
-    cursor = conn.cursor()
+    novos_ids = []
     
     try:
-        # Limpamos o histórico antigo para evitar duplicatas (ou use uma lógica de UPSERT)
-        cursor.execute("DELETE FROM historico")
-        
-        for item in usuario_obj._historico:
-            # Precisamos do ID da mídia no banco para criar a relação
-            cursor.execute("SELECT id FROM midias WHERE titulo = ?", (item.midia.titulo,))
-            res = cursor.fetchone()
-            
-            if res:
-                midia_id = res[0]
-                # item.data_conclusao é um objeto datetime, o SQLite aceita como string
-                cursor.execute("""
-                    INSERT INTO historico (midia_id, data_conclusao)
-                    VALUES (?, ?)
-                """, (midia_id, item.data_conclusao.strftime('%Y-%m-%d %H:%M:%S')))
-        
-        conn.commit()
+        with transacao() as conn:
+            _gravar_historico(conn.cursor(), usuario_obj, novos_ids)
+        _aplicar_novos_ids(novos_ids)
     except sqlite3.Error as e:
         print(f"❌ Erro ao salvar histórico: {e}")
-    finally:
-        conn.close()
+
+def registrar_item_historico(item):
+    """
+    Grava imediatamente UM HistoricoItem recém-criado por Usuario.adicionar_ao_historico().
+    Se a mídia ainda não existir no banco, o item fica pendente e será gravado
+    no próximo salvamento do histórico.
+
+    Returns:
+        bool: True se o item está gravado no banco.
+    """
+    if item.id is not None:
+        return True
+
+    try:
+        with transacao() as conn:
+            item_id = _inserir_item_historico(conn.cursor(), item)
+        if item_id is not None:
+            item.id = item_id
+        return item_id is not None
+    except sqlite3.Error as e:
+        print(f"❌ Erro ao registrar histórico: {e}")
+        return False
+
+def _inserir_item_historico(cursor, item):
+    """Função auxiliar que insere um HistoricoItem e retorna o id gerado (None se a mídia não está no banco)."""
+    midia_id = _buscar_id_midia(cursor, item.midia)
+    if midia_id is None:
+        return None
+
+    # item.data_conclusao é um objeto datetime, o SQLite aceita como string
+    cursor.execute("INSERT INTO historico (usuario_id, midia_id, data_conclusao, duracao) VALUES (?, ?, ?, ?)",
+                   (USUARIO_ID, midia_id, item.data_conclusao.strftime('%Y-%m-%d %H:%M:%S'), item.duracao_concluida))
+    return cursor.lastrowid
+
+# ----------------------------------------------------
+# 4. PERSISTÊNCIA EM LOTE (UMA CONEXÃO, UMA TRANSAÇÃO)
+# ----------------------------------------------------
+
+def salvar_catalogo_completo(midias, usuario_obj=None, avisar=True):
+    """
+    Persiste as mídias alteradas do catálogo (e apenas as temporadas/episódios alterados)
+    e, se informado, o histórico e as listas do usuário usando UMA conexão e UMA transação.
+    As escritas são feitas em lote com executemany, evitando um commit (e um fsync)
+    por título como acontece ao chamar salvar_midia() em laço.
+
+    Args:
+        midias (iterable): Objetos Filme/Serie a serem persistidos.
+        usuario_obj (Usuario): Usuário cujas listas e histórico serão salvos (opcional).
+        avisar (bool): Se False, não imprime a confirmação (salvamento automático em segundo plano).
+
+    Returns:
+        bool: True se a transação foi confirmada, False em caso de erro.
+    """
+    # Somente as mídias com alterações pendentes são gravadas
+    midias = [midia for midia in midias if midia.alterado]
+    novos_ids = [] # (objeto, id) gerados nesta transação; aplicados só após o commit
+
+    try:
+        # Um único commit para todo o catálogo, ao sair do bloco
+        with transacao() as conn:
+            cursor = conn.cursor()
+            midias_com_id = _gravar_midias_em_lote(cursor, midias, novos_ids)
+            _gravar_composicao_em_lote(cursor, midias_com_id, novos_ids)
+
+            listas_gravadas = []
+            if usuario_obj is not None:
+                _gravar_historico(cursor, usuario_obj, novos_ids)
+                listas_gravadas = _gravar_listas(cursor, usuario_obj)
+
+        _aplicar_novos_ids(novos_ids)
+        for midia in midias:
+            midia.marcar_salvo()
+        for lista_obj in listas_gravadas:
+            lista_obj.marcar_salvo()
+        if avisar:
+            print(f"✅ Banco: {len(midias)} mídias alteradas salvas em uma única transação.")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Erro ao salvar o catálogo no SQLite: {e}")
+        return False
+
+def _gravar_midias_em_lote(cursor, midias, novos_ids):
+    """
+    Função auxiliar que grava as linhas das mídias: as já persistidas são atualizadas pela
+    chave primária com um único executemany; as novas são inseridas uma a uma (dentro da
+    mesma transação) para capturar o id gerado.
+
+    Returns:
+        list: Pares (midia, midia_id) de todas as mídias gravadas.
+    """
+    midias_com_id = []
+    atualizacoes = []
+    for midia in midias:
+        midia_id = _buscar_id_midia(cursor, midia)
+        if midia_id is None:
+            midia_id = _inserir_midia(cursor, midia)
+        else:
+            atualizacoes.append((midia.titulo, midia.ano, midia._genero,
+                                 midia._classificacao, midia._duracao, _elenco_para_texto(midia), midia_id))
+        if midia.id is None:
+            novos_ids.append((midia, midia_id))
+        midias_com_id.append((midia, midia_id))
+
+    cursor.executemany("""
+        UPDATE midias 
+        SET titulo = ?, ano = ?, genero = ?, classificacao = ?, duracao = ?, elenco = ?
+        WHERE id = ?
+    """, atualizacoes)
+    _gravar_estado_midias(cursor, midias_com_id)
+
+    return midias_com_id
+
+def _gravar_composicao_em_lote(cursor, midias_com_id, novos_ids):
+    """
+    Função auxiliar que grava as Temporadas e Episódios alterados de todas as séries em lote.
+    Temporadas novas são inseridas; episódios novos são inseridos e o status e a nota do
+    usuário atual são gravados por UPSERT em estado_episodios (ver _gravar_episodios).
+    """
+    episodios = []
+    for midia, midia_id in midias_com_id:
+        if midia._tipo == 'SERIE':
+            episodios.extend(_linhas_episodios_alterados(cursor, midia, midia_id, novos_ids))
+
+    _gravar_episodios(cursor, episodios)
+
+def _gravar_historico(cursor, usuario_obj, novos_ids):
+    """
+    Função auxiliar append-only: insere apenas os HistoricoItem ainda sem id.
+    Os registros já gravados nunca são reescritos.
+    """
+    for item in usuario_obj._historico:
+        if item.id is None:
+            item_id = _inserir_item_historico(cursor, item)
+            if item_id is not None:
+                novos_ids.append((item, item_id))
+
+def _gravar_listas(cursor, usuario_obj):
+    """
+    Função auxiliar que grava o delta das listas personalizadas: um executemany de DELETE
+    para as remoções e outro de INSERT para as adições (que entram no fim da lista, pela trigger
+    da migração 13). Nas listas reordenadas, a posição de todas as mídias é regravada.
+
+    Returns:
+        list: As listas cujo delta foi gravado (para serem marcadas como salvas após o commit).
+    """
+    remocoes = []
+    adicoes = []
+    posicoes = []
+    listas_gravadas = []
+    for nome_lista, lista_obj in usuario_obj.listas.items():
+        if not lista_obj.alterada:
+            continue
+        for midia in lista_obj._remocoes:
+            midia_id = _buscar_id_midia(cursor, midia)
+            if midia_id is not None:
+                remocoes.append((USUARIO_ID, nome_lista, midia_id))
+        for midia in lista_obj._adicoes:
+            midia_id = _buscar_id_midia(cursor, midia)
+            if midia_id is not None:
+                adicoes.append((USUARIO_ID, nome_lista, midia_id))
+        if lista_obj._reordenada:
+            for posicao, midia in enumerate(lista_obj):
+                midia_id = _buscar_id_midia(cursor, midia)
+                if midia_id is not None:
+                    posicoes.append((posicao, USUARIO_ID, nome_lista, midia_id))
+        listas_gravadas.append(lista_obj)
+
+    cursor.executemany("DELETE FROM listas_conteudo WHERE usuario_id = ? AND nome_lista = ? AND midia_id = ?", remocoes)
+    cursor.executemany("INSERT OR IGNORE INTO listas_conteudo (usuario_id, nome_lista, midia_id) VALUES (?, ?, ?)",
+                       adicoes)
+    # Depois das inclusões, para que as mídias recém-adicionadas também fiquem na posição escolhida
+    cursor.executemany("UPDATE listas_conteudo SET posicao = ? WHERE usuario_id = ? AND nome_lista = ? AND midia_id = ?",
+                       posicoes)
+    return listas_gravadas
 
 def carregar_listas_personalizadas(usuario_obj, midias_catalogo):
-    """Lê a tabela listas_conteudo e preenche o objeto Usuario."""
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute("SELECT nome_lista, midia_id FROM listas_conteudo")
+    """
+    Lê as listas do usuário atual em listas_conteudo e preenche o objeto Usuario.
+    Logo após carregar_catalogo(), usa as linhas lidas junto com o catálogo (do snapshot ou do banco).
+    """
+    global _LISTAS_CARREGADAS
+    if _LISTAS_CARREGADAS is not None and _LISTAS_CARREGADAS[:2] == (DB_NAME, USUARIO_ID):
+        linhas = _LISTAS_CARREGADAS[2]
+    else:
+        linhas = get_conn().execute("""
+            SELECT nome_lista, midia_id FROM listas_conteudo WHERE usuario_id = ? ORDER BY nome_lista, posicao
+        """, (USUARIO_ID,)).fetchall()
+    _LISTAS_CARREGADAS = None
     
-    for nome_lista, midia_id in cursor.fetchall():
+    # Agrupa as mídias de cada lista (na ordem gravada) para incluí-las de uma vez
+    por_lista = {}
+    for nome_lista, midia_id in linhas:
+        midias_lista = por_lista.setdefault(nome_lista, [])
+        if midia_id in midias_catalogo:
+            midias_lista.append(midias_catalogo[midia_id])
+
+    for nome_lista, midias_lista in por_lista.items():
         if nome_lista not in usuario_obj.listas:
             usuario_obj.criar_lista(nome_lista)
-        
-        if midia_id in midias_catalogo:
-            midia_obj = midias_catalogo[midia_id]
-            usuario_obj.listas[nome_lista].adicionar_midia(midia_obj)
-    conn.close()
+        usuario_obj.listas[nome_lista].adicionar_midias(midias_lista)
+
+    # O conteúdo recém-carregado já está no banco: nenhum delta pendente
+    for lista_obj in usuario_obj.listas.values():
+        lista_obj.marcar_salvo()
     
-def excluir_midia_do_banco(titulo, ano):
+def excluir_midia_do_banco(titulo, ano, tipo):
     """
-    Remove a mídia e todas as suas dependências (temporadas/episódios/histórico) do SQLite.
+    Remove a mídia e todas as suas dependências (temporadas/episódios/estado/histórico/listas)
+    do SQLite, localizando-a pelo índice UNIQUE(titulo, tipo, ano).
+    Quando o id da mídia é conhecido, prefira excluir_midia_por_id().
+    """
+    res = get_conn().execute("SELECT id FROM midias WHERE titulo = ? AND tipo = ? AND ano = ?",
+                             (titulo, tipo, ano)).fetchone()
+
+    if res:
+        return excluir_midia_por_id(res[0])
+    return False
+
+def excluir_midia_por_id(midia_id):
+    """
+    Remove a mídia (pela chave primária) e todas as suas dependências
+    (temporadas/episódios/estado/histórico/listas) do SQLite.
+    """
+    return excluir_midias([midia_id]) > 0
+
+def excluir_midias(midias_ids):
+    """
+    Remove várias mídias (pelas chaves primárias) em UMA transação, com um único executemany:
+    temporadas, episódios, o estado de cada usuário, o histórico e as entradas das listas
+    saem junto, pelas chaves estrangeiras ON DELETE CASCADE (migração 12).
+
+    Returns:
+        int: Quantidade de mídias removidas (0 em caso de erro; nada é removido).
     """
-    conn = get_conn()
-    cursor = conn.cursor()
     try:
-        # 1. Busca o ID da mídia para localizar as dependências
-        cursor.execute("SELECT id FROM midias WHERE titulo = ? AND ano = ?", (titulo, ano))
-        res = cursor.fetchone()
-        
-        if res:
-            midia_id = res[0]
-            
-            # 2. Deletar episódios vinculados às temporadas desta série
-            cursor.execute("""
-                DELETE FROM episodios WHERE temporada_id IN 
-                (SELECT id FROM temporadas WHERE serie_id = ?)
-            """, (midia_id,))
-            
-            # 3. Deletar temporadas
-            cursor.execute("DELETE FROM temporadas WHERE serie_id = ?", (midia_id,))
-            
-            # 4. Deletar registros no histórico
-            cursor.execute("DELETE FROM historico WHERE midia_id = ?", (midia_id,))
-            
-            # 5. Deletar a mídia principal
-            cursor.execute("DELETE FROM midias WHERE id = ?", (midia_id,))
-            
-            conn.commit()
-            return True
-        return False
+        with transacao() as conn:
+            cursor = conn.executemany("DELETE FROM midias WHERE id = ?", ((int(midia_id),) for midia_id in midias_ids))
+            removidas = cursor.rowcount # Soma das linhas de midias (sem as excluídas em cascata)
+        return removidas
         
     except sqlite3.Error as e:
         print(f"❌ Erro ao excluir no banco de dados: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
\ No newline at end of file
+        return 0
+
+# ----------------------------------------------------
+# 5. BUSCA TEXTUAL (FTS5)
+# ----------------------------------------------------
+
+def _consulta_fts(texto):
+    """
+    Função auxiliar que converte o texto digitado em uma consulta FTS5 segura:
+    cada palavra vira um termo entre aspas com busca por prefixo ("stran"* encontra "Stranger"),
+    e todas as palavras precisam aparecer (AND implícito).
+    """
+    termos = [termo.replace('"', '""') for termo in texto.split()]
+    return " ".join(f'"{termo}"*' for termo in termos if termo)
+
+def buscar_texto(texto, limite=20):
+    """
+    Busca textual ranqueada (BM25) em título, gênero e elenco das mídias e no título dos
+    episódios, direto no banco, sem carregar o catálogo.
+    Na ordenação, o título pesa mais que o elenco, que pesa mais que o gênero.
+
+    Returns:
+        tuple: (midias, episodios), em ordem de relevância, onde
+               midias = [(midia_id, titulo, tipo, ano, genero)] e
+               episodios = [(serie_id, titulo_serie, numero_temporada, numero_episodio, titulo_episodio)].
+    """
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return [], []
+
+    conn = get_conn()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT m.id, m.titulo, m.tipo, m.ano, m.genero
+            FROM midias_fts JOIN midias m ON m.id = midias_fts.rowid
+            WHERE midias_fts MATCH ?
+            ORDER BY bm25(midias_fts, 10.0, 2.0, 5.0)
+            LIMIT ?
+        """, (consulta, limite))
+        midias = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT m.id, m.titulo, t.numero, e.numero, e.titulo
+            FROM episodios_fts
+            JOIN episodios e ON e.id = episodios_fts.rowid
+            JOIN temporadas t ON t.id = e.temporada_id
+            JOIN midias m ON m.id = t.serie_id
+            WHERE episodios_fts MATCH ?
+            ORDER BY bm25(episodios_fts)
+            LIMIT ?
+        """, (consulta, limite))
+        episodios = cursor.fetchall()
+
+        return midias, episodios
+
+    except sqlite3.Error as e:
+        print(f"❌ Erro na busca textual: {e}")
+        return [], []
+
+# ----------------------------------------------------
+# 6. IMPORTAÇÃO EM LOTE (ver src/importacao.py)
+# ----------------------------------------------------
+# Os registros chegam já validados pelos setters dos modelos, como tuplas simples:
+#   ("FILME", titulo, genero, ano, classificacao, duracao, status, nota, elenco)
+#   ("SERIE", titulo, genero, ano, classificacao, status, elenco)
+#   ("TEMPORADA", titulo_serie, ano_serie, numero)
+#   ("EPISODIO", titulo_serie, ano_serie, temporada, numero, titulo, duracao, nota, status)
+#   ("HISTORICO", titulo, ano, data_conclusao, duracao)
+#   ("LISTA", nome_lista, titulo, ano)
+
+def gravar_registros_importados(cursor, registros, ids_series, ids_temporadas, ids_midias):
+    """
+    Grava um lote de registros importados no cursor informado (a transação é do chamador).
+    Mídias já existentes (mesmo título, tipo e ano) são atualizadas, sem nunca trocar o tipo: um filme
+    e uma série de mesmo título e ano são mídias distintas. Episódios usam UPSERT.
+    ids_series, ids_temporadas e ids_midias são caches compartilhados entre lotes, evitando
+    buscar a mesma série/temporada/mídia no banco a cada episódio ou registro de histórico.
+    Histórico e listas são idempotentes: reimportar o mesmo arquivo não duplica registros.
+
+    Args:
+        registros: Pares (numero_linha, registro).
+
+    Returns:
+        list: Rejeições (numero_linha, mensagem) de registros cuja série/mídia não existe.
+    """
+    rejeitados = []
+    filmes = []
+    filmes_gravados = 0 # Filmes do lote já inseridos (antes de um registro de histórico ou lista)
+    estados = []
+    episodios = []
+    historico = []
+    listas = []
+
+    for numero_linha, registro in registros:
+        tipo = registro[0]
+        if tipo == "FILME":
+            filmes.append(registro[1:])
+
+        elif tipo == "SERIE":
+            _, titulo, genero, ano, classificacao, status, elenco = registro
+            # RETURNING devolve o id tanto na inserção quanto na atualização
+            cursor.execute("""
+                INSERT INTO midias (titulo, tipo, genero, ano, classificacao, duracao, elenco)
+                VALUES (?, 'SERIE', ?, ?, ?, 0, ?)
+                ON CONFLICT(titulo, tipo, ano) DO UPDATE SET genero = excluded.genero,
+                    classificacao = excluded.classificacao, elenco = excluded.elenco
+                RETURNING id
+            """, (titulo, genero, ano, classificacao, elenco))
+            ids_series[(titulo, ano)] = cursor.fetchone()[0]
+            ids_midias.pop((titulo, ano), None) #Pode ter deixado o título e o ano ambíguos
+            estados.append((USUARIO_ID, ids_series[(titulo, ano)], status, None))
+
+        elif tipo in ("HISTORICO", "LISTA"):
+            # O registro pode citar um filme deste mesmo lote: grava os pendentes antes de buscá-lo
+            if filmes_gravados < len(filmes):
+                _inserir_filmes_importados(cursor, filmes[filmes_gravados:], ids_midias)
+                filmes_gravados = len(filmes)
+            titulo, ano = (registro[1], registro[2]) if tipo == "HISTORICO" else (registro[2], registro[3])
+            midia_tipo = registro[-1]
+            midia_id = _id_midia_importada(cursor, titulo, ano, ids_midias, midia_tipo)
+            if midia_id is None:
+                chave = f"{midia_tipo}, {ano}" if midia_tipo else ano
+                rejeitados.append((numero_linha, f"Mídia '{titulo}' ({chave}) não encontrada."))
+            elif midia_id is _AMBIGUA:
+                rejeitados.append((numero_linha, f"Há um filme e uma série '{titulo}' ({ano}): mídia ambígua."))
+            elif tipo == "HISTORICO":
+                historico.append((USUARIO_ID, midia_id, registro[3], registro[4],
+                                  USUARIO_ID, midia_id, registro[3]))
+            else:
+                listas.append((USUARIO_ID, registro[1], midia_id))
+
+        else: # TEMPORADA ou EPISODIO
+            serie_id = _id_serie_importada(cursor, registro[1], registro[2], ids_series)
+            if serie_id is None:
+                rejeitados.append((numero_linha, f"Série '{registro[1]}' ({registro[2]}) não encontrada."))
+                continue
+            temporada_id = _id_temporada_importada(cursor, serie_id, registro[3], ids_temporadas)
+            if tipo == "EPISODIO":
+                episodios.append((temporada_id,) + registro[4:])
+
+    _inserir_filmes_importados(cursor, filmes[filmes_gravados:], ids_midias)
+
+    # Status e nota pertencem ao usuário atual (séries: id já conhecido; filmes: pela chave (titulo, tipo, ano))
+    sql_estado = """
+        INSERT INTO estado_midias (usuario_id, midia_id, status, nota) {origem}
+        ON CONFLICT(usuario_id, midia_id) DO UPDATE SET status = excluded.status, nota = excluded.nota
+    """
+    cursor.executemany(sql_estado.format(origem="VALUES (?, ?, ?, ?)"), estados)
+    cursor.executemany(sql_estado.format(origem="SELECT ?, id, ?, ? FROM midias WHERE titulo = ? AND tipo = 'FILME' AND ano = ?"),
+                       [(USUARIO_ID, status, nota, titulo, ano)
+                        for titulo, _, ano, _, _, status, nota, _ in filmes])
+
+    cursor.executemany("""
+        INSERT INTO episodios (temporada_id, numero, titulo, duracao)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(temporada_id, numero) DO UPDATE SET titulo = excluded.titulo, duracao = excluded.duracao
+    """, [episodio[:4] for episodio in episodios])
+
+    _gravar_estado_episodios(cursor, episodios)
+
+    # O índice idx_historico_usuario(usuario_id, midia_id, data_conclusao) atende a verificação de existência
+    cursor.executemany("""
+        INSERT INTO historico (usuario_id, midia_id, data_conclusao, duracao)
+        SELECT ?, ?, ?, ? WHERE NOT EXISTS
+            (SELECT 1 FROM historico WHERE usuario_id = ? AND midia_id = ? AND data_conclusao = ?)
+    """, historico)
+
+    cursor.executemany("INSERT OR IGNORE INTO listas_conteudo (usuario_id, nome_lista, midia_id) VALUES (?, ?, ?)",
+                       listas)
+
+    return rejeitados
+
+def _inserir_filmes_importados(cursor, filmes, ids_midias):
+    """Função auxiliar: UPSERT dos filmes pela chave (titulo, tipo, ano), sem trocar o tipo de outra mídia."""
+    cursor.executemany("""
+        INSERT INTO midias (titulo, tipo, genero, ano, classificacao, duracao, elenco)
+        VALUES (?, 'FILME', ?, ?, ?, ?, ?)
+        ON CONFLICT(titulo, tipo, ano) DO UPDATE SET genero = excluded.genero,
+            classificacao = excluded.classificacao, duracao = excluded.duracao, elenco = excluded.elenco
+    """, [(titulo, genero, ano, classificacao, duracao, elenco)
+          for titulo, genero, ano, classificacao, duracao, _, _, elenco in filmes])
+    # Um filme novo pode ter deixado o título e o ano ambíguos
+    for titulo, _, ano, *_ in filmes:
+        ids_midias.pop((titulo, ano), None)
+
+#Marcador de _id_midia_importada: o título e o ano pertencem a um filme e a uma série
+_AMBIGUA = object()
+
+def _id_midia_importada(cursor, titulo, ano, ids_midias, tipo=None):
+    """
+    Função auxiliar: id da mídia pela chave (titulo, tipo, ano), do cache ou do banco, ou None se ela
+    não existir. Registros de arquivos antigos não trazem o tipo: vale qualquer mídia com esse título
+    e ano, e _AMBIGUA se houver um filme e uma série.
+    """
+    if tipo is not None:
+        chave = (titulo, ano, tipo)
+        if chave not in ids_midias:
+            cursor.execute("SELECT id FROM midias WHERE titulo = ? AND ano = ? AND tipo = ?", chave)
+            res = cursor.fetchone()
+            if res is None:
+                return None
+            ids_midias[chave] = res[0]
+        return ids_midias[chave]
+
+    chave = (titulo, ano)
+    if chave not in ids_midias:
+        cursor.execute("SELECT id FROM midias WHERE titulo = ? AND ano = ? LIMIT 2", chave)
+        res = cursor.fetchall()
+        if not res:
+            return None
+        ids_midias[chave] = res[0][0] if len(res) == 1 else _AMBIGUA
+    return ids_midias[chave]
+
+def _id_serie_importada(cursor, titulo, ano, ids_series):
+    """Função auxiliar: id da série (do cache ou do banco), ou None se ela não existir."""
+    chave = (titulo, ano)
+    if chave not in ids_series:
+        cursor.execute("SELECT id FROM midias WHERE titulo = ? AND ano = ? AND tipo = 'SERIE'", chave)
+        res = cursor.fetchone()
+        if res is None:
+            return None
+        ids_series[chave] = res[0]
+    return ids_series[chave]
+
+def _id_temporada_importada(cursor, serie_id, numero, ids_temporadas):
+    """Função auxiliar: id da temporada (do cache, do banco ou recém-criada)."""
+    chave = (serie_id, numero)
+    if chave not in ids_temporadas:
+        cursor.execute("""
+            INSERT INTO temporadas (serie_id, numero) VALUES (?, ?)
+            ON CONFLICT(serie_id, numero) DO UPDATE SET numero = excluded.numero
+            RETURNING id
+        """, chave)
+        ids_temporadas[chave] = cursor.fetchone()[0]
+    return ids_temporadas[chave]
+
+# ----------------------------------------------------
+# 7. EXPORTAÇÃO EM FLUXO (ver src/exportacao.py)
+# ----------------------------------------------------
+
+def registros_para_exportacao(tipo=None, status=None, genero=None, ano=None):
+    """
+    Gera, um a um, os registros do catálogo no mesmo formato aceito pela importação:
+    mídias, temporadas, episódios, histórico e conteúdo das listas, nesta ordem (as séries
+    sempre antes de seus episódios). As linhas são consumidas direto dos cursores do SQLite,
+    sem fetchall, então a memória usada não depende do tamanho do catálogo.
+    Os filtros se aplicam às mídias; os demais registros acompanham as mídias filtradas.
+    Status, notas, histórico e listas são os do usuário atual (USUARIO_ID).
+
+    Yields:
+        dict: Um registro com a chave "tipo" (FILME, SERIE, TEMPORADA, EPISODIO, HISTORICO ou LISTA).
+    """
+    condicoes = []
+    parametros = []
+    for coluna, valor in (("m.tipo", tipo), ("COALESCE(em.status, 'NÃO ASSISTIDO')", status),
+                          ("m.genero", genero), ("m.ano", ano)):
+        if valor is not None:
+            condicoes.append(f"{coluna} = ?")
+            parametros.append(valor)
+    filtro = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    # Estado do usuário atual (o primeiro parâmetro de cada consulta)
+    estado = "LEFT JOIN estado_midias em ON em.midia_id = m.id AND em.usuario_id = ?"
+    parametros = [USUARIO_ID] + parametros
+
+    conn = get_conn()
+    # 1. Mídias (Filmes e Séries)
+    for titulo, tipo_midia, genero_midia, ano_midia, classificacao, duracao, status_midia, nota, elenco in conn.execute(f"""
+        SELECT m.titulo, m.tipo, m.genero, m.ano, m.classificacao, m.duracao,
+               COALESCE(em.status, 'NÃO ASSISTIDO'), em.nota, m.elenco
+        FROM midias m {estado} {filtro} ORDER BY m.id
+    """, parametros):
+        registro = {"tipo": tipo_midia, "titulo": titulo, "genero": genero_midia, "ano": ano_midia,
+                    "classificacao": classificacao, "status": status_midia, "elenco": elenco}
+        if tipo_midia == "FILME":
+            registro.update(duracao=duracao, nota=nota)
+        yield registro
+
+    # 2. Temporadas (inclusive as que ainda não têm episódios)
+    for titulo_serie, ano_serie, numero in conn.execute(f"""
+        SELECT m.titulo, m.ano, t.numero
+        FROM temporadas t JOIN midias m ON m.id = t.serie_id {estado} {filtro}
+        ORDER BY t.serie_id, t.numero
+    """, parametros):
+        yield {"tipo": "TEMPORADA", "serie": titulo_serie, "serie_ano": ano_serie, "temporada": numero}
+
+    # 3. Episódios
+    for titulo_serie, ano_serie, num_temp, num_ep, titulo_ep, duracao, nota, status_ep in conn.execute(f"""
+        SELECT m.titulo, m.ano, t.numero, e.numero, e.titulo, e.duracao,
+               ee.nota, COALESCE(ee.status, 'NÃO ASSISTIDO')
+        FROM episodios e
+        JOIN temporadas t ON t.id = e.temporada_id
+        JOIN midias m ON m.id = t.serie_id {estado}
+        LEFT JOIN estado_episodios ee ON ee.episodio_id = e.id AND ee.usuario_id = ? {filtro}
+        ORDER BY t.serie_id, t.numero, e.numero
+    """, parametros[:1] + [USUARIO_ID] + parametros[1:]):
+        yield {"tipo": "EPISODIO", "serie": titulo_serie, "serie_ano": ano_serie, "temporada": num_temp,
+               "numero": num_ep, "titulo": titulo_ep, "duracao": duracao, "nota": nota, "status": status_ep}
+
+    # 4. Histórico
+    for titulo, ano_midia, tipo_midia, data_conclusao, duracao in conn.execute(f"""
+        SELECT m.titulo, m.ano, m.tipo, h.data_conclusao, h.duracao
+        FROM historico h JOIN midias m ON m.id = h.midia_id AND h.usuario_id = ? {estado} {filtro}
+        ORDER BY h.data_conclusao
+    """, [USUARIO_ID] + parametros):
+        yield {"tipo": "HISTORICO", "titulo": titulo, "ano": ano_midia, "midia_tipo": tipo_midia,
+               "data_conclusao": data_conclusao, "duracao": duracao}
+
+    # 5. Conteúdo das listas personalizadas
+    for nome_lista, titulo, ano_midia, tipo_midia in conn.execute(f"""
+        SELECT l.nome_lista, m.titulo, m.ano, m.tipo
+        FROM listas_conteudo l JOIN midias m ON m.id = l.midia_id AND l.usuario_id = ? {estado} {filtro}
+        ORDER BY l.nome_lista, l.posicao
+    """, [USUARIO_ID] + parametros):
+        yield {"tipo": "LISTA", "lista": nome_lista, "titulo": titulo, "ano": ano_midia, "midia_tipo": tipo_midia}
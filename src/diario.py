@@ -0,0 +1,246 @@
+# src/diario.py
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from src.modelos import Filme, Serie, Temporada, Episodio
+
+
+class DiarioAlteracoes:
+    """
+    Diário (append-only, JSON Lines) das alterações feitas no CLI, gravado ANTES de elas chegarem ao
+    SQLite: cada alteração em memória é anotada no arquivo na hora (com fsync), e uma thread de
+    salvamento automático grava no banco, em uma única transação, tudo o que mudou desde o último
+    salvamento (a cada `segundos` ou a cada `alteracoes` anotações). Gravado o lote, o diário é esvaziado.
+    Se o programa cair antes disso, as entradas que ficaram no arquivo são reaplicadas na próxima
+    inicialização (ver reaplicar_diario); por isso todas as entradas são idempotentes.
+
+    `trava` protege o estado em memória: quem altera mídias, listas ou histórico deve segurá-la
+    enquanto altera e anota, para que o salvamento automático nunca grave um estado pela metade.
+
+        with DIARIO.trava:
+            filme.status = "ASSISTIDO"
+            DIARIO.anotar("estado", **identificar_midia(filme), status=filme.status)
+    """
+    def __init__(self, caminho, salvar, segundos=30.0, alteracoes=20):
+        self.caminho = caminho
+        self.trava = threading.RLock()
+        self._salvar = salvar           #Função que grava o estado em memória no banco (True se gravou)
+        self._segundos = segundos
+        self._alteracoes = alteracoes
+        self._pendentes = len(ler_diario(caminho)) #Entradas anotadas e ainda não gravadas no banco
+                                                   #(as deixadas por uma execução anterior já foram reaplicadas)
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        self._acordar = threading.Event()
+        self._parar = False
+        self._thread = None
+
+    def anotar(self, operacao, **dados):
+        """Acrescenta uma entrada ao diário (e a força para o disco) antes de ela ir para o banco."""
+        with self.trava:
+            self._arquivo.write(json.dumps({"op": operacao, **dados}, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._pendentes += 1
+            if self._pendentes >= self._alteracoes:
+                self._acordar.set()
+
+    @property
+    def pendentes(self):
+        return self._pendentes
+
+    def aplicar(self):
+        """
+        Grava no banco as alterações pendentes e esvazia o diário.
+
+        Returns:
+            bool: True se não restou nada pendente; False se a gravação falhou (o diário é mantido).
+        """
+        with self.trava:
+            if not self._pendentes:
+                return True
+            if not self._salvar():
+                return False
+            self._arquivo.truncate(0)
+            self._pendentes = 0
+            return True
+
+    def iniciar(self):
+        """Inicia a thread de salvamento automático."""
+        self._thread = threading.Thread(target=self._salvar_periodicamente, name="autosave", daemon=True)
+        self._thread.start()
+
+    def _salvar_periodicamente(self):
+        while True:
+            self._acordar.wait(self._segundos)
+            self._acordar.clear()
+            if self._parar:
+                return
+            try:
+                self.aplicar()
+            except Exception as e:
+                # O diário continua no disco: a próxima tentativa (ou a próxima inicialização) grava
+                print(f"⚠️ Salvamento automático falhou: {e}")
+
+    def encerrar(self):
+        """Para a thread, grava o que estiver pendente e fecha o arquivo (apagado se ficou vazio)."""
+        if self._thread is not None:
+            self._parar = True
+            self._acordar.set()
+            self._thread.join()
+            self._thread = None
+        salvo = self.aplicar()
+        self._arquivo.close()
+        if salvo:
+            os.remove(self.caminho)
+        return salvo
+
+
+def caminho_diario(caminho_banco, usuario_id):
+    """Arquivo do diário de um usuário, ao lado do .db (ex.: catalogo.db.u1.diario)."""
+    return f"{caminho_banco}.u{int(usuario_id)}.diario"
+
+
+def ler_diario(caminho):
+    """
+    Entradas de um diário deixado por uma execução que não terminou de salvar.
+    Uma última linha incompleta (queda no meio da escrita) é descartada.
+    """
+    entradas = []
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try:
+                    entradas.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        pass
+    return entradas
+
+
+#Conversões usadas nas entradas de inclusão de mídias e temporadas
+
+def descrever_temporada(temporada):
+    return [temporada.numero, [[ep.numero, ep._titulo, ep.duracao] for ep in temporada._episodios.values()]]
+
+
+#Identidade da mídia citada por uma entrada (título, tipo e ano, como Midia.chave)
+def identificar_midia(midia):
+    return {"titulo": midia.titulo, "tipo": midia._tipo, "ano": midia.ano}
+
+
+def descrever_midia(midia):
+    descricao = {"tipo": midia._tipo, "titulo": midia.titulo, "genero": midia._genero, "ano": midia.ano,
+                 "classificacao": midia._classificacao, "elenco": list(midia._elenco or [])}
+    if isinstance(midia, Filme):
+        descricao["duracao"] = midia.duracao
+    else:
+        descricao["temporadas"] = [descrever_temporada(t) for t in midia.temporadas.values()]
+    return descricao
+
+
+def _criar_temporada(descricao):
+    numero, episodios = descricao
+    temporada = Temporada(numero)
+    for numero_ep, titulo, duracao in episodios:
+        temporada.adicionar_episodio(Episodio(numero_ep, titulo, duracao))
+    return temporada
+
+
+def _criar_midia(descricao):
+    if descricao["tipo"] == "FILME":
+        return Filme(descricao["titulo"], descricao["genero"], descricao["ano"], descricao["classificacao"],
+                     descricao["elenco"], descricao["duracao"], "NÃO ASSISTIDO", None)
+    serie = Serie(descricao["titulo"], descricao["genero"], descricao["ano"], descricao["classificacao"],
+                  descricao["elenco"])
+    for temporada in descricao["temporadas"]:
+        serie.adicionar_temporada(_criar_temporada(temporada))
+    return serie
+
+
+#Mídia citada pela entrada, pelo título, tipo e ano. Entradas antigas só têm o título: vale a
+#única mídia do catálogo com ele (None se não houver ou se for ambíguo)
+def _midia_da_entrada(entrada, catalogo):
+    if "tipo" in entrada:
+        return catalogo.obter(entrada["titulo"], entrada["tipo"], entrada["ano"])
+    midias = catalogo.buscar(entrada["titulo"])
+    return midias[0] if len(midias) == 1 else None
+
+
+def aplicar_entrada(entrada, catalogo, usuario):
+    """
+    Reaplica UMA entrada do diário sobre o catálogo e o usuário carregados do banco.
+    Entradas já refletidas no banco (gravadas antes da queda, mas sem esvaziar o diário) não mudam nada.
+
+    """
+    operacao = entrada["op"]
+    if operacao == "midia":
+        if _midia_da_entrada(entrada["midia"], catalogo) is None:
+            catalogo.adicionar(_criar_midia(entrada["midia"]))
+        return
+    if operacao.startswith("lista_"):
+        nome = entrada["lista"]
+        if operacao == "lista_criar":
+            if nome not in usuario.listas:
+                usuario.criar_lista(nome)
+            return
+        lista = usuario.listas.get(nome)
+        if lista is None:
+            lista = usuario.criar_lista(nome)
+        midia = _midia_da_entrada(entrada, catalogo)
+        if midia is None:
+            return  #Removida do catálogo depois da alteração
+        presente = midia in lista
+        if operacao == "lista_adicionar" and not presente:
+            lista.adicionar_midia(midia)
+        elif operacao == "lista_remover" and presente:
+            lista.remover_midia(midia)
+        elif operacao == "lista_mover" and presente:
+            # A lista pode ter encolhido desde a anotação (ex.: mídia excluída do catálogo)
+            lista.mover(midia, min(entrada["posicao"], len(lista) - 1))
+        return
+
+    midia = _midia_da_entrada(entrada, catalogo)
+    if midia is None:
+        return  #Removida do catálogo depois da alteração
+    if operacao == "estado":
+        if "status" in entrada:
+            midia.status = entrada["status"]
+        if "nota" in entrada:
+            midia.nota = entrada["nota"]
+    elif operacao == "temporada":
+        if entrada["temporada"][0] not in midia.temporadas:
+            midia.adicionar_temporada(_criar_temporada(entrada["temporada"]))
+            midia.atualizar_status_automatico()
+    elif operacao == "episodio":
+        episodio = midia.temporadas[entrada["temporada"]]._episodios[entrada["episodio"]]
+        if "status" in entrada:
+            episodio.status = entrada["status"]
+        if "nota" in entrada:
+            episodio.nota = entrada["nota"]
+        midia.atualizar_status_automatico()
+    elif operacao == "historico":
+        data_conclusao = datetime.fromisoformat(entrada["data"])
+        # O histórico não se repete para a mesma mídia no mesmo instante (como na importação)
+        if not any(item.midia is midia and item.data_conclusao == data_conclusao for item in usuario._historico):
+            usuario.adicionar_ao_historico(midia, data_conclusao)
+
+
+def reaplicar_diario(caminho, catalogo, usuario):
+    """
+    Reaplica, em ordem, as entradas de um diário deixado por uma execução anterior (queda ou Ctrl+C
+    antes do salvamento). Uma entrada inválida é avisada e ignorada, sem impedir as seguintes.
+
+    Returns:
+        int: Quantidade de entradas lidas do diário.
+    """
+    entradas = ler_diario(caminho)
+    for entrada in entradas:
+        try:
+            aplicar_entrada(entrada, catalogo, usuario)
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"⚠️ Alteração do diário ignorada ({entrada.get('op')}): {e}")
+    return len(entradas)
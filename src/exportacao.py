@@ -0,0 +1,90 @@
+# src/exportacao.py
+"""
+Exportação do catálogo em fluxo para JSON Lines ou CSV, opcionalmente compactada com gzip.
+
+Os registros são lidos dos cursores do SQLite e escritos um a um (ver
+dados.registros_para_exportacao), no mesmo formato aceito por src/importacao.py:
+o arquivo exportado pode ser reimportado diretamente.
+
+O formato é deduzido da extensão: .jsonl, .csv, .jsonl.gz ou .csv.gz.
+
+Uso:
+    python -m src.exportacao catalogo.jsonl.gz [--tipo SERIE] [--status ASSISTIDO] [--genero Drama] [--ano 2020]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+
+from src import dados
+
+#Colunas do CSV: união dos campos de todos os tipos de registro (campos ausentes ficam vazios)
+CAMPOS_CSV = ["tipo", "titulo", "genero", "ano", "classificacao", "duracao", "status", "nota", "elenco",
+              "serie", "serie_ano", "temporada", "numero", "data_conclusao", "lista", "midia_tipo"]
+
+FORMATOS = ("jsonl", "csv")
+
+
+def formato_do_arquivo(caminho):
+    """
+    Deduz (formato, compactado) a partir da extensão do arquivo.
+
+    Raises:
+        ValueError: para extensões não suportadas.
+    """
+    nome, extensao = os.path.splitext(caminho.lower())
+    compactado = extensao == ".gz"
+    if compactado:
+        extensao = os.path.splitext(nome)[1]
+    formato = extensao.lstrip(".")
+    if formato not in FORMATOS:
+        raise ValueError("Formato não suportado. Use .jsonl ou .csv (opcionalmente .gz)")
+    return formato, compactado
+
+def exportar_catalogo(caminho, tipo=None, status=None, genero=None, ano=None):
+    """
+    Exporta o catálogo (mídias, temporadas, episódios, histórico e listas) para `caminho`.
+    Os filtros restringem as mídias exportadas; os demais registros acompanham as mídias.
+
+    Returns:
+        dict: Quantidade de registros exportados por tipo.
+    """
+    formato, compactado = formato_do_arquivo(caminho)
+    tipo = tipo.strip().upper() if tipo else None
+    status = status.strip().upper() if status else None
+
+    contagem = {}
+    abrir = gzip.open if compactado else open
+    with abrir(caminho, "wt", newline="", encoding="utf-8") as arquivo:
+        if formato == "csv":
+            escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS_CSV)
+            escritor.writeheader()
+            escrever = escritor.writerow
+        else:
+            escrever = lambda registro: arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        for registro in dados.registros_para_exportacao(tipo, status, genero, ano):
+            escrever(registro)
+            contagem[registro["tipo"]] = contagem.get(registro["tipo"], 0) + 1
+
+    return contagem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arquivo")
+    parser.add_argument("--tipo", choices=["FILME", "SERIE"], type=str.upper)
+    parser.add_argument("--status", help="NÃO ASSISTIDO, ASSISTINDO ou ASSISTIDO")
+    parser.add_argument("--genero")
+    parser.add_argument("--ano", type=int)
+    args = parser.parse_args()
+
+    dados.criar_tabelas()
+    contagem = exportar_catalogo(args.arquivo, args.tipo, args.status, args.genero, args.ano)
+    resumo = ", ".join(f"{quantidade} {tipo.lower()}" for tipo, quantidade in contagem.items()) or "nenhum registro"
+    print(f"✅ Exportação concluída em {args.arquivo}: {resumo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# src/importacao.py
+"""
+Importação em massa do catálogo a partir de arquivos CSV ou JSON Lines.
+
+Cada linha é um registro com a coluna "tipo":
+    FILME:     titulo, genero, ano, classificacao, duracao, status, nota, elenco
+    SERIE:     titulo, genero, ano, classificacao, status, elenco
+    TEMPORADA: serie, serie_ano, temporada
+    EPISODIO:  serie, serie_ano, temporada, numero, titulo, duracao, nota, status
+    HISTORICO: titulo, ano, midia_tipo, data_conclusao (AAAA-MM-DD HH:MM:SS), duracao
+    LISTA:     lista, titulo, ano, midia_tipo
+
+Em HISTORICO e LISTA, midia_tipo (FILME ou SERIE) distingue um filme e uma série de mesmo título
+e ano; arquivos antigos, sem ele, continuam aceitos quando o título e o ano não são ambíguos.
+
+O elenco é um texto com nomes separados por vírgula (ou uma lista, em JSON). As séries devem
+aparecer no arquivo antes de suas temporadas e episódios, e as mídias antes de seus registros
+de histórico e listas (ou já existir no banco). Arquivos .csv.gz/.jsonl.gz são lidos
+descompactando em fluxo; a saída de src/exportacao.py é aceita como entrada.
+
+Uso:
+    python -m src.importacao catalogo.csv [--processos 4] [--lote 5000] [--rejeitados rejeitados.csv]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from src import dados
+from src.modelos import Filme, Serie, Temporada, Episodio
+
+TIPOS_REGISTRO = ("FILME", "SERIE", "TEMPORADA", "EPISODIO", "HISTORICO", "LISTA")
+
+
+class ResultadoImportacao:
+    """Resumo de uma importação: contagens, tempo total e linhas rejeitadas com o motivo."""
+
+    def __init__(self):
+        self.lidas = 0
+        self.importadas = 0
+        self.rejeitadas = [] # Tuplas (numero_linha, mensagem)
+        self.segundos = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        return self.lidas / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (f"{self.lidas} linhas lidas, {self.importadas} importadas, {len(self.rejeitadas)} rejeitadas "
+                f"em {self.segundos:.2f}s ({self.linhas_por_segundo:,.0f} linhas/s)")
+
+
+# ----------------------------------------------------
+# LEITURA EM FLUXO (sem carregar o arquivo inteiro)
+# ----------------------------------------------------
+
+def ler_linhas(caminho):
+    """
+    Gera pares (numero_linha, linha) do arquivo, um por vez.
+    Linhas JSON inválidas são repassadas como texto para serem rejeitadas na validação.
+    """
+    nome, extensao = os.path.splitext(caminho.lower())
+    compactado = extensao == ".gz"
+    if compactado:
+        extensao = os.path.splitext(nome)[1]
+    abrir = gzip.open if compactado else open
+    with abrir(caminho, "rt", newline="", encoding="utf-8") as arquivo:
+        if extensao == ".csv":
+            # A linha 1 é o cabeçalho
+            for numero_linha, linha in enumerate(csv.DictReader(arquivo), start=2):
+                yield numero_linha, linha
+        elif extensao in (".jsonl", ".json"):
+            for numero_linha, texto in enumerate(arquivo, start=1):
+                if texto.strip():
+                    yield numero_linha, texto
+        else:
+            raise ValueError("Formato não suportado. Use .csv ou .jsonl (opcionalmente .gz)")
+
+def _em_lotes(iteravel, tamanho):
+    """Agrupa um iterável em listas de até `tamanho` itens."""
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+# ----------------------------------------------------
+# VALIDAÇÃO (executada nos processos do pool)
+# ----------------------------------------------------
+
+def _texto(linha, campo, obrigatorio=True):
+    valor = linha.get(campo)
+    if isinstance(valor, str):
+        valor = valor.strip()
+    if valor in (None, ""):
+        if obrigatorio:
+            raise ValueError(f"Campo '{campo}' é obrigatório.")
+        return None
+    return valor if isinstance(valor, str) else str(valor)
+
+def _inteiro(linha, campo):
+    valor = _texto(linha, campo)
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"Campo '{campo}' deve ser um número inteiro.") from None
+
+def _inteiro_opcional(linha, campo):
+    return _inteiro(linha, campo) if _texto(linha, campo, obrigatorio=False) is not None else None
+
+def _nota(linha):
+    valor = _texto(linha, "nota", obrigatorio=False)
+    if valor is None:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        raise ValueError("Campo 'nota' deve ser numérico.") from None
+
+def _tipo_midia(linha):
+    valor = _texto(linha, "midia_tipo", obrigatorio=False)
+    if valor is None:
+        return None
+    if valor.upper() not in ("FILME", "SERIE"):
+        raise ValueError(f"Campo 'midia_tipo' inválido: '{valor}'. Use FILME ou SERIE.")
+    return valor.upper()
+
+def _elenco(linha):
+    valor = linha.get("elenco")
+    if isinstance(valor, list):
+        return [str(nome).strip() for nome in valor if str(nome).strip()]
+    return [nome.strip() for nome in (valor or "").split(",") if nome.strip()]
+
+def validar_linha(linha):
+    """
+    Converte uma linha (dict, ou texto JSON) em um registro de gravação, validando os valores
+    com os próprios setters de Filme/Serie/Temporada/Episodio.
+
+    Raises:
+        ValueError/TypeError: com a mensagem dos setters (ou do campo inválido).
+    """
+    if isinstance(linha, str):
+        try:
+            linha = json.loads(linha)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e.msg}") from None
+        if not isinstance(linha, dict):
+            raise ValueError("Cada linha JSON deve ser um objeto.")
+
+    tipo = (_texto(linha, "tipo") or "").upper()
+    if tipo not in TIPOS_REGISTRO:
+        raise ValueError(f"Tipo de registro inválido: '{tipo}'. Use {', '.join(TIPOS_REGISTRO)}.")
+
+    if tipo == "FILME":
+        filme = Filme(_texto(linha, "titulo"), _texto(linha, "genero", False), _inteiro(linha, "ano"),
+                      _texto(linha, "classificacao", False), _elenco(linha), _inteiro(linha, "duracao"),
+                      _texto(linha, "status", False) or "NÃO ASSISTIDO", _nota(linha))
+        return ("FILME", filme.titulo, filme._genero, filme.ano, filme._classificacao, filme.duracao,
+                filme.status, filme.nota, ", ".join(filme._elenco) or None)
+
+    if tipo == "SERIE":
+        serie = Serie(_texto(linha, "titulo"), _texto(linha, "genero", False), _inteiro(linha, "ano"),
+                      _texto(linha, "classificacao", False), _elenco(linha))
+        serie.status = _texto(linha, "status", False) or "NÃO ASSISTIDO"
+        return ("SERIE", serie.titulo, serie._genero, serie.ano, serie._classificacao, serie.status,
+                ", ".join(serie._elenco) or None)
+
+    if tipo == "HISTORICO":
+        try:
+            data_conclusao = datetime.fromisoformat(_texto(linha, "data_conclusao"))
+        except ValueError:
+            raise ValueError("Campo 'data_conclusao' deve estar no formato AAAA-MM-DD HH:MM:SS.") from None
+        duracao = _inteiro_opcional(linha, "duracao")
+        if duracao is not None and duracao < 0:
+            raise ValueError("Campo 'duracao' não pode ser negativo.")
+        return ("HISTORICO", _texto(linha, "titulo"), _inteiro(linha, "ano"),
+                data_conclusao.strftime('%Y-%m-%d %H:%M:%S'), duracao, _tipo_midia(linha))
+
+    if tipo == "LISTA":
+        # Mesmo padrão de nome usado pelo menu de listas (maiúsculas)
+        return ("LISTA", _texto(linha, "lista").upper(), _texto(linha, "titulo"), _inteiro(linha, "ano"),
+                _tipo_midia(linha))
+
+    titulo_serie = _texto(linha, "serie")
+    ano_serie = _inteiro(linha, "serie_ano")
+    temporada = Temporada(_inteiro(linha, "temporada"))
+    if tipo == "TEMPORADA":
+        return ("TEMPORADA", titulo_serie, ano_serie, temporada.numero)
+
+    episodio = Episodio(_inteiro(linha, "numero"), _texto(linha, "titulo", False), _inteiro(linha, "duracao"),
+                        None, _nota(linha), _texto(linha, "status", False) or "NÃO ASSISTIDO")
+    return ("EPISODIO", titulo_serie, ano_serie, temporada.numero, episodio.numero, episodio._titulo,
+            episodio.duracao, episodio.nota, episodio.status)
+
+def validar_lote(lote):
+    """
+    Valida um lote de pares (numero_linha, linha). Função de nível de módulo para poder
+    ser enviada aos processos do pool.
+
+    Returns:
+        tuple: (validos, rejeitados) = ([(numero_linha, registro)], [(numero_linha, mensagem)])
+    """
+    validos = []
+    rejeitados = []
+    for numero_linha, linha in lote:
+        try:
+            validos.append((numero_linha, validar_linha(linha)))
+        except (ValueError, TypeError) as e:
+            rejeitados.append((numero_linha, str(e)))
+    return validos, rejeitados
+
+
+def _validar_em_paralelo(executor, lotes, janela):
+    """
+    Envia os lotes ao pool mantendo no máximo `janela` lotes em andamento (executor.map
+    consumiria o arquivo inteiro de uma vez) e devolve os resultados na ordem do arquivo.
+    """
+    em_andamento = deque()
+    for lote in lotes:
+        em_andamento.append(executor.submit(validar_lote, lote))
+        if len(em_andamento) >= janela:
+            yield em_andamento.popleft().result()
+    while em_andamento:
+        yield em_andamento.popleft().result()
+
+
+# ----------------------------------------------------
+# IMPORTAÇÃO
+# ----------------------------------------------------
+
+def importar_arquivo(caminho, processos=None, tamanho_lote=5000, linhas_por_transacao=50000):
+    """
+    Importa um arquivo CSV/JSONL para o banco.
+    As linhas são lidas em fluxo e validadas em lotes por um pool de processos (os resultados
+    voltam na ordem do arquivo); os registros válidos são gravados no processo principal em
+    transações grandes (uma a cada `linhas_por_transacao` linhas).
+
+    Args:
+        processos: Número de processos de validação (None = um por CPU; 0 = validar no próprio processo).
+
+    Returns:
+        ResultadoImportacao
+    """
+    resultado = ResultadoImportacao()
+    inicio = time.perf_counter()
+
+    ids_series = {}
+    ids_temporadas = {}
+    ids_midias = {}
+    conn = dados.get_conn()
+    cursor = conn.cursor()
+    pendentes_commit = 0
+
+    lotes = _em_lotes(ler_linhas(caminho), tamanho_lote)
+    #Importado só aqui: concurrent.futures.process (multiprocessing, logging...) pesa no import do CLI
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=processos) if processos != 0 else None
+    try:
+        if executor:
+            validados = _validar_em_paralelo(executor, lotes, 2 * (processos or os.cpu_count() or 1))
+        else:
+            validados = map(validar_lote, lotes)
+        for validos, rejeitados in validados:
+            resultado.lidas += len(validos) + len(rejeitados)
+            resultado.rejeitadas.extend(rejeitados)
+
+            rejeitados_banco = dados.gravar_registros_importados(cursor, validos, ids_series, ids_temporadas, ids_midias)
+            resultado.rejeitadas.extend(rejeitados_banco)
+            resultado.importadas += len(validos) - len(rejeitados_banco)
+
+            pendentes_commit += len(validos)
+            if pendentes_commit >= linhas_por_transacao:
+                conn.commit()
+                pendentes_commit = 0
+
+        conn.commit()
+
+    except sqlite3.Error as e:
+        print(f"❌ Erro no banco durante a importação (última transação desfeita): {e}")
+        conn.rollback()
+        raise
+    finally:
+        if executor:
+            executor.shutdown()
+        # A conexão é reutilizada pela thread: não deixa uma transação interrompida aberta nela
+        if conn.in_transaction:
+            conn.rollback()
+
+    resultado.rejeitadas.sort()
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+def salvar_rejeitados(resultado, caminho):
+    """Grava as linhas rejeitadas (numero_linha, mensagem) em um CSV para correção."""
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["linha", "erro"])
+        escritor.writerows(resultado.rejeitadas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arquivo")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--rejeitados", help="CSV de saída com as linhas rejeitadas")
+    args = parser.parse_args()
+
+    dados.criar_tabelas()
+    resultado = importar_arquivo(args.arquivo, args.processos, args.lote)
+    print(f"✅ Importação concluída: {resultado}")
+    for numero_linha, mensagem in resultado.rejeitadas[:10]:
+        print(f"   ⚠️ Linha {numero_linha}: {mensagem}")
+    if args.rejeitados and resultado.rejeitadas:
+        salvar_rejeitados(resultado, args.rejeitados)
+        print(f"   Linhas rejeitadas gravadas em {args.rejeitados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# src/indice.py
+
+import unicodedata
+from bisect import bisect_left, insort
+
+
+class IndiceTitulos:
+    """
+    Índice de títulos de mídias para buscas sem varrer o catálogo.
+    - Busca exata: dicionário por título normalizado (sem diferenciar maiúsculas/minúsculas), com
+      todas as mídias daquele título (um filme e uma série, ou refilmagens de outro ano, convivem);
+    - Prefixo (autocompletar): lista ordenada de chaves sem acentos, consultada por busca binária;
+    - Aproximada: índice de trigramas sem acentos para achar candidatos, ordenados por similaridade
+      (ex.: "parasita" encontra "Parasita", "stranger thngs" encontra "Stranger Things").
+    Deve ser mantido em sincronia com o catálogo via adicionar() e remover().
+    """
+    def __init__(self, midias=None):
+        self._por_titulo = {}        #Chave: título normalizado, Valor: {id(midia): objeto Midia}
+        self._chaves_ordenadas = []  #Tuplas (chave sem acentos, título normalizado), ordenadas
+        self._trigramas = None       #Chave: trigrama, Valor: set de títulos normalizados
+                                     #(montado só na primeira busca aproximada: ver _indice_trigramas)
+        self._quantidade = 0         #Mídias indexadas (um título pode ter várias)
+
+        for midia in midias or []:
+            self.adicionar(midia)
+
+    #Normalização usada na busca exata: ignora maiúsculas/minúsculas e espaços repetidos
+    @staticmethod
+    def normalizar(texto):
+        return " ".join(texto.casefold().split())
+
+    #Normalização usada no prefixo e na busca aproximada: também remove os acentos
+    @staticmethod
+    def normalizar_sem_acentos(texto):
+        texto = IndiceTitulos.normalizar(texto)
+        if texto.isascii():
+            return texto  #Sem acentos a remover: evita a decomposição, que pesa ao indexar o catálogo
+        decomposto = unicodedata.normalize("NFKD", texto)
+        return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+    #Trigramas da chave, com bordas marcadas para favorecer o início e o fim das palavras
+    @staticmethod
+    def _gerar_trigramas(chave_sem_acentos):
+        texto = f"  {chave_sem_acentos} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    #Indexa uma mídia ao lado das que já têm o mesmo título
+    def adicionar(self, midia):
+        titulo = self.normalizar(midia.titulo)
+        mesmo_titulo = self._por_titulo.get(titulo)
+        if mesmo_titulo is not None:
+            mesmo_titulo[id(midia)] = midia
+            self._quantidade += 1
+            return
+
+        sem_acentos = self.normalizar_sem_acentos(midia.titulo)
+        self._por_titulo[titulo] = {id(midia): midia}
+        self._quantidade += 1
+        insort(self._chaves_ordenadas, (sem_acentos, titulo))
+        if self._trigramas is not None:
+            self._indexar_trigramas(sem_acentos, titulo)
+
+    def _indexar_trigramas(self, sem_acentos, titulo):
+        for trigrama in self._gerar_trigramas(sem_acentos):
+            self._trigramas.setdefault(trigrama, set()).add(titulo)
+
+    #Índice de trigramas, montado na primeira busca aproximada a partir das chaves ordenadas
+    #(a maioria das execuções nunca faz uma, e montá-lo era a parte mais cara da inicialização)
+    def _indice_trigramas(self):
+        if self._trigramas is None:
+            self._trigramas = {}
+            for sem_acentos, titulo in self._chaves_ordenadas:
+                self._indexar_trigramas(sem_acentos, titulo)
+        return self._trigramas
+
+    #Remove uma mídia do índice (retorna False se ela não estava indexada)
+    #`titulo` informa o título com que ela foi indexada, caso tenha sido renomeada depois
+    def remover(self, midia, titulo=None):
+        titulo_original = titulo if titulo is not None else midia.titulo
+        titulo = self.normalizar(titulo_original)
+        mesmo_titulo = self._por_titulo.get(titulo)
+        if mesmo_titulo is None or id(midia) not in mesmo_titulo:
+            return False
+
+        del mesmo_titulo[id(midia)]
+        self._quantidade -= 1
+        if mesmo_titulo:
+            return True #Outras mídias mantêm o título nas chaves ordenadas e nos trigramas
+
+        sem_acentos = self.normalizar_sem_acentos(titulo_original)
+        del self._por_titulo[titulo]
+        posicao = bisect_left(self._chaves_ordenadas, (sem_acentos, titulo))
+        del self._chaves_ordenadas[posicao]
+        if self._trigramas is None:
+            return True
+        for trigrama in self._gerar_trigramas(sem_acentos):
+            titulos = self._trigramas[trigrama]
+            titulos.discard(titulo)
+            if not titulos:
+                del self._trigramas[trigrama]
+        return True
+
+    def buscar(self, titulo):
+        """
+        Busca exata, sem diferenciar maiúsculas/minúsculas.
+
+        Returns:
+            list: Todas as mídias com o título (vazia se não houver), na ordem de inclusão.
+        """
+        return list(self._por_titulo.get(self.normalizar(titulo), {}).values())
+
+    def buscar_prefixo(self, prefixo, limite=10):
+        """
+        Autocompletar: mídias cujo título (sem acentos) começa com o prefixo informado.
+
+        Returns:
+            list: Até `limite` objetos Midia, em ordem alfabética.
+        """
+        prefixo = self.normalizar_sem_acentos(prefixo)
+        resultado = []
+        posicao = bisect_left(self._chaves_ordenadas, (prefixo,))
+        while posicao < len(self._chaves_ordenadas) and len(resultado) < limite:
+            sem_acentos, titulo = self._chaves_ordenadas[posicao]
+            if not sem_acentos.startswith(prefixo):
+                break
+            resultado.extend(self._por_titulo[titulo].values())
+            posicao += 1
+        return resultado[:limite]
+
+    def buscar_aproximado(self, consulta, limite=5, similaridade_minima=0.6):
+        """
+        Busca tolerante a erros de digitação e acentos.
+        Os candidatos são os títulos que compartilham trigramas com a consulta;
+        apenas eles são comparados por similaridade de texto.
+
+        Returns:
+            list: Até `limite` objetos Midia, do mais parecido para o menos parecido.
+        """
+        consulta = self.normalizar_sem_acentos(consulta)
+        if not consulta:
+            return []
+
+        #Conta quantos trigramas cada título compartilha com a consulta
+        compartilhados = {}
+        trigramas = self._indice_trigramas()
+        for trigrama in self._gerar_trigramas(consulta):
+            for titulo in trigramas.get(trigrama, ()):
+                compartilhados[titulo] = compartilhados.get(titulo, 0) + 1
+
+        #Importado só aqui: difflib é caro de importar e a busca aproximada é rara
+        from difflib import SequenceMatcher
+        pontuados = []
+        for titulo in compartilhados:
+            sem_acentos = self.normalizar_sem_acentos(titulo)
+            similaridade = SequenceMatcher(None, consulta, sem_acentos).ratio()
+            if similaridade >= similaridade_minima:
+                pontuados.append((-similaridade, titulo))
+
+        pontuados.sort()
+        resultado = [midia for _, titulo in pontuados[:limite] for midia in self._por_titulo[titulo].values()]
+        return resultado[:limite]
+
+    def sugerir(self, consulta, limite=5):
+        """Sugestões para uma busca sem resultado exato: primeiro por prefixo, depois aproximadas."""
+        sugestoes = self.buscar_prefixo(consulta, limite)
+        for midia in self.buscar_aproximado(consulta, limite):
+            if len(sugestoes) >= limite:
+                break
+            if midia not in sugestoes:
+                sugestoes.append(midia)
+        return sugestoes
+
+    #Métodos Especiais para tamanho (mídias indexadas) e pertinência por título
+    def __len__(self):
+        return self._quantidade
+
+    def __contains__(self, titulo):
+        return self.normalizar(titulo) in self._por_titulo
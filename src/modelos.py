@@ -1,8 +1,31 @@
+import sys
+from itertools import islice
+
+from src.indice import IndiceTitulos
+
+
+#Status válidos de mídias e episódios. O dicionário devolve sempre a mesma instância de cada
+#texto, então milhares de objetos compartilham três strings em vez de guardar uma cópia cada.
+STATUS_VALIDOS = {status: status for status in ("NÃO ASSISTIDO", "ASSISTINDO", "ASSISTIDO")}
+
+#Interna textos muito repetidos (gênero, classificação), compartilhando uma única cópia
+def _internar(texto):
+    return sys.intern(texto) if isinstance(texto, str) else texto
+
+
 class Midia:
     """
     Classe base para Filme e Série.
     Define atributos comuns (título, gênero, ano, status) e futuramente os métodos básicos
     """
+    #Atributos fixos (sem __dict__ por instância) para reduzir a memória de catálogos grandes
+    __slots__ = ("_titulo", "_ano", "_status", "_tipo", "_genero", "_duracao",
+                 "_classificacao", "_elenco", "_alterado", "_id", "_observador")
+
+    #Contador de renomeações (de qualquer mídia): as listas personalizadas, indexadas por título,
+    #comparam com ele para saber quando reindexar (ver ListaPersonalizada._mesmo_titulo)
+    _renomeacoes = 0
+
     def __init__(self,titulo,tipo,genero,ano,duracao_minutos,classificacao_indicativa,elenco,status):
 
         #Inicializando os atributos que serão validados
@@ -11,12 +34,21 @@ class Midia:
         self._status=None
         
         #Inicializando os demais atributos
-        self._tipo=tipo
-        self._genero=genero
+        self._tipo=_internar(tipo)
+        self._genero=_internar(genero)
         self._duracao=duracao_minutos
-        self._classificacao=classificacao_indicativa
+        self._classificacao=_internar(classificacao_indicativa)
         self._elenco=elenco
 
+        #Controle de alterações: toda mídia nova precisa ser gravada no banco
+        self._alterado=True
+
+        #Chave primária no banco de dados (None enquanto a mídia não for gravada)
+        self._id=None
+
+        #Catálogo que indexa esta mídia e deve ser avisado das alterações (ver src/catalogo.py)
+        self._observador=None
+
         #Chamando os setters implementados
         self.titulo=titulo
         self.status=status
@@ -32,7 +64,11 @@ class Midia:
     def titulo(self,novo_titulo):
         if not novo_titulo or not novo_titulo.strip():
             raise ValueError("Título não pode ser vazio")
-        self._titulo=novo_titulo
+        if novo_titulo != self._titulo:
+            if self._titulo is not None:
+                Midia._renomeacoes += 1
+            self._titulo=novo_titulo
+            self._marcar_alterado()
 
     # getter para o status
     @property
@@ -42,10 +78,12 @@ class Midia:
     #setter para o status, permite apenas os valores definidos: NÃO ASSISTIDO, ASSISTIDO E ASSISTINDO
     @status.setter
     def status(self, novo_status:str):
-        opcoes={"NÃO ASSISTIDO", "ASSISTIDO", "ASSISTINDO"}
-        if novo_status.strip().upper() not in opcoes:
+        status_normalizado=STATUS_VALIDOS.get(novo_status.strip().upper())
+        if status_normalizado is None:
             raise ValueError("O status deve ser uma das opções: NÃO ASSISTIDO, ASSISTINDO OU ASSISTIDO")
-        self._status=novo_status.strip().upper()
+        if status_normalizado != self._status:
+            self._status=status_normalizado
+            self._marcar_alterado()
     
     #getter para o ano
     @property
@@ -57,17 +95,60 @@ class Midia:
     def ano(self,novo_ano:int):
         if not isinstance(novo_ano, int) or novo_ano<=0:
             raise ValueError("O ano deve ser um inteiro positivo")
-        self._ano=novo_ano
+        if novo_ano != self._ano:
+            self._ano=novo_ano
+            self._marcar_alterado()
+
+    #getter para o id no banco de dados
+    @property
+    def id(self):
+        return self._id
+
+    #setter para o id, atribuído pela camada de dados; aceita None ou inteiro positivo
+    @id.setter
+    def id(self, novo_id):
+        if novo_id is not None and (not isinstance(novo_id, int) or novo_id <= 0):
+            raise ValueError("O id deve ser um inteiro positivo")
+        self._id=novo_id
+
+    #Controle de alterações (dirty tracking):
+
+    #Indica se a mídia possui alterações ainda não gravadas no banco
+    @property
+    def alterado(self):
+        return self._alterado
+
+    #Marca a mídia como alterada e avisa o catálogo, que reajusta seus índices
+    def _marcar_alterado(self):
+        self._alterado=True
+        self._notificar_observador()
+
+    def _notificar_observador(self):
+        if self._observador is not None:
+            self._observador._midia_alterada(self)
+
+    #Chamado pela camada de dados após gravar a mídia com sucesso
+    def marcar_salvo(self):
+        self._alterado=False
+
+    #Identidade da mídia: título (sem diferenciar maiúsculas), tipo e ano.
+    #Usada por __eq__/__hash__; muda com o título e o ano, por isso não serve de chave para
+    #estruturas que guardam a mídia por muito tempo (elas usam id(), ver ListaPersonalizada)
+    @property
+    def chave(self):
+        return (self._titulo.lower(), self._tipo, self._ano)
 
     #Métodos especiais:
 
     #Compara o título,tipo e ano das midias, se forem iguais as midias são iguais
     def __eq__(self, other):
         if isinstance(other, Midia):
-            return (self.titulo.lower() == other.titulo.lower() and 
-                    self._tipo == other._tipo and 
-                    self.ano == other.ano)
+            return self.chave == other.chave
         return False
+
+    #Hash coerente com __eq__: mídias iguais podem ser usadas em conjuntos e como chaves de dicionário
+    def __hash__(self):
+        return hash(self.chave)
     
     
     #Retorna uma representação de string legível para o usuário
@@ -87,6 +168,8 @@ class Filme(Midia):
     Representa um Filme. Herda características básicas de Midia.
     Contém atributos específicos como duração total e nota individual.
     """
+    __slots__ = ("_nota", "_data_conclusao")
+
     def __init__(self, titulo, genero, ano, classificacao, elenco, duracao_minutos,status,nota):
 
         #Chama o construtor da classe base (Midia) e passa os parâmetros que Midia trata
@@ -110,7 +193,9 @@ class Filme(Midia):
     def duracao(self,nova_duracao):
         if  not isinstance(nova_duracao,int) or nova_duracao <=0:
             raise ValueError("Duração deve ser um numero inteiro posistivo")
-        self._duracao=nova_duracao
+        if nova_duracao != self._duracao:
+            self._duracao=nova_duracao
+            self._marcar_alterado()
 
 
     #getter para a nota
@@ -124,7 +209,9 @@ class Filme(Midia):
         if nova_nota is not None:
             if not isinstance(nova_nota,float) or nova_nota < 0 or nova_nota > 10:
                 raise ValueError("A nota deve ser deixada em branco ou um número entre 0 e 10")
-        self._nota=nova_nota
+        if nova_nota != self._nota:
+            self._nota=nova_nota
+            self._marcar_alterado()
 
     #Métodos especiais:
 
@@ -134,14 +221,52 @@ class Filme(Midia):
             return self.nota < other.nota
         return False
 
-    
-    
+
+
+class AgregadosEpisodios:
+    """
+    Totais de episódios mantidos incrementalmente por Temporada e Série:
+    soma das notas, quantidade de avaliados, de assistidos, total de episódios e duração total.
+    Cada alteração de episódio ajusta os totais por diferença, sem percorrer a composição.
+    """
+    __slots__ = ("soma_notas", "avaliados", "assistidos", "total", "duracao")
+
+    def __init__(self, soma_notas=0.0, avaliados=0, assistidos=0, total=0, duracao=0):
+        self.soma_notas = soma_notas
+        self.avaliados = avaliados
+        self.assistidos = assistidos
+        self.total = total
+        self.duracao = duracao
+
+    #Cria os totais correspondentes a um único episódio
+    @classmethod
+    def do_episodio(cls, episodio):
+        return cls(episodio.nota or 0.0, int(episodio.nota is not None),
+                   int(episodio.status == "ASSISTIDO"), 1, episodio.duracao)
+
+    #Soma (sinal=1) ou subtrai (sinal=-1) outros totais a estes
+    def somar(self, outro, sinal=1):
+        self.soma_notas += sinal * outro.soma_notas
+        self.avaliados += sinal * outro.avaliados
+        self.assistidos += sinal * outro.assistidos
+        self.total += sinal * outro.total
+        self.duracao += sinal * outro.duracao
+
+    #Média das notas avaliadas (None se nenhum episódio foi avaliado)
+    def media_notas(self):
+        if self.avaliados == 0:
+            return None
+        return round(self.soma_notas / self.avaliados, 2)
+
+
 class Serie(Midia):
     """
     Representa uma Série. Herda características básicas de Midia e contém a estrutura de Temporadas e Episódios.
     É responsável por calcular sua nota média e gerenciar a mudança automática de status 
     (torna-se 'ASSISTIDA' quando todos os episódios forem concluídos).
     """
+    __slots__ = ("_temporadas", "_temporadas_alteradas", "_carregador_temporadas", "_agregados", "_proximo")
+
     def __init__(self, titulo, genero, ano, classificacao, elenco):
 
         #Chama o construtor da clsse base
@@ -150,6 +275,54 @@ class Serie(Midia):
         #Inicializa a estrutura de composição: um dicionário para armazenar Temporada
         self._temporadas = {} #Chave: número da temporada (int), Valor: objeto Temporada
 
+        #Temporadas novas ou com episódios alterados desde o último salvamento
+        self._temporadas_alteradas = set()
+
+        #Carregamento sob demanda: função que devolve as temporadas persistidas (ou None)
+        self._carregador_temporadas = None
+
+        #Totais de episódios mantidos incrementalmente (ver AgregadosEpisodios)
+        self._agregados = AgregadosEpisodios()
+
+        #Cursor de progresso: (temporada, episódio) do primeiro episódio não assistido, ou None
+        self._proximo = None
+
+    #getter para as temporadas, carregando-as do banco na primeira vez que forem necessárias
+    @property
+    def temporadas(self):
+        self._garantir_temporadas()
+        return self._temporadas
+
+    #Define a função que carrega as temporadas persistidas quando forem necessárias
+    def definir_carregador(self, carregador):
+        self._carregador_temporadas = carregador
+
+    #Indica se as temporadas já estão em memória
+    @property
+    def temporadas_carregadas(self):
+        return self._carregador_temporadas is None
+
+    #Executa o carregador pendente (uma única vez) e anexa as temporadas sem marcá-las como alteradas
+    def _garantir_temporadas(self):
+        if self._carregador_temporadas is None:
+            return
+        temporadas = self._carregador_temporadas()
+        self._carregador_temporadas = None
+
+        #Os totais passam a ser a soma das temporadas carregadas (substituem os vindos do banco)
+        self._agregados = AgregadosEpisodios()
+        for temporada in temporadas:
+            self._temporadas[temporada.numero] = temporada
+            temporada._serie = self
+            self._agregados.somar(temporada._agregados)
+        self._proximo = self._primeiro_nao_assistido()
+        self._notificar_observador()
+
+    #Define os totais de episódios de uma série ainda não carregada (lidos do banco)
+    def definir_agregados(self, agregados):
+        self._agregados = agregados
+        self._notificar_observador()
+
     #Metodo para adicionar temporadas na série
     def adicionar_temporada(self, temporada):
 
@@ -159,27 +332,108 @@ class Serie(Midia):
         
         #Verifica a unicidade da temporada
         numero_temporada = temporada.numero
-        if numero_temporada in self._temporadas:
+        if numero_temporada in self.temporadas:
             raise ValueError(f"A Temporada de número {numero_temporada} já existe nesta série.")
         
         #Adiciona o objeto temporada ao dicionario
         self._temporadas[numero_temporada]= temporada
+        temporada._serie = self
+        self._ajustar_agregados(temporada._agregados)
+        for numero_episodio in sorted(temporada._episodios):
+            episodio = temporada._episodios[numero_episodio]
+            if episodio.status != "ASSISTIDO":
+                self._atualizar_progresso(numero_temporada, episodio)
+                break
+
+        #Uma temporada recém-adicionada (ou com episódios novos) precisa ser gravada
+        if temporada.alterado:
+            self._temporada_alterada(temporada)
+
+    #Chamado pela Temporada quando os totais de seus episódios mudam
+    def _ajustar_agregados(self, diferenca, sinal=1):
+        self._agregados.somar(diferenca, sinal)
+        #Só a nota média interessa ao catálogo (o status automático já avisa pelo setter)
+        if diferenca.soma_notas or diferenca.avaliados:
+            self._notificar_observador()
+
+    #Progresso ("próximo episódio a assistir"):
+
+    #getter para o cursor de progresso: (temporada, episódio) ou None se não houver episódio pendente
+    #Vem do banco enquanto as temporadas não são carregadas, então não exige carregá-las
+    @property
+    def proximo_episodio(self):
+        return self._proximo
+
+    #Define o cursor de uma série ainda não carregada (lido do banco)
+    def definir_progresso(self, posicao):
+        self._proximo = posicao
+
+    #Devolve o objeto Episodio apontado pelo cursor (carrega as temporadas se preciso)
+    def obter_proximo_episodio(self):
+        self._garantir_temporadas()
+        if self._proximo is None:
+            return None
+        num_temp, num_ep = self._proximo
+        return self._temporadas[num_temp]._episodios[num_ep]
+
+    #Chamado pela Temporada quando um episódio é incluído ou muda de status.
+    #Um episódio pendente antes do cursor passa a ser o cursor; se o episódio do cursor foi
+    #assistido, o cursor avança a partir dele (sem voltar ao início da série).
+    def _atualizar_progresso(self, num_temp, episodio):
+        posicao = (num_temp, episodio.numero)
+        if episodio.status != "ASSISTIDO":
+            if self._proximo is None or posicao < self._proximo:
+                self._proximo = posicao
+        elif posicao == self._proximo:
+            self._proximo = self._primeiro_nao_assistido(apos=posicao)
+
+    #Primeiro episódio não assistido, em ordem de (temporada, episódio), depois da posição informada
+    def _primeiro_nao_assistido(self, apos=(0, 0)):
+        for num_temp in sorted(n for n in self._temporadas if n >= apos[0]):
+            episodios = self._temporadas[num_temp]._episodios
+            for num_ep in sorted(episodios):
+                if (num_temp, num_ep) > apos and episodios[num_ep].status != "ASSISTIDO":
+                    return (num_temp, num_ep)
+        return None
+
+    #Chamado pela Temporada quando ela (ou um de seus episódios) é alterada
+    def _temporada_alterada(self, temporada):
+        self._temporadas_alteradas.add(temporada)
+
+    #Uma série está alterada se seus próprios dados ou alguma temporada mudaram
+    @property
+    def alterado(self):
+        return self._alterado or bool(self._temporadas_alteradas)
+
+    #Marca a série e apenas as temporadas alteradas como gravadas
+    def marcar_salvo(self):
+        super().marcar_salvo()
+        for temporada in self._temporadas_alteradas:
+            temporada.marcar_salvo()
+        self._temporadas_alteradas.clear()
 
     #Metodo para calcular a nota média da série com base nas notas de todos os episodios que foram avaliados
+    #Usa os totais mantidos incrementalmente: O(1), sem carregar nem percorrer os episódios
     def calcular_nota_serie(self):
-        totalNotas=0
-        contadorAvaliacao=0
-        for temporada in self._temporadas.values():
-            for episodio in temporada._episodios.values():
-                if episodio.nota is not None:
-                     totalNotas+=episodio.nota
-                     contadorAvaliacao+=1
-        
-        if contadorAvaliacao==0:
-            return None
-        
-        media=totalNotas/contadorAvaliacao
-        return round(media,2)
+        return self._agregados.media_notas()
+
+    #getter para a duração total (em minutos) de todos os episódios da série
+    @property
+    def duracao_total(self):
+        return self._agregados.duracao
+
+    #getter para a quantidade de episódios assistidos
+    @property
+    def episodios_assistidos(self):
+        return self._agregados.assistidos
+
+    #Método Especial para retornar o número total de episódios da série
+    def __len__(self):
+        return self._agregados.total
+
+    #Visão dos episódios desta série em um armazém colunar (ver src/colunar.py), para análises vetorizadas
+    def visao_colunar(self, armazem):
+        return armazem.visao_serie(self.id)
     
     #Metodo para atualização automatica do status da série
     #Atualiza o status da Série baseando-se na conclusão dos episódios.
@@ -187,20 +441,13 @@ class Serie(Midia):
     
     def atualizar_status_automatico(self):
    
-        if not self._temporadas:
-            #Se não há temporadas, mantém como está ou define padrão
+        if self._agregados.total == 0:
+            #Se não há episódios, mantém como está ou define padrão
             return 
             
-        todos_concluidos = True
-        pelo_menos_um_visto = False
-        
-        #Percorre a hierarquia de composição: Série -> Temporadas -> Episódios
-        for temporada in self._temporadas.values():
-            for episodio in temporada._episodios.values(): 
-                if episodio.status == "ASSISTIDO":
-                    pelo_menos_um_visto = True
-                else:
-                    todos_concluidos = False
+        #Compara os totais mantidos incrementalmente: Série -> Temporadas -> Episódios
+        todos_concluidos = self._agregados.assistidos == self._agregados.total
+        pelo_menos_um_visto = self._agregados.assistidos > 0
 
         #Aplicação da Regra de Negócio de Transição de Status
         if todos_concluidos:
@@ -219,6 +466,10 @@ class Episodio:
     Representa um Episódio. É a menor unidade de mídia avaliável dentro de uma Série.
     Contém detalhes como número, título, duração, nota e status de visualização.
     """
+    #Episódios são os objetos mais numerosos do catálogo: sem __dict__ por instância
+    __slots__ = ("_numero", "_duracao", "_nota", "_status", "_titulo", "_data_lancamento",
+                 "_alterado", "_temporada")
+
     def __init__(self, numero: int, titulo: str, duracao: int, data_lancamento=None , nota: float = None, status: str = "NÃO ASSISTIDO"):
 
         #Inicializando atributos que serão validados
@@ -230,6 +481,10 @@ class Episodio:
         self._titulo = titulo
         self._data_lancamento = data_lancamento
 
+        #Controle de alterações: episódio novo e ainda sem temporada
+        self._alterado = True
+        self._temporada = None
+
         # Chamando os setters para validar os valores
         self.numero = numero
         self.duracao = duracao
@@ -260,7 +515,11 @@ class Episodio:
     def duracao(self, nova_duracao: int):
         if not isinstance(nova_duracao, int) or nova_duracao <= 0:
             raise ValueError("A duração deve ser um número inteiro positivo.")
-        self._duracao = nova_duracao
+        if nova_duracao != self._duracao:
+            diferenca = AgregadosEpisodios(duracao=nova_duracao - (self._duracao or 0))
+            self._duracao = nova_duracao
+            self._notificar_agregados(diferenca)
+            self._marcar_alterado()
 
 
     #getter para a nota
@@ -274,7 +533,12 @@ class Episodio:
         if nova_nota is not None:
             if not isinstance(nova_nota, (int, float)) or nova_nota < 0 or nova_nota > 10:
                 raise ValueError("A nota deve ser um valor numérico entre 0 e 10.")
-        self._nota = nova_nota
+        if nova_nota != self._nota:
+            diferenca = AgregadosEpisodios(soma_notas=(nova_nota or 0.0) - (self._nota or 0.0),
+                                           avaliados=(nova_nota is not None) - (self._nota is not None))
+            self._nota = nova_nota
+            self._notificar_agregados(diferenca)
+            self._marcar_alterado()
 
 
     #getter para o status
@@ -285,12 +549,33 @@ class Episodio:
     #setter para o status,verifica se está em uma das opções válidas
     @status.setter
     def status(self, novo_status: str):
-        OPCOES_VALIDAS = {"NÃO ASSISTIDO", "ASSISTIDO", "ASSISTINDO"}
-        status_normalizado = novo_status.strip().upper() 
+        status_normalizado = STATUS_VALIDOS.get(novo_status.strip().upper())
         
-        if status_normalizado not in OPCOES_VALIDAS:
+        if status_normalizado is None:
             raise ValueError("Status inválido para episódio.")    
-        self._status = status_normalizado
+        if status_normalizado != self._status:
+            diferenca = AgregadosEpisodios(assistidos=(status_normalizado == "ASSISTIDO") - (self._status == "ASSISTIDO"))
+            self._status = status_normalizado
+            self._notificar_agregados(diferenca)
+            if self._temporada is not None:
+                self._temporada._episodio_status_alterado(self)
+            self._marcar_alterado()
+
+    #Indica se o episódio possui alterações ainda não gravadas no banco
+    @property
+    def alterado(self):
+        return self._alterado
+
+    #Repassa à temporada (e dela à série) a diferença causada por uma alteração
+    def _notificar_agregados(self, diferenca):
+        if self._temporada is not None:
+            self._temporada._ajustar_agregados(diferenca)
+
+    #Marca o episódio como alterado e avisa a temporada que o contém
+    def _marcar_alterado(self):
+        self._alterado = True
+        if self._temporada is not None:
+            self._temporada._episodio_alterado(self)
 
 
         #Métodos especiais:
@@ -306,12 +591,25 @@ class Temporada:
     Representa uma Temporada de uma Série.
     Atua como um container que agrega objetos Episodio.
     """
+    __slots__ = ("_numero", "_episodios", "_alterado", "_episodios_alterados", "_serie", "_id", "_agregados")
+
     def __init__(self,numero_temporada: int):
 
         self._numero=None
         
         self._episodios={}
 
+        #Controle de alterações: temporada nova, episódios alterados e série que a contém
+        self._alterado=True
+        self._episodios_alterados=set()
+        self._serie=None
+
+        #Chave primária no banco de dados (None enquanto a temporada não for gravada)
+        self._id=None
+
+        #Totais de episódios mantidos incrementalmente (ver AgregadosEpisodios)
+        self._agregados=AgregadosEpisodios()
+
         self.numero=numero_temporada
 
     #getter para número de episodios
@@ -327,6 +625,18 @@ class Temporada:
         self._numero=novo_numero
 
 
+    #getter para o id no banco de dados
+    @property
+    def id(self):
+        return self._id
+
+    #setter para o id, atribuído pela camada de dados; aceita None ou inteiro positivo
+    @id.setter
+    def id(self, novo_id):
+        if novo_id is not None and (not isinstance(novo_id, int) or novo_id <= 0):
+            raise ValueError("O id deve ser um inteiro positivo")
+        self._id=novo_id
+
     #Métodos Especias:
 
     #Método para calcular o número total de episodios por temporada
@@ -346,6 +656,55 @@ class Temporada:
             raise ValueError(f"O Episódio de número {numero_episodio} já existe na Temporada {self.numero}.")
 
         self._episodios[numero_episodio]=episodio
+        episodio._temporada=self
+        self._ajustar_agregados(AgregadosEpisodios.do_episodio(episodio))
+        self._episodio_status_alterado(episodio)
+
+        #Um episódio recém-adicionado precisa ser gravado
+        if episodio.alterado:
+            self._episodio_alterado(episodio)
+
+    #Ajusta os totais da temporada e repassa a diferença para a série
+    def _ajustar_agregados(self, diferenca):
+        self._agregados.somar(diferenca)
+        if self._serie is not None:
+            self._serie._ajustar_agregados(diferenca)
+
+    #Repassa à série a inclusão ou mudança de status de um episódio (cursor de progresso)
+    def _episodio_status_alterado(self, episodio):
+        if self._serie is not None:
+            self._serie._atualizar_progresso(self.numero, episodio)
+
+    #getter para a duração total (em minutos) dos episódios da temporada
+    @property
+    def duracao_total(self):
+        return self._agregados.duracao
+
+    #Visão dos episódios desta temporada em um armazém colunar (ver src/colunar.py)
+    def visao_colunar(self, armazem):
+        if self._serie is None:
+            raise ValueError("A temporada precisa pertencer a uma série para ter uma visão colunar.")
+        return armazem.visao_temporada(self._serie.id, self.numero)
+
+    #Controle de alterações:
+
+    #Indica se a temporada é nova ou possui episódios alterados
+    @property
+    def alterado(self):
+        return self._alterado or bool(self._episodios_alterados)
+
+    #Chamado pelo Episodio quando ele é alterado; propaga o aviso para a série
+    def _episodio_alterado(self, episodio):
+        self._episodios_alterados.add(episodio)
+        if self._serie is not None:
+            self._serie._temporada_alterada(self)
+
+    #Marca a temporada e apenas os episódios alterados como gravados
+    def marcar_salvo(self):
+        self._alterado=False
+        for episodio in self._episodios_alterados:
+            episodio._alterado=False
+        self._episodios_alterados.clear()
 
 
 class Usuario:
@@ -353,9 +712,10 @@ class Usuario:
     Gerencia as coleções e o histórico de um usuário.
     Possui listas personalizadas (ListaPersonalizada) e registra o histórico de visualização.
     """
-    def __init__(self, nome: str, limite_listas: int = 5):
+    def __init__(self, nome: str, limite_listas: int = 5, id: int = None):
         
         #Inicializa atributos básicos
+        self.id = id #Id na tabela usuarios (None enquanto não persistido)
         self._nome = nome
         self._limite_listas = limite_listas 
         
@@ -391,20 +751,47 @@ class Usuario:
         return nova_lista
 
     #Metodo para adicionar uma mídia concluída ao histórico.
+    #Retorna o HistoricoItem criado para que a camada de dados possa gravá-lo imediatamente.
     def adicionar_ao_historico(self, midia, data_conclusao):
         #A validação de status 'ASSISTIDO'será feita no construtor do HistoricoItem
         item = HistoricoItem(midia, data_conclusao) 
         self._historico.append(item)
+        return item
+
+    #Metodo para retirar mídias excluídas do catálogo das listas e do histórico do usuário.
+    #O banco já removeu as linhas correspondentes (exclusão em cascata): nada fica pendente de gravação.
+    def esquecer_midias(self, midias):
+        """Retorna a quantidade de registros retirados do histórico."""
+        excluidas = {id(midia) for midia in midias}
+        for lista in self._listas.values():
+            for midia in [midia for midia in lista if id(midia) in excluidas]:
+                lista.descartar_midia(midia)
+
+        tamanho = len(self._historico)
+        self._historico[:] = [item for item in self._historico if id(item.midia) not in excluidas]
+        return tamanho - len(self._historico)
 
 class ListaPersonalizada:
     """
     Define uma lista customizada do usuário ("Para assistir", "Favoritos", etc.).
-    Contém uma coleção de objetos Midia. O limite é definido em settings.json.
+    Contém uma coleção ordenada de objetos Midia, guardada num dicionário indexado pela identidade
+    do objeto (id(), como os índices do Catalogo), que preserva a ordem de inserção e não muda se
+    a mídia for renomeada. Um índice de títulos atende a busca por título e a regra de duplicidade
+    (Midia.chave: título, tipo e ano), com pertinência, inclusão e remoção em O(1).
+    O limite é definido em settings.json.
     """
    
     def __init__(self, nome: str):
             self._nome = nome
-            self._midias = [] # Lista de objetos Midia
+            self._midias = {} # id(midia) -> objeto Midia, na ordem da lista
+            self._por_titulo = {} # Título normalizado -> {id(midia): objeto Midia} (título e ano podem repetir)
+            self._titulo_indexado = {} # id(midia) -> título normalizado com que a mídia foi indexada
+            self._renomeacoes = Midia._renomeacoes # Renomeações já refletidas no índice de títulos
+
+            #Alterações ainda não gravadas no banco (delta desde o último salvamento)
+            self._adicoes = []
+            self._remocoes = []
+            self._reordenada = False # A ordem mudou: todas as posições são regravadas
 
     
     #Adiciona uma Midia a lista
@@ -415,41 +802,196 @@ class ListaPersonalizada:
             raise TypeError("Apenas objetos do tipo Midia (Filme ou Série) podem ser adicionados à lista.")
             
         #Validação de unicidade na lista
-        if midia in self._midias:
+        if midia in self:
             raise ValueError(f"'{midia.titulo}' já está na lista '{self._nome}'.")
             
-        self._midias.append(midia)
+        self._incluir(midia)
+        self._registrar_adicoes([midia])
+
+    #Adiciona várias mídias de uma vez, na ordem recebida; as que já estão na lista são ignoradas
+    def adicionar_midias(self, midias):
+        """Retorna a quantidade de mídias incluídas."""
+        midias = list(midias)
+        if not all(isinstance(midia, Midia) for midia in midias):
+            raise TypeError("Apenas objetos do tipo Midia (Filme ou Série) podem ser adicionados à lista.")
+
+        novas = []
+        for midia in midias:
+            if midia not in self:
+                self._incluir(midia)
+                novas.append(midia)
+        self._registrar_adicoes(novas)
+        return len(novas)
 
     #Método para remover uma Midia da lista   
     def remover_midia(self, titulo_remover):
-        """Procura a mídia pelo título e remove o objeto correspondente."""
-        # Normaliza o título para a busca (minúsculas e sem espaços extras)
-        titulo_remover = titulo_remover.strip().lower()
-        
-        midia_encontrada = None
-        for midia in self._midias:
-            if midia.titulo.lower() == titulo_remover:
-                midia_encontrada = midia
-                break
+        """
+        Remove a mídia informada (objeto Midia, localizado pela identidade) ou, dado um título, a
+        encontrada pelo índice (sem diferenciar maiúsculas).
+        """
+        midia_encontrada = self._localizar(titulo_remover)
         
-        if midia_encontrada:
-            self._midias.remove(midia_encontrada)
-            return True
-        else:
-            # Lança uma exceção amigável ou retorna False
-            raise ValueError(f"Mídia '{titulo_remover}' não encontrada na lista.")
+        if midia_encontrada is None:
+            raise ValueError(f"Mídia '{getattr(titulo_remover, 'titulo', titulo_remover)}' não encontrada na lista.")
+
+        self._excluir(midia_encontrada)
+        self._registrar_remocoes([midia_encontrada])
+        return True
+
+    #Remove várias mídias (objetos Midia ou títulos); as que não estão na lista são ignoradas
+    def remover_midias(self, titulos):
+        """Retorna a quantidade de mídias removidas."""
+        removidas = []
+        for titulo in titulos:
+            midia = self._localizar(titulo)
+            if midia is not None:
+                self._excluir(midia)
+                removidas.append(midia)
+        self._registrar_remocoes(removidas)
+        return len(removidas)
+
+    #Retira uma mídia excluída do catálogo, sem registrar delta (o banco já removeu a linha)
+    def descartar_midia(self, midia):
+        if id(midia) not in self._midias:
+            return False
+        self._excluir(midia)
+        if midia in self._adicoes:
+            self._adicoes.remove(midia)
+        if midia in self._remocoes:
+            self._remocoes.remove(midia)
+        return True
+
+    #Move a mídia (objeto Midia ou título) para outra posição da lista (0 = início)
+    def mover(self, titulo, posicao):
+        midia = self._localizar(titulo)
+        if midia is None:
+            raise ValueError(f"Mídia '{getattr(titulo, 'titulo', titulo)}' não encontrada na lista.")
+        if not isinstance(posicao, int) or not 0 <= posicao < len(self._midias):
+            raise ValueError(f"Posição inválida: a lista '{self._nome}' tem {len(self._midias)} mídias.")
+
+        ordem = [outra for outra in self._midias.values() if outra is not midia]
+        ordem.insert(posicao, midia)
+        self._midias = {id(outra): outra for outra in ordem}
+        self._reordenada = True
+
+    #Busca exata por título (sem diferenciar maiúsculas); com títulos repetidos na lista
+    #(tipo ou ano diferentes), retorna a mídia incluída primeiro. None se não estiver na lista
+    def buscar(self, titulo):
+        mesmo_titulo = self._mesmo_titulo(IndiceTitulos.normalizar(titulo))
+        return next(iter(mesmo_titulo.values()), None)
+
+    #A mídia da lista correspondente a um objeto Midia (mesmo objeto ou mesmos título, tipo e ano)
+    #ou a um título (ver buscar). None se não estiver na lista
+    def _localizar(self, alvo):
+        if not isinstance(alvo, Midia):
+            return self.buscar(alvo)
+        if id(alvo) in self._midias:
+            return alvo
+        chave = alvo.chave
+        mesmo_titulo = self._mesmo_titulo(IndiceTitulos.normalizar(alvo.titulo))
+        return next((outra for outra in mesmo_titulo.values() if outra.chave == chave), None)
+
+    #Todas as mídias da lista com o título (sem diferenciar maiúsculas), na ordem de inclusão
+    def buscar_todas(self, titulo):
+        return list(self._mesmo_titulo(IndiceTitulos.normalizar(titulo)).values())
+
+    #Retorna as mídias da página `numero` (a partir de 1), com `tamanho` mídias por página
+    def pagina(self, numero, tamanho):
+        inicio = (numero - 1) * tamanho
+        return list(islice(self._midias.values(), inicio, inicio + tamanho))
+
+    #Mídias da lista com o título normalizado informado, acompanhando as renomeações
+    def _mesmo_titulo(self, titulo):
+        if self._renomeacoes != Midia._renomeacoes:
+            self._reindexar_titulos()
+        return self._por_titulo.get(titulo, {})
+
+    #Alguma mídia foi renomeada desde a última consulta: move as desta lista para o título atual
+    def _reindexar_titulos(self):
+        for chave, midia in self._midias.items():
+            titulo = IndiceTitulos.normalizar(midia.titulo)
+            if titulo != self._titulo_indexado[chave]:
+                self._retirar_do_titulo(chave)
+                self._por_titulo.setdefault(titulo, {})[chave] = midia
+                self._titulo_indexado[chave] = titulo
+        self._renomeacoes = Midia._renomeacoes
+
+    def _incluir(self, midia):
+        chave = id(midia)
+        titulo = IndiceTitulos.normalizar(midia.titulo)
+        self._midias[chave] = midia
+        self._por_titulo.setdefault(titulo, {})[chave] = midia
+        self._titulo_indexado[chave] = titulo
+
+    def _excluir(self, midia):
+        chave = id(midia)
+        del self._midias[chave]
+        self._retirar_do_titulo(chave)
+        del self._titulo_indexado[chave]
+
+    def _retirar_do_titulo(self, chave):
+        titulo = self._titulo_indexado[chave]
+        mesmo_titulo = self._por_titulo[titulo]
+        del mesmo_titulo[chave]
+        if not mesmo_titulo:
+            del self._por_titulo[titulo]
+
+    #Registra o delta: readicionar algo removido nesta sessão apenas cancela a remoção
+    #(a linha continua no banco, na posição antiga: a ordem precisa ser regravada)
+    def _registrar_adicoes(self, novas):
+        if self._remocoes and novas:
+            chaves = {midia.chave for midia in novas}
+            canceladas = {midia.chave for midia in self._remocoes if midia.chave in chaves}
+            if canceladas:
+                self._remocoes = [midia for midia in self._remocoes if midia.chave not in canceladas]
+                novas = [midia for midia in novas if midia.chave not in canceladas]
+                self._reordenada = True
+        self._adicoes.extend(novas)
+
+    #Registra o delta: remover algo adicionado nesta sessão apenas cancela a adição
+    def _registrar_remocoes(self, removidas):
+        if self._adicoes and removidas:
+            chaves = {midia.chave for midia in removidas}
+            canceladas = {midia.chave for midia in self._adicoes if midia.chave in chaves}
+            self._adicoes = [midia for midia in self._adicoes if midia.chave not in canceladas]
+            removidas = [midia for midia in removidas if midia.chave not in canceladas]
+        self._remocoes.extend(removidas)
+
+    #Indica se a lista possui adições, remoções ou mudanças de ordem ainda não gravadas no banco
+    @property
+    def alterada(self):
+        return bool(self._adicoes or self._remocoes or self._reordenada)
+
+    #Chamado pela camada de dados após gravar o delta da lista
+    def marcar_salvo(self):
+        self._adicoes.clear()
+        self._remocoes.clear()
+        self._reordenada = False
 
     #Método Especial para retornar o número de mídias na lista
     def __len__(self):
         return len(self._midias)
+
+    #Percorre as mídias na ordem da lista
+    def __iter__(self):
+        return iter(self._midias.values())
+
+    #Pertinência pela identidade da mídia (título, tipo e ano), comparada entre as de mesmo título
+    def __contains__(self, midia):
+        if not isinstance(midia, Midia):
+            return False
+        return self._localizar(midia) is not None
     
 
 class HistoricoItem:
     """
     Um item no histórico de visualização do usuário.
     Registra a mídia concluída e a data/hora exata de conclusão, essencial para relatórios de consumo.
+    A duração concluída é calculada uma única vez e guardada junto ao registro.
     """
-    def __init__(self,midia, data_conclusao):
+    __slots__ = ("_midia", "_data_conclusao", "_duracao", "_id")
+
+    def __init__(self,midia, data_conclusao, duracao=None):
 
         #Verifica se o objeto a ser recebidp é uma Mídia(Filme ou Série)
         if not isinstance(midia, Midia):
@@ -462,21 +1004,50 @@ class HistoricoItem:
         self._midia = midia
         self._data_conclusao = data_conclusao
 
-    #getter para a duração da mídia    
+        #Duração concluída em minutos (None: ainda não calculada)
+        self._duracao = duracao
+
+        #Chave primária no banco de dados (None enquanto o registro não for gravado)
+        self._id = None
+
+    #getter para o id no banco de dados
+    @property
+    def id(self):
+        return self._id
+
+    #setter para o id, atribuído pela camada de dados; aceita None ou inteiro positivo
+    @id.setter
+    def id(self, novo_id):
+        if novo_id is not None and (not isinstance(novo_id, int) or novo_id <= 0):
+            raise ValueError("O id deve ser um inteiro positivo")
+        self._id = novo_id
+
+    #getter para a mídia registrada
+    @property
+    def midia(self):
+        return self._midia
+
+    #getter para a data de conclusão
+    @property
+    def data_conclusao(self):
+        return self._data_conclusao
+
+    #getter para a duração da mídia (calculada no primeiro acesso e guardada no registro)
     @property
     def duracao_concluida(self):
+        if self._duracao is None:
+            self._duracao = self._calcular_duracao()
+        return self._duracao
+
+    #Calcula a duração concluída a partir da mídia
+    def _calcular_duracao(self):
         #Para Filmes, acessa a propriedade duracao da classe Filme
         if self._midia._tipo == "FILME":
             return self._midia.duracao
         
-        #Para Séries, deve-se somar a duração dos episódios assistidos
+        #Para Séries, usa a duração total mantida incrementalmente pela série (O(1))
         if self._midia._tipo == "SERIE":
-            duracao_serie = 0
-            for temporada in self._midia._temporadas.values():
-                for episodio in temporada._episodios.values():
-                    # Adiciona a duração de cada episódio
-                    duracao_serie += episodio.duracao
-            return duracao_serie
+            return self._midia.duracao_total
         
         #Caso não seja um tipo válido
         return 0
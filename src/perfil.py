@@ -0,0 +1,86 @@
+# src/perfil.py
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class PerfilInicializacao:
+    """
+    Tempo gasto em cada etapa da inicialização do sistema (imports, verificação do esquema,
+    cada consulta de carga, construção dos objetos, listas, índices...), para achar o que pesa
+    no cold start. Desativado por padrão: etapa() então devolve um contexto vazio, sem medir nada.
+
+    Etapas podem ser aninhadas; cada uma registra apenas o tempo próprio (descontando as etapas
+    internas), de modo que a soma das etapas não conta nada duas vezes.
+    Pensado para a thread principal durante a inicialização (não é protegido contra threads).
+    """
+    def __init__(self):
+        self.ativo = False
+        self._etapas = []   #Lista de (nome, segundos), na ordem em que terminaram
+        self._pilha = []    #Tempo das etapas internas de cada etapa em andamento
+        self._inicio = None
+
+    def ativar(self):
+        """Passa a medir as etapas; o total do relatório conta a partir daqui."""
+        self.ativo = True
+        self._etapas.clear()
+        self._inicio = time.perf_counter()
+
+    def etapa(self, nome):
+        """
+        Gerenciador de contexto que mede o bloco como a etapa `nome`:
+
+            with PERFIL.etapa("consulta de mídias"):
+                linhas = cursor.execute(...).fetchall()
+        """
+        if not self.ativo:
+            return nullcontext()
+        return self._medir(nome)
+
+    @contextmanager
+    def _medir(self, nome):
+        self._pilha.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            decorrido = time.perf_counter() - inicio
+            internas = self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1] += decorrido
+            self._etapas.append((nome, decorrido - internas))
+
+    def registrar(self, nome, segundos):
+        """
+        Registra uma etapa medida por fora que terminou agora (ex.: os imports, que podem ter
+        começado antes da ativação); o total do relatório passa a contar desde o início dela.
+        """
+        if self.ativo:
+            self._etapas.append((nome, segundos))
+            self._inicio = min(self._inicio, time.perf_counter() - segundos)
+
+    def etapas(self):
+        """Retorna {nome: segundos}, somando etapas de mesmo nome, na ordem da primeira ocorrência."""
+        totais = {}
+        for nome, segundos in self._etapas:
+            totais[nome] = totais.get(nome, 0.0) + segundos
+        return totais
+
+    def relatorio(self):
+        """Texto com o tempo (ms e %) de cada etapa e o total desde a ativação."""
+        total = time.perf_counter() - self._inicio if self._inicio is not None else 0.0
+        etapas = self.etapas()
+        nao_medido = total - sum(etapas.values())
+        linhas = ["⏱️  Perfil da inicialização:"]
+        for nome, segundos in list(etapas.items()) + [("(fora das etapas)", nao_medido)]:
+            percentual = segundos / total * 100 if total else 0.0
+            linhas.append(f"   {nome:<36s} {segundos * 1000:9.1f} ms  {percentual:5.1f}%")
+        linhas.append(f"   {'TOTAL':<36s} {total * 1000:9.1f} ms")
+        return "\n".join(linhas)
+
+
+#Perfil global da inicialização: ativado por CATALOGO_PERFIL=1 ou por python -m src.cli --perfil
+PERFIL = PerfilInicializacao()
+if os.environ.get('CATALOGO_PERFIL'):
+    PERFIL.ativar()
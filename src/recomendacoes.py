@@ -0,0 +1,78 @@
+# src/recomendacoes.py
+
+from collections import Counter
+from heapq import nsmallest
+
+from src.catalogo import Catalogo
+from src.config import SETTINGS
+
+
+class MotorRecomendacoes:
+    """
+    Motor de recomendações sobre o catálogo indexado (src/catalogo.py).
+    - Mais bem avaliadas: filmes e séries com nota >= NOTA_MINIMA_RECOMENDADO (settings.json),
+      lidos do topo do índice ordenado por nota do catálogo, que acompanha cada nova avaliação;
+    - Por gênero: títulos ainda não assistidos dos gêneros que mais aparecem no histórico do usuário.
+    """
+    def __init__(self, catalogo, historico=None):
+        self._catalogo = catalogo
+        self._generos = Counter() #Chave: gênero (sem diferenciar maiúsculas), Valor: itens no histórico
+        self._nomes_generos = {}  #Gênero normalizado -> gênero como aparece no catálogo
+
+        for item in historico or []:
+            self.adicionar(item)
+
+    #Conta o gênero de um HistoricoItem (chamado a cada item novo do histórico)
+    def adicionar(self, item):
+        genero = item.midia._genero
+        if not genero:
+            return
+        chave = genero.casefold()
+        self._generos[chave] += 1
+        self._nomes_generos.setdefault(chave, genero)
+
+    #Nota mínima configurável para uma mídia ser recomendada
+    @staticmethod
+    def nota_minima():
+        return SETTINGS.get('NOTA_MINIMA_RECOMENDADO', 8.0)
+
+    def mais_bem_avaliadas(self, limite=10, nota_minima=None):
+        """
+        As `limite` mídias de maior nota entre as que atingem a nota mínima.
+        Custa O(limite): o índice do catálogo já está ordenado.
+
+        Returns:
+            list: Tuplas (nota, midia), da maior para a menor nota.
+        """
+        if nota_minima is None:
+            nota_minima = self.nota_minima()
+        return self._catalogo.por_nota(nota_minima=nota_minima, limite=limite)
+
+    def generos_favoritos(self, limite=3):
+        """Gêneros mais frequentes no histórico. Returns: list de tuplas (genero, quantidade)."""
+        return [(self._nomes_generos[chave], quantidade) for chave, quantidade in self._generos.most_common(limite)]
+
+    def sugestoes_por_genero(self, limite=10, generos=3):
+        """
+        Títulos NÃO ASSISTIDOS dos gêneros favoritos, do gênero mais frequente para o menos
+        frequente e, dentro de cada gênero, dos mais bem avaliados para os sem nota.
+        Cada gênero é consultado pelos índices do catálogo (status x gênero), sem varrer o catálogo.
+
+        Returns:
+            list: Tuplas (genero, midia).
+        """
+        sugestoes = []
+        for genero, _ in self.generos_favoritos(generos):
+            restante = limite - len(sugestoes)
+            if restante <= 0:
+                break
+            candidatas = self._catalogo.filtrar(status="NÃO ASSISTIDO", genero=genero)
+            melhores = nsmallest(restante, candidatas, key=_chave_sugestao)
+            sugestoes.extend((genero, midia) for midia in melhores)
+        return sugestoes
+
+
+#Ordem das sugestões: maior nota primeiro (sem nota por último), depois título
+def _chave_sugestao(midia):
+    nota = Catalogo.nota_da_midia(midia)
+    return (nota is None, -(nota or 0), midia.titulo.casefold())
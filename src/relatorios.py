@@ -0,0 +1,182 @@
+# src/relatorios.py
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+from src.config import SETTINGS
+
+
+class _SerieAcumulada:
+    """
+    Estrutura auxiliar do motor de relatórios.
+    Mantém as datas de conclusão ordenadas e as somas prefixadas das durações,
+    de modo que o total de qualquer intervalo [inicio, fim) sai de duas buscas binárias.
+    """
+    def __init__(self):
+        self._datas = []
+        self._duracoes = []
+        self._prefixos = [0] # _prefixos[i] = soma das i primeiras durações
+
+    #Insere um ponto. Inserções em ordem cronológica (o caso comum) custam O(1);
+    #inserções fora de ordem invalidam as somas, que são reconstruídas na próxima consulta.
+    def adicionar(self, data_conclusao, duracao):
+        if not self._datas or data_conclusao >= self._datas[-1]:
+            self._datas.append(data_conclusao)
+            self._duracoes.append(duracao)
+            if self._prefixos is not None:
+                self._prefixos.append(self._prefixos[-1] + duracao)
+            return
+
+        posicao = bisect_right(self._datas, data_conclusao)
+        self._datas.insert(posicao, data_conclusao)
+        self._duracoes.insert(posicao, duracao)
+        self._prefixos = None
+
+    #Reconstrói as somas prefixadas quando foram invalidadas
+    def _garantir_prefixos(self):
+        if self._prefixos is None:
+            prefixos = [0]
+            for duracao in self._duracoes:
+                prefixos.append(prefixos[-1] + duracao)
+            self._prefixos = prefixos
+
+    #Soma das durações concluídas em [inicio, fim)
+    def total(self, inicio, fim):
+        self._garantir_prefixos()
+        i = bisect_left(self._datas, inicio)
+        j = bisect_left(self._datas, fim)
+        if j <= i:
+            return 0
+        return self._prefixos[j] - self._prefixos[i]
+
+    def __len__(self):
+        return len(self._datas)
+
+
+class MotorRelatorios:
+    """
+    Motor de relatórios de tempo assistido.
+    Indexa o histórico do usuário por data de conclusão com as durações já calculadas,
+    respondendo a qualquer intervalo [inicio, fim) por busca binária sobre somas prefixadas,
+    inclusive quebrado por dia, semana, mês ou gênero.
+    A conversão de minutos para horas usa MULTIPLICADOR_MIN_PARA_HORAS do settings.json.
+    """
+    GRANULARIDADES = ("dia", "semana", "mes")
+
+    def __init__(self, historico=None):
+        self._geral = _SerieAcumulada()
+        self._por_genero = {} #Chave: gênero (str), Valor: _SerieAcumulada
+
+        for item in historico or []:
+            self.adicionar(item)
+
+    #Indexa um HistoricoItem (a duração é lida uma única vez, no momento da inclusão)
+    def adicionar(self, item):
+        duracao = item.duracao_concluida
+        data_conclusao = item.data_conclusao
+        genero = item.midia._genero or "SEM GÊNERO"
+
+        self._geral.adicionar(data_conclusao, duracao)
+        if genero not in self._por_genero:
+            self._por_genero[genero] = _SerieAcumulada()
+        self._por_genero[genero].adicionar(data_conclusao, duracao)
+
+    #Converte minutos em horas usando o multiplicador configurável
+    @staticmethod
+    def minutos_para_horas(minutos):
+        multiplicador_horas = SETTINGS.get('MULTIPLICADOR_MIN_PARA_HORAS', 60)
+        return round(minutos / multiplicador_horas, 2)
+
+    def tempo_assistido(self, inicio, fim):
+        """
+        Calcula o tempo total assistido no intervalo [inicio, fim).
+
+        Returns:
+            tuple: (total_minutos, total_horas_arredondado)
+        """
+        inicio, fim = _normalizar_intervalo(inicio, fim)
+        minutos = self._geral.total(inicio, fim)
+        return minutos, self.minutos_para_horas(minutos)
+
+    def tempo_ultimos_dias(self, dias, agora=None):
+        """Atalho para o tempo assistido nos últimos `dias` dias até agora."""
+        agora = agora or datetime.now()
+        return self.tempo_assistido(agora - timedelta(days=dias), agora + timedelta(microseconds=1))
+
+    def por_periodo(self, inicio, fim, granularidade="dia"):
+        """
+        Quebra o tempo assistido em [inicio, fim) por dia, semana (segunda a domingo) ou mês.
+
+        Returns:
+            list: Tuplas (inicio_do_periodo: date, minutos) em ordem cronológica.
+        """
+        if granularidade not in self.GRANULARIDADES:
+            raise ValueError("Granularidade inválida. Use 'dia', 'semana' ou 'mes'.")
+        inicio, fim = _normalizar_intervalo(inicio, fim)
+
+        resultado = []
+        corte = _inicio_do_periodo(inicio, granularidade)
+        while corte < fim:
+            proximo = _proximo_periodo(corte, granularidade)
+            minutos = self._geral.total(max(corte, inicio), min(proximo, fim))
+            resultado.append((corte.date(), minutos))
+            corte = proximo
+        return resultado
+
+    def por_dia(self, inicio, fim):
+        return self.por_periodo(inicio, fim, "dia")
+
+    def por_semana(self, inicio, fim):
+        return self.por_periodo(inicio, fim, "semana")
+
+    def por_mes(self, inicio, fim):
+        return self.por_periodo(inicio, fim, "mes")
+
+    def por_genero(self, inicio, fim):
+        """
+        Tempo assistido em [inicio, fim) por gênero, do mais assistido para o menos assistido.
+
+        Returns:
+            list: Tuplas (genero, minutos) apenas para gêneros com tempo no intervalo.
+        """
+        inicio, fim = _normalizar_intervalo(inicio, fim)
+        totais = [(genero, serie.total(inicio, fim)) for genero, serie in self._por_genero.items()]
+        return sorted([t for t in totais if t[1] > 0], key=lambda t: (-t[1], t[0]))
+
+    #Método Especial para retornar o número de itens indexados
+    def __len__(self):
+        return len(self._geral)
+
+
+#Funções auxiliares de datas:
+
+#Aceita date ou datetime; datas puras viram meia-noite do dia
+def _como_datetime(valor):
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day)
+    raise TypeError("As datas do relatório devem ser date ou datetime.")
+
+def _normalizar_intervalo(inicio, fim):
+    inicio, fim = _como_datetime(inicio), _como_datetime(fim)
+    if fim < inicio:
+        raise ValueError("A data final do relatório deve ser posterior à inicial.")
+    return inicio, fim
+
+def _inicio_do_periodo(momento, granularidade):
+    dia = datetime(momento.year, momento.month, momento.day)
+    if granularidade == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if granularidade == "mes":
+        return dia.replace(day=1)
+    return dia
+
+def _proximo_periodo(corte, granularidade):
+    if granularidade == "semana":
+        return corte + timedelta(weeks=1)
+    if granularidade == "mes":
+        if corte.month == 12:
+            return corte.replace(year=corte.year + 1, month=1)
+        return corte.replace(month=corte.month + 1)
+    return corte + timedelta(days=1)
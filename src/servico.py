@@ -0,0 +1,453 @@
+# src/servico.py
+"""
+Modo serviço: expõe o catálogo em uma API HTTP/JSON local, com asyncio (somente biblioteca padrão).
+
+Um único catálogo em memória (Catalogo, relatórios e recomendações, como no CLI) é
+compartilhado por todas as conexões. Consultas respondem direto da memória, no laço de
+eventos; o trabalho com o banco (busca textual, carga de temporadas, gravações) roda em um
+pool de threads, cada uma com a sua conexão (src/conexao.py). As alterações são serializadas
+por uma trava assíncrona, para que duas requisições não gravem a mesma mídia ao mesmo tempo.
+
+Uso:
+    python -m src.servico [--host 127.0.0.1] [--porta 8080] [--usuario Davi] [--threads 4]
+
+Endpoints (corpos em JSON):
+    GET    /midias?status=&genero=&ano=&tipo=    Filtra o catálogo (índices em memória)
+    GET    /midias/{id}                          Detalhes (séries: temporadas e episódios)
+    POST   /midias/{id}/status                   {"status", "nota"}; em séries, também {"temporada", "episodio"}
+    POST   /midias/{id}/proximo                  Marca o próximo episódio da série: {"nota"} opcional
+    GET    /busca?q=texto                        Busca textual (FTS5) em mídias e episódios
+    GET    /continuar                            Próximo episódio de cada série em andamento
+    GET    /listas                               Listas personalizadas e seu conteúdo
+    POST   /listas                               {"nome"}
+    POST   /listas/{nome}/midias                 {"id"}
+    DELETE /listas/{nome}/midias/{id}
+    GET    /relatorios/tempo?dias=30             ou ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD[&por=dia|semana|mes]
+    GET    /relatorios/generos?inicio=&fim=      Tempo assistido por gênero no período
+    GET    /recomendacoes                        Mais bem avaliados e sugestões por gênero
+"""
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.catalogo import Catalogo
+from src.config import SETTINGS
+from src.dados import (buscar_texto, carregar_catalogo, carregar_listas_personalizadas, entrar_usuario,
+                       fechar_conexoes, registrar_item_historico, salvar_listas_usuario, salvar_midia)
+from src.modelos import STATUS_VALIDOS, Filme, Serie, Usuario
+from src.recomendacoes import MotorRecomendacoes
+from src.relatorios import MotorRelatorios
+
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+
+class ErroHttp(Exception):
+    """Erro com status HTTP, devolvido ao cliente como {"erro": mensagem}."""
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class ServicoCatalogo:
+    """
+    Servidor HTTP/1.1 (com keep-alive) sobre asyncio.start_server e as rotas da API.
+    Os handlers recebem (consulta, corpo, *grupos da rota) e retornam (status, objeto JSON).
+    """
+    def __init__(self, threads=4):
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="catalogo-db")
+        self._trava = None #asyncio.Lock, criada dentro do laço de eventos em carregar()
+        self.catalogo = Catalogo()
+        self.usuario = None
+        self.relatorios = None
+        self.recomendacoes = None
+        self._por_id = {} #Chave: id da mídia no banco, Valor: objeto Midia
+        self._rotas = [(metodo, re.compile(padrao + "$"), handler) for metodo, padrao, handler in (
+            ("GET", r"/midias", self.listar_midias),
+            ("GET", r"/midias/(\d+)", self.detalhes_midia),
+            ("POST", r"/midias/(\d+)/status", self.atualizar_status),
+            ("POST", r"/midias/(\d+)/proximo", self.marcar_proximo),
+            ("GET", r"/busca", self.buscar),
+            ("GET", r"/continuar", self.continuar_assistindo),
+            ("GET", r"/listas", self.listar_listas),
+            ("POST", r"/listas", self.criar_lista),
+            ("POST", r"/listas/([^/]+)/midias", self.adicionar_a_lista),
+            ("DELETE", r"/listas/([^/]+)/midias/(\d+)", self.remover_da_lista),
+            ("GET", r"/relatorios/tempo", self.relatorio_tempo),
+            ("GET", r"/relatorios/generos", self.relatorio_generos),
+            ("GET", r"/recomendacoes", self.listar_recomendacoes),
+        )]
+
+    #Executa uma função bloqueante (acesso ao banco) no pool de threads
+    async def _no_banco(self, funcao, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(funcao, *args))
+
+    async def carregar(self, nome_usuario=None):
+        """Carrega do banco o catálogo, o histórico e as listas do usuário (como inicializar_sistema do CLI)."""
+        self._trava = asyncio.Lock()
+        await self._no_banco(self._carregar, nome_usuario or SETTINGS.get('USUARIO_PADRAO', 'Davi'))
+
+    def _carregar(self, nome_usuario):
+        usuario_id, nome, limite = entrar_usuario(nome_usuario)
+        midias, historico = carregar_catalogo()
+
+        self.usuario = Usuario(nome=nome, limite_listas=limite or SETTINGS['LIMITE_LISTAS_PERSONALIZADAS'],
+                               id=usuario_id)
+        self.usuario._historico.extend(historico)
+        carregar_listas_personalizadas(self.usuario, midias)
+
+        self._por_id = dict(midias)
+        self.catalogo = Catalogo(midias.values())
+        self.relatorios = MotorRelatorios(self.usuario._historico)
+        self.recomendacoes = MotorRecomendacoes(self.catalogo, self.usuario._historico)
+
+    #Servidor HTTP:
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão: lê requisições em sequência enquanto o cliente mantiver o keep-alive."""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                partes = linha.decode("latin-1").split()
+                if len(partes) != 3:
+                    escritor.write(_resposta(400, {"erro": "Requisição inválida."}, manter=False))
+                    break
+                metodo, alvo, versao = partes
+
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                except ValueError:
+                    tamanho = -1
+                if tamanho < 0:
+                    escritor.write(_resposta(400, {"erro": "Content-Length inválido."}, manter=False))
+                    break
+                if tamanho > TAMANHO_MAXIMO_CORPO:
+                    escritor.write(_resposta(413, {"erro": "Corpo da requisição muito grande."}, manter=False))
+                    break
+                corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+                manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                status, conteudo = await self.tratar(metodo, alvo, corpo)
+                escritor.write(_resposta(status, conteudo, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def tratar(self, metodo, alvo, corpo):
+        """Encaminha a requisição para a rota e converte erros em respostas JSON."""
+        url = urlsplit(alvo)
+        caminho = url.path.rstrip("/") or "/"
+        consulta = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+
+        metodo_aceito = False
+        for metodo_rota, padrao, handler in self._rotas:
+            encontrado = padrao.match(caminho)
+            if not encontrado:
+                continue
+            if metodo_rota != metodo:
+                metodo_aceito = True
+                continue
+            try:
+                dados_corpo = json.loads(corpo) if corpo else {}
+                return await handler(consulta, dados_corpo, *encontrado.groups())
+            except ErroHttp as e:
+                return e.status, {"erro": str(e)}
+            except KeyError as e:
+                return 400, {"erro": f"Campo obrigatório ausente: {e}"}
+            except (ValueError, TypeError) as e: #Validações dos setters dos modelos e JSON inválido
+                return 400, {"erro": str(e)}
+            except Exception as e:
+                print(f"❌ Erro inesperado em {metodo} {caminho}: {e}")
+                return 500, {"erro": "Erro interno do servidor."}
+
+        if metodo_aceito:
+            return 405, {"erro": f"Método {metodo} não permitido em {caminho}."}
+        return 404, {"erro": f"Rota {caminho} não encontrada."}
+
+    #Mídias:
+
+    def _midia(self, midia_id):
+        midia = self._por_id.get(int(midia_id))
+        if midia is None or midia not in self.catalogo:
+            raise ErroHttp(404, f"Mídia {midia_id} não encontrada.")
+        return midia
+
+    async def listar_midias(self, consulta, corpo):
+        ano = consulta.get("ano")
+        midias = self.catalogo.filtrar(status=consulta.get("status"), genero=consulta.get("genero"),
+                                       ano=int(ano) if ano else None, tipo=consulta.get("tipo"))
+        return 200, [_resumo_midia(midia) for midia in midias]
+
+    async def detalhes_midia(self, consulta, corpo, midia_id):
+        midia = self._midia(midia_id)
+        if isinstance(midia, Serie) and not midia.temporadas_carregadas:
+            async with self._trava:
+                await self._no_banco(lambda: midia.temporadas) #Carga preguiçosa fora do laço de eventos
+        return 200, _detalhes_midia(midia)
+
+    async def atualizar_status(self, consulta, corpo, midia_id):
+        midia = self._midia(midia_id)
+        #Valida e converte o corpo antes de tocar na mídia: um pedido inválido não deixa nada pela metade
+        status_direto = isinstance(midia, Filme) or "temporada" not in corpo #Status da própria mídia, e não de um episódio
+        status = _status(corpo["status"] if status_direto else corpo.get("status", "ASSISTIDO"))
+        nota = _nota(corpo["nota"]) if "nota" in corpo else None
+        async with self._trava:
+            if isinstance(midia, Filme):
+                anteriores = [(midia, "status", midia.status), (midia, "nota", midia.nota)]
+                midia.status = status
+                if "nota" in corpo:
+                    midia.nota = nota
+
+            elif "temporada" in corpo:
+                await self._no_banco(lambda: midia.temporadas)
+                episodio = _episodio(midia, corpo["temporada"], corpo.get("episodio"))
+                anteriores = [(midia, "status", midia.status), (episodio, "status", episodio.status),
+                              (episodio, "nota", episodio.nota)]
+                episodio.status = status
+                if "nota" in corpo:
+                    episodio.nota = nota
+                #REGRA DE NEGÓCIO: A série atualiza seu status baseada nos episódios
+                midia.atualizar_status_automatico()
+
+            else:
+                anteriores = [(midia, "status", midia.status)]
+                midia.status = status
+
+            await self._gravar(midia, anteriores)
+            if status_direto and midia.status == "ASSISTIDO":
+                await self._registrar_conclusao(midia)
+        return 200, _resumo_midia(midia)
+
+    async def marcar_proximo(self, consulta, corpo, midia_id):
+        midia = self._midia(midia_id)
+        if not isinstance(midia, Serie):
+            raise ErroHttp(400, f"'{midia.titulo}' não é uma série.")
+        nota = _nota(corpo.get("nota"))
+        async with self._trava:
+            episodio = await self._no_banco(midia.obter_proximo_episodio)
+            if episodio is None:
+                raise ErroHttp(409, "Não há episódios pendentes nesta série.")
+            anteriores = [(midia, "status", midia.status), (episodio, "status", episodio.status),
+                          (episodio, "nota", episodio.nota)]
+            episodio.status = "ASSISTIDO"
+            if nota is not None:
+                episodio.nota = nota
+            midia.atualizar_status_automatico()
+            await self._gravar(midia, anteriores)
+        return 200, _resumo_midia(midia)
+
+    #Grava a mídia; se a gravação falhar, devolve os atributos (objeto, nome, valor) aos valores anteriores
+    async def _gravar(self, midia, anteriores):
+        if not await self._no_banco(salvar_midia, midia):
+            for objeto, atributo, valor in reversed(anteriores):
+                setattr(objeto, atributo, valor)
+            raise ErroHttp(500, f"Não foi possível gravar '{midia.titulo}' no banco.")
+
+    #Registra a mídia concluída no histórico, nos relatórios e nas recomendações (como o CLI)
+    async def _registrar_conclusao(self, midia):
+        item = self.usuario.adicionar_ao_historico(midia, datetime.now())
+        await self._no_banco(registrar_item_historico, item)
+        self.relatorios.adicionar(item)
+        self.recomendacoes.adicionar(item)
+
+    async def buscar(self, consulta, corpo):
+        texto = consulta.get("q", "").strip()
+        if not texto:
+            raise ErroHttp(400, "Informe o texto da busca em ?q=.")
+        midias, episodios = await self._no_banco(buscar_texto, texto)
+        return 200, {
+            "midias": [{"id": midia_id, "titulo": titulo, "tipo": tipo, "ano": ano, "genero": genero}
+                       for midia_id, titulo, tipo, ano, genero in midias],
+            "episodios": [{"serie_id": serie_id, "serie": titulo_serie, "temporada": num_temp,
+                           "episodio": num_ep, "titulo": titulo_ep}
+                          for serie_id, titulo_serie, num_temp, num_ep, titulo_ep in episodios],
+        }
+
+    async def continuar_assistindo(self, consulta, corpo):
+        return 200, [{"id": serie.id, "titulo": serie.titulo, "temporada": serie.proximo_episodio[0],
+                      "episodio": serie.proximo_episodio[1]}
+                     for serie in self.catalogo.filtrar(status="ASSISTINDO", tipo="SERIE")
+                     if serie.proximo_episodio is not None]
+
+    #Listas personalizadas:
+
+    def _lista(self, nome):
+        lista = self.usuario.listas.get(unquote(nome).strip().upper())
+        if lista is None:
+            raise ErroHttp(404, f"Lista '{unquote(nome)}' não encontrada.")
+        return lista
+
+    async def listar_listas(self, consulta, corpo):
+        return 200, {nome: [_resumo_midia(midia) for midia in lista]
+                     for nome, lista in self.usuario.listas.items()}
+
+    async def criar_lista(self, consulta, corpo):
+        nome = corpo["nome"].strip().upper()
+        async with self._trava:
+            self.usuario.criar_lista(nome)
+        return 201, {"nome": nome}
+
+    async def adicionar_a_lista(self, consulta, corpo, nome):
+        lista = self._lista(nome)
+        midia = self._midia(corpo["id"])
+        async with self._trava:
+            lista.adicionar_midia(midia)
+            await self._no_banco(salvar_listas_usuario, self.usuario)
+        return 201, _resumo_midia(midia)
+
+    async def remover_da_lista(self, consulta, corpo, nome, midia_id):
+        lista = self._lista(nome)
+        midia = self._midia(midia_id)
+        async with self._trava:
+            lista.remover_midia(midia.titulo)
+            await self._no_banco(salvar_listas_usuario, self.usuario)
+        return 200, _resumo_midia(midia)
+
+    #Relatórios e recomendações:
+
+    async def relatorio_tempo(self, consulta, corpo):
+        if "inicio" not in consulta:
+            dias = int(consulta.get("dias", 30))
+            minutos, horas = self.relatorios.tempo_ultimos_dias(dias)
+            return 200, {"dias": dias, "minutos": minutos, "horas": horas}
+
+        inicio, fim = _periodo(consulta)
+        minutos, horas = self.relatorios.tempo_assistido(inicio, fim)
+        resposta = {"minutos": minutos, "horas": horas}
+        if "por" in consulta:
+            resposta["periodos"] = [{"inicio": corte.isoformat(), "minutos": minutos_periodo} for corte, minutos_periodo
+                                    in self.relatorios.por_periodo(inicio, fim, consulta["por"])]
+        return 200, resposta
+
+    async def relatorio_generos(self, consulta, corpo):
+        inicio, fim = _periodo(consulta)
+        return 200, [{"genero": genero, "minutos": minutos} for genero, minutos
+                     in self.relatorios.por_genero(inicio, fim)]
+
+    async def listar_recomendacoes(self, consulta, corpo):
+        limite = int(consulta.get("limite", 10))
+        return 200, {
+            "nota_minima": self.recomendacoes.nota_minima(),
+            "mais_bem_avaliadas": [dict(_resumo_midia(midia), nota=nota) for nota, midia
+                                   in self.recomendacoes.mais_bem_avaliadas(limite)],
+            "por_genero": [dict(_resumo_midia(midia), genero_favorito=genero) for genero, midia
+                           in self.recomendacoes.sugestoes_por_genero(limite)],
+        }
+
+    def encerrar(self):
+        self._executor.shutdown()
+        fechar_conexoes()
+
+
+#Funções auxiliares de serialização e de parâmetros:
+
+def _resumo_midia(midia):
+    return {"id": midia.id, "titulo": midia.titulo, "tipo": midia._tipo, "genero": midia._genero,
+            "ano": midia.ano, "status": midia.status, "nota": Catalogo.nota_da_midia(midia)}
+
+def _detalhes_midia(midia):
+    detalhes = _resumo_midia(midia)
+    detalhes.update(classificacao=midia._classificacao, elenco=midia._elenco)
+    if isinstance(midia, Filme):
+        detalhes["duracao"] = midia.duracao
+        return detalhes
+
+    detalhes.update(duracao=midia.duracao_total, episodios=len(midia),
+                    episodios_assistidos=midia.episodios_assistidos,
+                    proximo_episodio=midia.proximo_episodio)
+    detalhes["temporadas"] = [
+        {"numero": num_temp,
+         "episodios": [{"numero": num_ep, "titulo": episodio._titulo, "duracao": episodio.duracao,
+                        "status": episodio.status, "nota": episodio.nota}
+                       for num_ep, episodio in sorted(midia.temporadas[num_temp]._episodios.items())]}
+        for num_temp in sorted(midia.temporadas)]
+    return detalhes
+
+def _status(status):
+    status_normalizado = STATUS_VALIDOS.get(str(status).strip().upper())
+    if status_normalizado is None:
+        raise ErroHttp(400, "O status deve ser uma das opções: NÃO ASSISTIDO, ASSISTINDO OU ASSISTIDO")
+    return status_normalizado
+
+#Nota do corpo JSON convertida com float() (aceita 8, 8.5 ou "8.5"); None apaga a nota
+def _nota(nota):
+    if nota is None:
+        return None
+    nota = float(nota)
+    if not 0 <= nota <= 10:
+        raise ErroHttp(400, "A nota deve ser deixada em branco ou um número entre 0 e 10")
+    return nota
+
+def _episodio(serie, num_temp, num_ep):
+    temporada = serie.temporadas.get(int(num_temp))
+    episodio = temporada._episodios.get(int(num_ep)) if temporada and num_ep is not None else None
+    if episodio is None:
+        raise ErroHttp(404, f"Episódio T{num_temp}E{num_ep} não encontrado em '{serie.titulo}'.")
+    return episodio
+
+#Intervalo semiaberto [inicio, fim) a partir de datas AAAA-MM-DD inclusivas (como ler_periodo do CLI)
+def _periodo(consulta):
+    try:
+        inicio = datetime.strptime(consulta["inicio"], "%Y-%m-%d")
+        fim = datetime.strptime(consulta["fim"], "%Y-%m-%d")
+    except KeyError:
+        raise ErroHttp(400, "Informe ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD.")
+    return inicio, fim + timedelta(days=1)
+
+def _resposta(status, conteudo, manter=True):
+    corpo = json.dumps(conteudo, ensure_ascii=False).encode("utf-8")
+    cabecalho = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                 "Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(corpo)}\r\n"
+                 f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+    return cabecalho.encode("latin-1") + corpo
+
+
+async def servir(host, porta, nome_usuario=None, threads=4):
+    """Carrega o catálogo e atende requisições até o processo ser interrompido."""
+    servico = ServicoCatalogo(threads)
+    await servico.carregar(nome_usuario)
+    servidor = await asyncio.start_server(servico.atender, host, porta)
+    print(f"🌐 Serviço do catálogo em http://{host}:{porta} ({len(servico.catalogo)} mídias, "
+          f"usuário {servico.usuario._nome}). Ctrl+C para encerrar.")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servico.encerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--usuario", help="Usuário cujos dados serão servidos (padrão: USUARIO_PADRAO)")
+    parser.add_argument("--threads", type=int, default=4, help="Threads para o trabalho com o banco")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.porta, args.usuario, args.threads))
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# src/snapshot.py
+
+import marshal
+import mmap
+import os
+import struct
+import zlib
+
+#Cabeçalho: assinatura, versão do formato, versão do esquema, usuário, identificador do banco,
+#contador de alterações do banco, tamanho e CRC32 do conteúdo
+_CABECALHO = struct.Struct("<8sHHq16sqQI")
+_ASSINATURA = b"CATSNAP\x00"
+
+#Versão do formato do arquivo; mudar quando o conteúdo gravado mudar de forma
+FORMATO = 1
+
+
+def caminho_snapshot(caminho_banco, usuario_id):
+    """Arquivo do snapshot de um usuário, ao lado do .db (ex.: catalogo.db.u1.snapshot)."""
+    return f"{caminho_banco}.u{int(usuario_id)}.snapshot"
+
+
+def ler_snapshot(caminho, esquema, usuario_id, banco_id, contador):
+    """
+    Lê o snapshot gravado por gravar_snapshot(), se ele corresponder exatamente ao estado atual
+    do banco (mesmo esquema, usuário, banco e contador de alterações).
+
+    Returns:
+        O conteúdo gravado, ou None se o arquivo não existir, estiver desatualizado ou corrompido:
+        nesses casos o chamador deve carregar do SQLite.
+    """
+    try:
+        with open(caminho, "rb") as arquivo:
+            tamanho_arquivo = os.fstat(arquivo.fileno()).st_size
+            if tamanho_arquivo < _CABECALHO.size:
+                return None
+            # Mapeado em memória: o conteúdo é decodificado direto das páginas do arquivo, sem cópia
+            with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                (assinatura, formato, versao_esquema, usuario, banco, contador_gravado,
+                 tamanho, crc) = _CABECALHO.unpack_from(mapa)
+                if (assinatura != _ASSINATURA or formato != FORMATO or versao_esquema != esquema
+                        or usuario != usuario_id or banco.rstrip(b"\0") != banco_id.encode("ascii")
+                        or contador_gravado != contador or _CABECALHO.size + tamanho != tamanho_arquivo):
+                    return None
+                with memoryview(mapa) as visao, visao[_CABECALHO.size:] as conteudo:
+                    if zlib.crc32(conteudo) != crc:
+                        return None
+                    return marshal.loads(conteudo)
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
+def gravar_snapshot(caminho, esquema, usuario_id, banco_id, contador, conteudo):
+    """
+    Grava o snapshot de forma atômica (arquivo temporário + os.replace): um leitor concorrente
+    ou uma queda no meio da gravação nunca encontram um arquivo pela metade.
+    `conteudo` deve conter apenas tipos suportados por marshal (tuplas, listas, str, int, float, None).
+
+    Returns:
+        bool: True se gravou; False se não foi possível (o catálogo continua funcionando sem snapshot).
+    """
+    dados = marshal.dumps(conteudo)
+    cabecalho = _CABECALHO.pack(_ASSINATURA, FORMATO, esquema, usuario_id, banco_id.encode("ascii"),
+                                contador, len(dados), zlib.crc32(dados))
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(cabecalho)
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+        return True
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o snapshot do catálogo ({e}).")
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        return False
+
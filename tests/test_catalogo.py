@@ -0,0 +1,82 @@
+import pytest
+from ..src.modelos import Filme, Serie, Temporada, Episodio
+from ..src.catalogo import Catalogo
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def catalogo():
+    """Retorna um catálogo com filmes e uma série de gêneros, anos e status variados."""
+    serie = Serie("Dark", "Sci-Fi", 2017, "16+", [])
+    temporada = Temporada(1)
+    temporada.adicionar_episodio(Episodio(1, "Segredos", 50, None, 8.0, "ASSISTIDO"))
+    temporada.adicionar_episodio(Episodio(2, "Mentiras", 45))
+    serie.adicionar_temporada(temporada)
+    return Catalogo([
+        Filme("Interestelar", "Sci-Fi", 2014, "10+", [], 169, "ASSISTIDO", 9.5),
+        Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None),
+        Filme("Parasita", "Suspense", 2019, "16+", [], 132, "ASSISTIDO", 9.0),
+        serie,
+    ])
+
+# ==============================================================================
+# TESTES DO CATÁLOGO INDEXADO
+# ==============================================================================
+
+def test_filtra_pela_intersecao_dos_indices(catalogo):
+    """Filtros combinados usam os índices e mantêm a interface de dicionário por título."""
+    assert [m.titulo for m in catalogo.filtrar(genero="sci-fi", status="NÃO ASSISTIDO")] == ["Dark", "Duna"]
+    assert [m.titulo for m in catalogo.filtrar(tipo="serie")] == ["Dark"]
+    assert catalogo.filtrar(ano=2019, genero="Sci-Fi") == []
+    assert len(catalogo) == 4 and "Parasita" in catalogo
+
+def test_indices_acompanham_alteracoes_das_midias(catalogo):
+    """Setters e o status automático da série atualizam os índices sem reconstruí-los."""
+    duna, dark = catalogo["Duna"], catalogo["Dark"]
+    duna.status = "ASSISTINDO"
+    duna.ano = 2020
+    duna.titulo = "Duna: Parte 1"
+    assert catalogo.filtrar(status="ASSISTINDO", ano=2020) == [duna]
+    assert "Duna" not in catalogo and catalogo.titulos.buscar("duna: parte 1") == [duna]
+
+    #Concluir o último episódio torna a série ASSISTIDO e muda sua nota média
+    dark.temporadas[1]._episodios[2].nota = 6.0
+    dark.temporadas[1]._episodios[2].status = "ASSISTIDO"
+    dark.atualizar_status_automatico()
+    assert dark in catalogo.filtrar(status="ASSISTIDO")
+    assert catalogo.contar("status", "NÃO ASSISTIDO") == 0
+
+    assert catalogo.remover(duna) and catalogo.filtrar(status="ASSISTINDO") == []
+    duna.status = "ASSISTIDO" #Mídia fora do catálogo não o altera mais
+    assert catalogo.contar("status", "ASSISTIDO") == 3 and catalogo.por_nota()[2] == (7.0, dark)
+
+def test_ranking_por_nota(catalogo):
+    """O índice ordenado devolve as mais bem avaliadas sem ordenar o catálogo."""
+    assert [(nota, m.titulo) for nota, m in catalogo.por_nota()] == [
+        (9.5, "Interestelar"), (9.0, "Parasita"), (8.0, "Dark")]
+    catalogo["Parasita"].nota = 10.0
+    assert [m.titulo for _, m in catalogo.por_nota(limite=1)] == ["Parasita"]
+    assert [m.titulo for _, m in catalogo.por_nota(nota_minima=9.6)] == ["Parasita"]
+
+def test_midias_de_mesmo_titulo_nao_se_substituem(catalogo):
+    """Título repetido com outro tipo ou ano é outra mídia: entra em todos os índices ao lado da primeira."""
+    dark_filme = Filme("Dark", "Drama", 2017, "14+", [], 95, "NÃO ASSISTIDO", 7.0)
+    duna_1984 = Filme("Duna", "Sci-Fi", 1984, "14+", [], 137, "ASSISTIDO", 6.5)
+    catalogo.adicionar(dark_filme)
+    catalogo.adicionar(duna_1984)
+
+    assert len(catalogo) == 6 and len(catalogo.titulos) == 6
+    assert [m._tipo for m in catalogo.buscar("Dark")] == ["SERIE", "FILME"] and catalogo.get("Nada") is None
+    assert catalogo.obter("duna", "FILME", 1984) is duna_1984 and dark_filme in catalogo
+    assert [m.ano for m in catalogo.filtrar(genero="sci-fi", tipo="FILME") if m.titulo == "Duna"] == [2021, 1984]
+    assert catalogo.contar("tipo", "FILME") == 5 and (7.0, dark_filme) in catalogo.por_nota()
+    with pytest.raises(KeyError):
+        catalogo["Dark"]
+
+    #Mesma identidade (título, tipo e ano) substitui; renomear reindexa título e identidade
+    copia = Filme("DUNA", "Sci-Fi", 1984, "14+", [], 137, "NÃO ASSISTIDO", None)
+    catalogo.adicionar(copia)
+    assert duna_1984 not in catalogo and catalogo.obter("Duna", "FILME", 1984) is copia
+    dark_filme.titulo = "Dark: O Filme"
+    assert catalogo["Dark"]._tipo == "SERIE" and catalogo.obter("dark: o filme", "FILME", 2017) is dark_filme
+    assert catalogo.remover(dark_filme) and catalogo.obter("Dark: O Filme", "FILME", 2017) is None
@@ -0,0 +1,104 @@
+import json
+import pytest
+from ..src import cli
+from ..src.modelos import Filme, Serie
+from ..src.diario import descrever_midia
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Aponta o CLI para um banco vazio em um diretório temporário."""
+    monkeypatch.setattr(cli.dados, "DB_NAME", str(tmp_path / "catalogo.db"))
+    monkeypatch.setattr(cli, "DIARIO", None) #O diário de um teste anterior já foi encerrado
+    yield tmp_path
+    cli.dados.fechar_conexoes()
+
+def responder(monkeypatch, respostas):
+    """Substitui o input() pelas respostas dadas, em ordem."""
+    respostas = iter(respostas)
+    monkeypatch.setattr("builtins.input", lambda _="": next(respostas))
+
+# ==============================================================================
+# TESTES DO LOOP PRINCIPAL DO CLI
+# ==============================================================================
+
+def test_main_loop_inicia_importa_e_encerra(banco, monkeypatch, capsys):
+    """O CLI inicia sem usuário carregado; a importação recarrega o catálogo para o usuário atual."""
+    arquivo = banco / "novos.jsonl"
+    arquivo.write_text(json.dumps({"tipo": "FILME", "titulo": "Arrival", "genero": "Sci-Fi", "ano": 2016,
+                                   "classificacao": "12+", "duracao": 116}) + "\n", encoding="utf-8")
+    responder(monkeypatch, ["13", "Ana", "9", str(arquivo), "x", "0"])
+
+    with pytest.raises(SystemExit) as saida:
+        cli.main_loop()
+
+    assert saida.value.code == 0
+    assert cli.USUARIO_ATUAL._nome == "Ana" and "Arrival" in cli.CATALOGO_GLOBAL
+    assert "Opção inválida" in capsys.readouterr().out
+
+def test_leituras_do_banco_gravam_o_diario_antes(banco, monkeypatch, capsys):
+    """Busca e paginação leem o SQLite: mídias anotadas e ainda não gravadas aparecem mesmo assim."""
+    cli.inicializar_sistema()
+    nova = Filme("Arrival", "Sci-Fi", 2016, "12+", [], 116, "NÃO ASSISTIDO", None)
+    with cli.DIARIO.trava:
+        cli.CATALOGO_GLOBAL.adicionar(nova)
+        cli.DIARIO.anotar("midia", midia=descrever_midia(nova))
+
+    responder(monkeypatch, ["Arrival", "S"])
+    cli.menu_buscar()
+    cli.exibir_catalogo_completo()
+    cli.DIARIO.encerrar()
+
+    saida = capsys.readouterr().out
+    assert cli.DIARIO.pendentes == 0
+    assert "1. [FILME] Arrival (2016)" in saida and "[FILME] Arrival (2016) - Gênero: Sci-Fi" in saida
+
+def test_inicializar_carrega_midias_de_mesmo_titulo(banco):
+    """Filme e série homônimos e refilmagens são mídias distintas no banco e continuam distintas no catálogo."""
+    for midia in (Filme("Dark", "Drama", 2017, "14+", [], 95, "NÃO ASSISTIDO", None),
+                  Serie("Dark", "Drama", 2017, "16+", []),
+                  Filme("Duna", "Sci-Fi", 1984, "14+", [], 137, "NÃO ASSISTIDO", None),
+                  Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None)):
+        assert cli.dados.salvar_midia(midia)
+
+    cli.inicializar_sistema()
+    cli.DIARIO.encerrar()
+
+    assert len(cli.CATALOGO_GLOBAL) == 4
+    assert sorted(m._tipo for m in cli.CATALOGO_GLOBAL.buscar("Dark")) == ["FILME", "SERIE"]
+    assert [m.ano for m in cli.CATALOGO_GLOBAL.filtrar(genero="Sci-Fi")] == [1984, 2021]
+    assert len(cli.CATALOGO_GLOBAL.titulos.buscar("Duna")) == 2
+
+def test_adicionar_e_selecionar_midias_de_mesmo_titulo(banco, monkeypatch, capsys):
+    """Só título, tipo e ano iguais são duplicata; com títulos repetidos o CLI pergunta qual mídia."""
+    cli.inicializar_sistema()
+    filme = Filme("Dark", "Drama", 2017, "14+", [], 95, "NÃO ASSISTIDO", None)
+    cli.CATALOGO_GLOBAL.adicionar(filme)
+
+    responder(monkeypatch, ["FILME", "dark", "Drama", "2017"])
+    cli.menu_adicionar_midia()
+    assert "já existe no catálogo" in capsys.readouterr().out
+
+    responder(monkeypatch, ["SERIE", "Dark", "Drama", "2017", "16+", "", "1", "1", "Segredos", "51"])
+    cli.menu_adicionar_midia()
+    serie = cli.CATALOGO_GLOBAL.obter("Dark", "SERIE", 2017)
+    assert serie is not None and len(cli.CATALOGO_GLOBAL.buscar("Dark")) == 2
+
+    responder(monkeypatch, ["DARK", "2"])
+    assert cli.selecionar_midia_por_titulo() is serie
+    assert "1. [FILME] Dark (2017)" in capsys.readouterr().out
+    cli.DIARIO.encerrar()
+
+def test_caminho_do_banco_e_resolvido_no_primeiro_acesso(tmp_path, monkeypatch):
+    """Sem DB_NAME definido, o primeiro get_conn resolve o caminho (CATALOGO_DB) e cria as conexões."""
+    monkeypatch.setattr(cli.dados, "DB_NAME", None)
+    monkeypatch.setattr(cli.dados, "_CONEXOES", None)
+    monkeypatch.setenv("CATALOGO_DB", str(tmp_path / "env.db"))
+    cli.dados.fechar_conexoes()  # Nada aberto ainda: não falha
+
+    try:
+        cli.dados.get_conn()
+        assert cli.dados.DB_NAME == str(tmp_path / "env.db") and (tmp_path / "env.db").exists()
+    finally:
+        cli.dados.fechar_conexoes()
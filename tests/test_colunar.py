@@ -0,0 +1,52 @@
+import pytest
+from ..src.modelos import Serie, Temporada, Episodio
+from ..src.colunar import ArmazemEpisodios
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def armazem():
+    """Retorna um armazém com duas séries de gêneros diferentes."""
+    armazem = ArmazemEpisodios()
+    armazem.adicionar(1, "Sci-Fi", 1, 1, 50, 8.0, "ASSISTIDO")
+    armazem.adicionar(1, "Sci-Fi", 1, 2, 40, None, "ASSISTIDO")
+    armazem.adicionar(1, "Sci-Fi", 2, 1, 60, 6.0, "NÃO ASSISTIDO")
+    armazem.adicionar(2, "Drama", 1, 1, 30, 9.0, "ASSISTIDO")
+    return armazem
+
+# ==============================================================================
+# TESTES DO ARMAZÉM COLUNAR DE EPISÓDIOS
+# ==============================================================================
+
+def test_reducoes_com_filtros_de_genero_e_status(armazem):
+    """Quantidade, duração, nota média e contagem por status sobre as colunas."""
+    scifi = armazem.todos().filtrar(genero="Sci-Fi")
+    assert scifi.quantidade() == 3
+    assert scifi.duracao_total() == 150
+    assert scifi.nota_media() == 7.0
+
+    assistidos = scifi.filtrar(status="ASSISTIDO")
+    assert len(assistidos) == 2
+    assert assistidos.nota_media() == 8.0
+    assert armazem.todos().contagem_por_status() == {"NÃO ASSISTIDO": 1, "ASSISTINDO": 0, "ASSISTIDO": 3}
+    assert armazem.todos().filtrar(genero="Terror").quantidade() == 0
+
+def test_visoes_de_serie_e_temporada(armazem):
+    """Serie e Temporada expõem visões sobre suas linhas contíguas do armazém."""
+    serie = Serie("Série C", "Sci-Fi", 2020, "12", [])
+    serie.id = 1
+    temporada = Temporada(2)
+    temporada.adicionar_episodio(Episodio(1, "Único", 60))
+    serie.adicionar_temporada(temporada)
+
+    assert serie.visao_colunar(armazem).duracao_total() == 150
+    assert temporada.visao_colunar(armazem).quantidade() == 1
+    assert armazem.visao_serie(99).quantidade() == 0
+
+def test_linhas_fora_de_sequencia_sao_rejeitadas(armazem):
+    """Uma série (ou temporada) não pode voltar a receber linhas depois de outra."""
+    with pytest.raises(ValueError, match="em sequência"):
+        armazem.adicionar(1, "Sci-Fi", 3, 1, 45, None, "NÃO ASSISTIDO")
+    with pytest.raises(ValueError):
+        armazem.adicionar(3, "Drama", 1, 1, 45, None, "PENDENTE")
+    assert len(armazem) == 4
@@ -0,0 +1,77 @@
+import pytest
+from ..src.modelos import Filme, Serie, Temporada, Episodio, Usuario
+from ..src.catalogo import Catalogo
+from ..src.diario import DiarioAlteracoes, ler_diario, reaplicar_diario, descrever_midia, identificar_midia
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def catalogo():
+    """Retorna um catálogo em memória com um filme e uma série (sem carregar do banco)."""
+    serie = Serie("Dark", "Sci-Fi", 2017, "16+", [])
+    temporada = Temporada(1)
+    temporada.adicionar_episodio(Episodio(1, "Segredos", 50))
+    serie.adicionar_temporada(temporada)
+    return Catalogo([Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None), serie])
+
+# ==============================================================================
+# TESTES DO DIÁRIO DE ALTERAÇÕES
+# ==============================================================================
+
+def test_aplicar_grava_em_lote_e_esvazia_o_diario(tmp_path):
+    """As anotações ficam no arquivo até o salvamento; gravadas, o diário é esvaziado e apagado."""
+    gravacoes = []
+    caminho = str(tmp_path / "catalogo.db.u1.diario")
+    diario = DiarioAlteracoes(caminho, lambda: gravacoes.append(1) or True, alteracoes=100)
+    diario.anotar("estado", titulo="Duna", status="ASSISTIDO")
+    diario.anotar("estado", titulo="Duna", nota=8.0)
+
+    assert diario.pendentes == 2 and ler_diario(caminho)[1] == {"op": "estado", "titulo": "Duna", "nota": 8.0}
+    assert diario.aplicar() and gravacoes == [1] and ler_diario(caminho) == []
+    assert diario.encerrar() and gravacoes == [1]  # Nada pendente: não grava de novo
+
+def test_reaplicar_diario_e_idempotente(tmp_path, catalogo):
+    """Reaplicar o mesmo diário duas vezes dá o mesmo estado; uma última linha incompleta é ignorada."""
+    nova = Filme("Arrival", "Sci-Fi", 2016, "12+", [], 116, "NÃO ASSISTIDO", None)
+    caminho = str(tmp_path / "catalogo.db.u1.diario")
+    diario = DiarioAlteracoes(caminho, lambda: True)
+    diario.anotar("midia", midia=descrever_midia(nova))
+    diario.anotar("estado", titulo="Duna", status="ASSISTIDO")
+    diario.anotar("historico", titulo="Duna", data="2024-05-01 20:00:00")
+    diario.anotar("episodio", titulo="Dark", temporada=1, episodio=1, status="ASSISTIDO")
+    diario.anotar("lista_criar", lista="FAVORITOS")
+    diario.anotar("lista_adicionar", lista="FAVORITOS", titulo="Arrival")
+    diario._arquivo.write('{"op": "estado", "titu')  # Queda no meio da escrita
+    diario._arquivo.close()
+
+    usuario = Usuario("Davi")
+    for _ in range(2):
+        assert reaplicar_diario(caminho, catalogo, usuario) == 6
+
+    assert catalogo["Arrival"].duracao == 116 and catalogo["Duna"].status == "ASSISTIDO"
+    assert catalogo["Dark"].status == "ASSISTIDO"
+    assert len(usuario._historico) == 1 and len(usuario.listas["FAVORITOS"]) == 1
+
+def test_reaplicar_resolve_titulo_tipo_e_ano(tmp_path, catalogo):
+    """Uma série nova com o título de um filme é restaurada, e as entradas seguintes vão para ela."""
+    serie = Serie("Duna", "Sci-Fi", 2021, "16+", [])
+    temporada = Temporada(1)
+    temporada.adicionar_episodio(Episodio(1, "Profecia", 55))
+    serie.adicionar_temporada(temporada)
+    caminho = str(tmp_path / "catalogo.db.u1.diario")
+    diario = DiarioAlteracoes(caminho, lambda: True)
+    diario.anotar("midia", midia=descrever_midia(serie))
+    diario.anotar("episodio", **identificar_midia(serie), temporada=1, episodio=1, status="ASSISTIDO")
+    diario.anotar("lista_criar", lista="FAVORITOS")
+    diario.anotar("lista_adicionar", lista="FAVORITOS", **identificar_midia(serie))
+    diario.anotar("estado", titulo="Duna", status="ASSISTIDO")  # Entrada antiga (só o título): ambígua
+    diario._arquivo.close()
+
+    usuario = Usuario("Davi")
+    for _ in range(2):
+        assert reaplicar_diario(caminho, catalogo, usuario) == 5
+
+    filme = catalogo.obter("Duna", "FILME", 2021)
+    restaurada = catalogo.obter("Duna", "SERIE", 2021)
+    assert len(catalogo.buscar("Duna")) == 2 and restaurada.status == "ASSISTIDO"
+    assert filme.status == "NÃO ASSISTIDO" and list(usuario.listas["FAVORITOS"]) == [restaurada]
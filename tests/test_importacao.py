@@ -0,0 +1,129 @@
+import json
+import pytest
+from ..src import dados
+from ..src.importacao import importar_arquivo, validar_linha, validar_lote
+
+# ==============================================================================
+# TESTES DA VALIDAÇÃO DE LINHAS IMPORTADAS
+# ==============================================================================
+
+def test_linhas_validas_viram_registros_normalizados():
+    """CSV (textos) e JSON (tipos nativos) passam pelos setters e são normalizados."""
+    filme = validar_linha({"tipo": "filme", "titulo": " Duna ", "genero": "Sci-Fi", "ano": "2021",
+                           "classificacao": "14", "duracao": "155", "status": "assistido",
+                           "nota": "8.5", "elenco": "Timothée Chalamet, Zendaya"})
+    assert filme == ("FILME", "Duna", "Sci-Fi", 2021, "14", 155, "ASSISTIDO", 8.5,
+                     "Timothée Chalamet, Zendaya")
+
+    episodio = validar_linha('{"tipo": "EPISODIO", "serie": "Dark", "serie_ano": 2017, '
+                             '"temporada": 1, "numero": 2, "titulo": "Mentiras", "duracao": 45}')
+    assert episodio == ("EPISODIO", "Dark", 2017, 1, 2, "Mentiras", 45, None, "NÃO ASSISTIDO")
+
+def test_linhas_invalidas_sao_rejeitadas_com_a_mensagem_do_setter():
+    """Cada linha rejeitada guarda o número da linha e a mensagem do ValueError."""
+    lote = [
+        (2, {"tipo": "FILME", "titulo": "A", "ano": "2020", "duracao": "0"}),
+        (3, {"tipo": "SERIE", "titulo": "", "ano": "2020"}),
+        (4, {"tipo": "EPISODIO", "serie": "S", "serie_ano": "2020", "temporada": "1",
+             "numero": "1", "duracao": "40", "nota": "11"}),
+        (5, "{json quebrado"),
+        (6, {"tipo": "DOCUMENTARIO"}),
+        (7, {"tipo": "TEMPORADA", "serie": "S", "serie_ano": "2020", "temporada": "2"}),
+    ]
+    validos, rejeitados = validar_lote(lote)
+
+    assert validos == [(7, ("TEMPORADA", "S", 2020, 2))]
+    assert [numero for numero, _ in rejeitados] == [2, 3, 4, 5, 6]
+    assert "inteiro posistivo" in rejeitados[0][1]
+    assert "obrigatório" in rejeitados[1][1]
+    assert "entre 0 e 10" in rejeitados[2][1]
+    assert "JSON inválido" in rejeitados[3][1]
+
+def test_historico_e_listas_exportados_sao_aceitos_na_importacao():
+    """Os registros de histórico e listas gerados pela exportação voltam pela importação."""
+    historico = validar_linha({"tipo": "HISTORICO", "titulo": "Duna", "ano": 2021,
+                               "data_conclusao": "2026-03-01 21:30:00", "duracao": ""})
+    assert historico == ("HISTORICO", "Duna", 2021, "2026-03-01 21:30:00", None, None)
+
+    lista = validar_linha({"tipo": "lista", "lista": "favoritos", "titulo": "Duna", "ano": "2021",
+                           "midia_tipo": "filme"})
+    assert lista == ("LISTA", "FAVORITOS", "Duna", 2021, "FILME")
+
+    with pytest.raises(ValueError, match="midia_tipo"):
+        validar_linha({"tipo": "LISTA", "lista": "F", "titulo": "Duna", "ano": 2021, "midia_tipo": "LIVRO"})
+
+    with pytest.raises(ValueError, match="data_conclusao"):
+        validar_linha({"tipo": "HISTORICO", "titulo": "Duna", "ano": 2021, "data_conclusao": "ontem"})
+
+def test_formato_da_exportacao_vem_da_extensao():
+    """.jsonl/.csv, com ou sem .gz; outras extensões são recusadas."""
+    from ..src.exportacao import formato_do_arquivo
+
+    assert formato_do_arquivo("saida.jsonl") == ("jsonl", False)
+    assert formato_do_arquivo("SAIDA.CSV.GZ") == ("csv", True)
+    with pytest.raises(ValueError, match="não suportado"):
+        formato_do_arquivo("saida.xml")
+
+def test_filme_e_serie_de_mesmo_titulo_e_ano_sao_midias_distintas(tmp_path, monkeypatch):
+    """Importar um filme com o título e o ano de uma série cria outra mídia, sem trocar o tipo da série."""
+    monkeypatch.setattr(dados, "DB_NAME", str(tmp_path / "catalogo.db"))
+    registros = [
+        {"tipo": "SERIE", "titulo": "Dark", "genero": "Sci-Fi", "ano": 2017, "classificacao": "16+"},
+        {"tipo": "EPISODIO", "serie": "Dark", "serie_ano": 2017, "temporada": 1, "numero": 1,
+         "titulo": "Segredos", "duracao": 50},
+        {"tipo": "FILME", "titulo": "Dark", "genero": "Drama", "ano": 2017, "classificacao": "14+", "duracao": 95},
+        {"tipo": "HISTORICO", "titulo": "Dark", "ano": 2017, "data_conclusao": "2024-05-01 20:00:00"},
+    ]
+    arquivo = tmp_path / "dark.jsonl"
+    arquivo.write_text("".join(json.dumps(registro) + "\n" for registro in registros), encoding="utf-8")
+
+    try:
+        resultado = importar_arquivo(str(arquivo), processos=0)
+        midias = dados.get_conn().execute("""
+            SELECT m.tipo, m.genero, COUNT(e.id) FROM midias m
+            LEFT JOIN temporadas t ON t.serie_id = m.id LEFT JOIN episodios e ON e.temporada_id = t.id
+            WHERE m.titulo = 'Dark' GROUP BY m.id ORDER BY m.tipo
+        """).fetchall()
+    finally:
+        dados.fechar_conexoes()
+
+    assert midias == [("FILME", "Drama", 0), ("SERIE", "Sci-Fi", 1)]
+    assert len(resultado.rejeitadas) == 1 and "ambígua" in resultado.rejeitadas[0][1]
+
+def test_historico_e_listas_voltam_para_a_midia_certa_entre_homonimas(tmp_path, monkeypatch):
+    """Exportados com midia_tipo, histórico e listas de um filme e de uma série homônimos reimportam sem ambiguidade."""
+    from ..src.exportacao import exportar_catalogo
+
+    registros = [
+        {"tipo": "SERIE", "titulo": "Dark", "genero": "Sci-Fi", "ano": 2017, "classificacao": "16+"},
+        {"tipo": "FILME", "titulo": "Dark", "genero": "Drama", "ano": 2017, "classificacao": "14+", "duracao": 95},
+        {"tipo": "HISTORICO", "titulo": "Dark", "ano": 2017, "midia_tipo": "SERIE",
+         "data_conclusao": "2024-05-01 20:00:00"},
+        {"tipo": "HISTORICO", "titulo": "Dark", "ano": 2017, "midia_tipo": "FILME",
+         "data_conclusao": "2024-05-02 20:00:00"},
+        {"tipo": "LISTA", "lista": "FAVORITOS", "titulo": "Dark", "ano": 2017, "midia_tipo": "FILME"},
+        {"tipo": "LISTA", "lista": "FAVORITOS", "titulo": "Dark", "ano": 2018, "midia_tipo": "FILME"},
+    ]
+    arquivo = tmp_path / "dark.jsonl"
+    arquivo.write_text("".join(json.dumps(registro) + "\n" for registro in registros), encoding="utf-8")
+    consulta = """
+        SELECT 'HISTORICO', m.tipo FROM historico h JOIN midias m ON m.id = h.midia_id
+        UNION ALL SELECT 'LISTA', m.tipo FROM listas_conteudo l JOIN midias m ON m.id = l.midia_id
+        ORDER BY 1, 2
+    """
+
+    try:
+        monkeypatch.setattr(dados, "DB_NAME", str(tmp_path / "origem.db"))
+        resultado = importar_arquivo(str(arquivo), processos=0)
+        exportar_catalogo(str(tmp_path / "dark.csv"))
+        dados.fechar_conexoes()
+
+        monkeypatch.setattr(dados, "DB_NAME", str(tmp_path / "destino.db"))
+        reimportado = importar_arquivo(str(tmp_path / "dark.csv"), processos=0)
+        vinculos = dados.get_conn().execute(consulta).fetchall()
+    finally:
+        dados.fechar_conexoes()
+
+    assert resultado.rejeitadas == [(6, "Mídia 'Dark' (FILME, 2018) não encontrada.")]
+    assert reimportado.rejeitadas == []
+    assert vinculos == [("HISTORICO", "FILME"), ("HISTORICO", "SERIE"), ("LISTA", "FILME")]
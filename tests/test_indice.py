@@ -0,0 +1,70 @@
+import pytest
+from ..src.modelos import Filme, Serie
+from ..src.indice import IndiceTitulos
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def indice():
+    """Retorna um índice com títulos acentuados e de mesmo prefixo."""
+    return IndiceTitulos([
+        Filme("Parasita", "Suspense", 2019, "16+", [], 132, "ASSISTIDO", None),
+        Serie("Stranger Things", "Sci-Fi", 2016, "14+", []),
+        Filme("Star Wars", "Sci-Fi", 1977, "10+", [], 121, "NÃO ASSISTIDO", None),
+        Filme("Cidade de Deus", "Drama", 2002, "16+", [], 130, "ASSISTIDO", None),
+        Filme("Ó Paí, Ó", "Comédia", 2007, "14+", [], 98, "NÃO ASSISTIDO", None),
+    ])
+
+# ==============================================================================
+# TESTES DO ÍNDICE DE TÍTULOS
+# ==============================================================================
+
+def test_busca_exata_ignora_maiusculas_e_espacos(indice):
+    """A busca exata normaliza o título, mas não confunde títulos diferentes."""
+    assert [m.titulo for m in indice.buscar("  stranger   THINGS ")] == ["Stranger Things"]
+    assert "parasita" in indice
+    assert indice.buscar("Stranger") == []
+
+def test_prefixo_e_aproximada_ignoram_acentos_e_erros(indice):
+    """Autocompletar por prefixo e busca tolerante a erros de digitação."""
+    assert [m.titulo for m in indice.buscar_prefixo("st")] == ["Star Wars", "Stranger Things"]
+    assert [m.titulo for m in indice.buscar_prefixo("CIDADE")] == ["Cidade de Deus"]
+    assert [m.titulo for m in indice.buscar_prefixo("o pai")] == ["Ó Paí, Ó"]
+    assert indice.buscar_aproximado("stranger thngs")[0].titulo == "Stranger Things"
+    assert indice.buscar_aproximado("parasite")[0].titulo == "Parasita"
+    assert indice.buscar_aproximado("xyz") == []
+
+def test_remover_mantem_indice_sincronizado(indice):
+    """Após remover, a mídia some de todas as buscas."""
+    star_wars, = indice.buscar("star wars")
+    assert indice.remover(star_wars)
+    assert not indice.remover(star_wars)
+    assert len(indice) == 4
+    assert [m.titulo for m in indice.buscar_prefixo("st")] == ["Stranger Things"]
+    assert all(m.titulo != "Star Wars" for m in indice.buscar_aproximado("star wars", similaridade_minima=0))
+
+def test_indice_de_trigramas_montado_sob_demanda(indice):
+    """Os trigramas só são montados na primeira busca aproximada e depois acompanham inclusões e remoções."""
+    indice.remover(indice.buscar("parasita")[0])
+    indice.adicionar(Filme("Interestelar", "Sci-Fi", 2014, "10+", [], 169, "ASSISTIDO", None))
+    assert indice._trigramas is None
+
+    assert indice.buscar_aproximado("interstelar")[0].titulo == "Interestelar"
+    assert indice.buscar_aproximado("parasite") == []
+
+    indice.adicionar(Filme("Parasita", "Suspense", 2019, "16+", [], 132, "ASSISTIDO", None))
+    indice.remover(indice.buscar("interestelar")[0])
+    assert indice.buscar_aproximado("parasite")[0].titulo == "Parasita"
+    assert indice.buscar_aproximado("interstelar") == []
+
+def test_titulos_repetidos_convivem_no_indice(indice):
+    """Um filme e uma série (ou refilmagens) de mesmo título são todos encontrados; remover um mantém os outros."""
+    serie = Serie("Parasita", "Drama", 2024, "16+", [])
+    indice.adicionar(serie)
+    original, = [m for m in indice.buscar("parasita") if m is not serie]
+    assert indice.buscar("PARASITA") == [original, serie] and len(indice) == 6
+    assert indice.buscar_prefixo("para") == [original, serie]
+    assert indice.buscar_aproximado("parasite") == [original, serie]
+
+    assert indice.remover(original) and not indice.remover(original)
+    assert indice.buscar("parasita") == [serie] and indice.buscar_prefixo("para") == [serie]
@@ -1,7 +1,7 @@
 
 
 import pytest
-from ..src.modelos import Midia, Filme, Serie, Temporada, Episodio
+from ..src.modelos import Midia, Filme, Serie, Temporada, Episodio, ListaPersonalizada, Usuario
 from datetime import datetime, date
 
 # --- Fixture de Dados Comuns (Ajudam a reutilizar objetos) ---
@@ -179,4 +179,268 @@ def test_adicionar_temporada_serie_funciona():
     
     # Testa erro de tipo
     with pytest.raises(TypeError, match="Somente temporadas"):
-        serie.adicionar_temporada(filme_valido)
\ No newline at end of file
+        serie.adicionar_temporada(filme_valido)
+
+# ==============================================================================
+# TESTES DE CONTROLE DE ALTERAÇÕES (DIRTY TRACKING)
+# ==============================================================================
+
+def test_midia_nova_comeca_alterada_e_limpa_apos_salvar(filme_valido):
+    """Mídias novas precisam ser gravadas; após marcar_salvo só voltam a ser gravadas se mudarem."""
+    assert filme_valido.alterado
+    filme_valido.marcar_salvo()
+    assert not filme_valido.alterado
+
+    filme_valido.status = "ASSISTIDO" # Mesmo valor: não altera
+    assert not filme_valido.alterado
+
+    filme_valido.nota = 7.0
+    assert filme_valido.alterado
+
+def test_episodio_alterado_propaga_para_temporada_e_serie():
+    """Alterar um episódio marca apenas ele, sua temporada e sua série como alterados."""
+    serie = Serie("Série D", "Drama", 2022, "10+", [])
+    temp = Temporada(1)
+    ep1 = Episodio(1, "Piloto", 45)
+    ep2 = Episodio(2, "Segundo", 45)
+    temp.adicionar_episodio(ep1)
+    temp.adicionar_episodio(ep2)
+    serie.adicionar_temporada(temp)
+    assert serie.alterado
+
+    serie.marcar_salvo()
+    assert not serie.alterado and not temp.alterado and not ep1.alterado
+
+    ep2.status = "ASSISTIDO"
+    assert ep2.alterado and not ep1.alterado
+    assert temp.alterado
+    assert serie.alterado
+    assert temp._episodios_alterados == {ep2}
+
+# ==============================================================================
+# TESTES DE CARREGAMENTO SOB DEMANDA (LAZY LOADING)
+# ==============================================================================
+
+def test_serie_carrega_temporadas_apenas_quando_necessario():
+    """O carregador só é chamado no primeiro acesso às temporadas, e uma única vez."""
+    chamadas = []
+
+    def carregador():
+        chamadas.append(1)
+        temp = Temporada(1)
+        temp.adicionar_episodio(Episodio(1, "Piloto", 50, None, 8.0, "ASSISTIDO"))
+        temp.marcar_salvo()
+        return [temp]
+
+    serie = Serie("Série L", "Drama", 2020, "12", [])
+    serie.marcar_salvo()
+    serie.definir_carregador(carregador)
+    assert not serie.temporadas_carregadas and chamadas == []
+
+    assert len(serie.temporadas) == 1
+    assert serie.temporadas_carregadas
+    assert serie.calcular_nota_serie() == 8.0
+    assert chamadas == [1]
+
+    # Carregar do banco não gera alterações pendentes
+    assert not serie.alterado
+
+def test_id_do_banco_comeca_vazio_e_valida_inteiro_positivo(filme_valido):
+    """Objetos novos não possuem id; a camada de dados só pode atribuir inteiros positivos."""
+    assert filme_valido.id is None
+    filme_valido.id = 42
+    assert filme_valido.id == 42
+    with pytest.raises(ValueError, match="inteiro positivo"):
+        filme_valido.id = 0
+    with pytest.raises(ValueError):
+        Temporada(1).id = "7"
+
+def test_lista_registra_apenas_o_delta_de_adicoes_e_remocoes(filme_valido):
+    """A lista guarda o que mudou desde o último salvamento; operações opostas se cancelam."""
+    outro = Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None)
+    lista = ListaPersonalizada("FAVORITOS")
+    lista.adicionar_midia(filme_valido)
+    lista.marcar_salvo()
+    assert not lista.alterada
+
+    lista.adicionar_midia(outro)
+    lista.remover_midia("matrix")
+    assert lista._adicoes == [outro] and lista._remocoes == [filme_valido]
+
+    lista.remover_midia("Duna") # Cancela a adição pendente
+    assert lista._adicoes == []
+    assert lista.alterada
+
+def test_usuario_esquece_midias_excluidas_das_listas_e_do_historico(filme_valido):
+    """Mídias excluídas do catálogo saem das listas e do histórico sem deixar delta a gravar."""
+    outro = Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "ASSISTIDO", None)
+    filme_valido.status = "ASSISTIDO"
+    usuario = Usuario("Davi")
+    lista = usuario.criar_lista("Favoritos")
+    lista.adicionar_midia(filme_valido)
+    lista.adicionar_midia(outro)
+    lista.marcar_salvo()
+    usuario.adicionar_ao_historico(filme_valido, datetime(2024, 1, 1))
+    usuario.adicionar_ao_historico(outro, datetime(2024, 1, 2))
+
+    assert usuario.esquecer_midias([filme_valido]) == 1
+    assert list(lista) == [outro] and lista.buscar("Matrix") is None and not lista.alterada
+    assert [item.midia for item in usuario._historico] == [outro]
+
+def test_lista_indexada_por_identidade_com_ordem_lote_e_paginas(filme_valido):
+    """Pertinência pela identidade (título, tipo e ano), inclusão/remoção em lote, reordenação e páginas."""
+    filmes = [Filme(f"Filme {i}", "Drama", 2000 + i, "12+", [], 100, "NÃO ASSISTIDO", None) for i in range(5)]
+    lista = ListaPersonalizada("PARA ASSISTIR")
+    assert lista.adicionar_midias(filmes + [filmes[0]]) == 5  # Repetidas são ignoradas
+    copia = Filme("FILME 3", "Drama", 2003, "12+", [], 100, "NÃO ASSISTIDO", None)
+    assert copia in lista and hash(copia) == hash(filmes[3]) and filme_valido not in lista
+    with pytest.raises(ValueError):
+        lista.adicionar_midia(copia)
+
+    lista.marcar_salvo()
+    lista.mover("filme 4", 0)
+    assert [m.titulo for m in lista.pagina(1, 2)] == ["Filme 4", "Filme 0"]
+    assert lista.pagina(3, 2) == [filmes[3]] and lista.alterada
+    with pytest.raises(ValueError):
+        lista.mover("Filme 1", 5)
+
+    assert lista.remover_midias(["Filme 0", "Filme 1", "Inexistente"]) == 2
+    assert [m.titulo for m in lista] == ["Filme 4", "Filme 2", "Filme 3"] and lista._remocoes == filmes[:2]
+
+def test_lista_aceita_titulos_repetidos_e_acompanha_renomeacoes():
+    """Mesmo título com outro tipo ou ano não colide no índice; renomear não deixa a mídia órfã."""
+    filme = Filme("Dark", "Drama", 2017, "14+", [], 95, "NÃO ASSISTIDO", None)
+    serie = Serie("Dark", "Sci-Fi", 2017, "16+", [])
+    refilmagem = Filme("Dark", "Drama", 2030, "14+", [], 100, "NÃO ASSISTIDO", None)
+    lista = ListaPersonalizada("FAVORITOS")
+    assert lista.adicionar_midias([filme, serie, refilmagem]) == 3
+    assert serie in lista and refilmagem in lista and lista.buscar("dark") is filme
+
+    serie.titulo = "Dark (Série)"
+    assert serie in lista and lista.buscar("dark (série)") is serie and lista.buscar("Dark") is filme
+    lista.remover_midia("Dark")
+    lista.remover_midia("Dark")
+    assert list(lista) == [serie] and lista.buscar("Dark") is None
+    lista.descartar_midia(serie)
+    assert len(lista) == 0 and lista._por_titulo == {} and lista._titulo_indexado == {}
+
+def test_lista_remove_e_move_a_midia_informada_entre_homonimas():
+    """Dado o objeto Midia, remover e mover agem sobre ele, e não sobre a primeira de mesmo título."""
+    filme = Filme("Dark", "Drama", 2017, "14+", [], 95, "NÃO ASSISTIDO", None)
+    serie = Serie("Dark", "Sci-Fi", 2017, "16+", [])
+    outro = Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None)
+    lista = ListaPersonalizada("FAVORITOS")
+    lista.adicionar_midias([filme, outro, serie])
+    assert lista.buscar_todas("DARK") == [filme, serie]
+
+    lista.mover(Serie("Dark", "Sci-Fi", 2017, "16+", []), 0)  # Mesma identidade (título, tipo e ano)
+    assert list(lista) == [serie, filme, outro]
+    lista.remover_midia(filme)
+    assert list(lista) == [serie, outro]
+    with pytest.raises(ValueError, match="'Dark' não encontrada"):
+        lista.remover_midia(filme)
+
+# ==============================================================================
+# TESTES DE AGREGADOS INCREMENTAIS DA SÉRIE
+# ==============================================================================
+
+def test_agregados_da_serie_acompanham_alteracoes_dos_episodios():
+    """Nota média, status automático, duração e __len__ refletem cada alteração sem recontagem."""
+    serie = Serie("Série A", "Drama", 2021, "12+", [])
+    temp = Temporada(1)
+    ep1 = Episodio(1, "Piloto", 40, None, 8.0)
+    ep2 = Episodio(2, "Segundo", 50)
+    temp.adicionar_episodio(ep1)
+    serie.adicionar_temporada(temp)
+    temp.adicionar_episodio(ep2) # Adicionado depois da temporada já estar na série
+
+    assert len(serie) == 2
+    assert serie.duracao_total == 90
+    assert serie.calcular_nota_serie() == 8.0
+
+    ep2.nota = 6.0
+    ep1.nota = None
+    assert serie.calcular_nota_serie() == 6.0
+
+    ep1.status = "ASSISTIDO"
+    serie.atualizar_status_automatico()
+    assert serie.status == "ASSISTINDO"
+    ep2.status = "ASSISTIDO"
+    serie.atualizar_status_automatico()
+    assert serie.status == "ASSISTIDO"
+
+    ep2.duracao = 55
+    assert serie.duracao_total == 95 and temp.duracao_total == 95
+
+def test_serie_nao_carregada_usa_agregados_do_banco():
+    """Com os totais vindos do banco, as consultas agregadas não disparam o carregador."""
+    from ..src.modelos import AgregadosEpisodios
+
+    serie = Serie("Série B", "Drama", 2021, "12+", [])
+    serie.definir_carregador(lambda: pytest.fail("não deveria carregar as temporadas"))
+    serie.definir_agregados(AgregadosEpisodios(soma_notas=15.0, avaliados=2, assistidos=3, total=3, duracao=120))
+
+    assert len(serie) == 3
+    assert serie.calcular_nota_serie() == 7.5
+    serie.atualizar_status_automatico()
+    assert serie.status == "ASSISTIDO"
+    assert not serie.temporadas_carregadas
+
+# ==============================================================================
+# TESTES DO CURSOR DE PROGRESSO ("PRÓXIMO EPISÓDIO")
+# ==============================================================================
+
+def test_cursor_aponta_o_primeiro_episodio_nao_assistido():
+    """O cursor avança ao assistir o episódio apontado e recua quando um anterior volta a ficar pendente."""
+    serie = Serie("Série P", "Drama", 2022, "12", [])
+    for num_temp in (2, 1): # Ordem de inclusão não importa
+        temp = Temporada(num_temp)
+        for num_ep in (1, 2):
+            temp.adicionar_episodio(Episodio(num_ep, f"Ep {num_ep}", 40))
+        serie.adicionar_temporada(temp)
+    episodios = {(t, e): serie.temporadas[t]._episodios[e] for t in (1, 2) for e in (1, 2)}
+    assert serie.proximo_episodio == (1, 1)
+
+    episodios[(1, 2)].status = "ASSISTIDO" # Não é o cursor: nada muda
+    assert serie.proximo_episodio == (1, 1)
+    episodios[(1, 1)].status = "ASSISTIDO" # Avança pulando o já assistido
+    assert serie.proximo_episodio == (2, 1)
+    assert serie.obter_proximo_episodio() is episodios[(2, 1)]
+
+    episodios[(1, 2)].status = "NÃO ASSISTIDO"
+    assert serie.proximo_episodio == (1, 2)
+    for episodio in episodios.values():
+        episodio.status = "ASSISTIDO"
+    assert serie.proximo_episodio is None and serie.obter_proximo_episodio() is None
+
+    serie.temporadas[2].adicionar_episodio(Episodio(3, "Novo", 40))
+    assert serie.proximo_episodio == (2, 3)
+
+def test_cursor_do_banco_nao_carrega_temporadas():
+    """Uma série não carregada informa o cursor lido do banco; ao carregar, ele é recalculado."""
+    def carregador():
+        temp = Temporada(1)
+        temp.adicionar_episodio(Episodio(1, "Piloto", 50, None, None, "ASSISTIDO"))
+        temp.adicionar_episodio(Episodio(2, "Segundo", 50))
+        return [temp]
+
+    serie = Serie("Série Q", "Drama", 2020, "12", [])
+    serie.definir_carregador(carregador)
+    serie.definir_progresso((1, 2))
+    assert serie.proximo_episodio == (1, 2) and not serie.temporadas_carregadas
+    assert serie.obter_proximo_episodio()._titulo == "Segundo"
+
+# ==============================================================================
+# TESTES DA REPRESENTAÇÃO COMPACTA (__slots__)
+# ==============================================================================
+
+def test_objetos_nao_possuem_dict_e_compartilham_status(filme_valido):
+    """Episódios e mídias usam __slots__ e o status normalizado é sempre a mesma string."""
+    ep1 = Episodio(1, "Piloto", 45, None, None, " assistido ")
+    ep2 = Episodio(2, "Segundo", 45, None, None, "ASSISTIDO")
+    assert ep1.status is ep2.status is filme_valido.status
+
+    for objeto in (ep1, Temporada(1), filme_valido, Serie("Série S", "Drama", 2020, "12", [])):
+        assert not hasattr(objeto, "__dict__")
+        with pytest.raises(AttributeError):
+            objeto.atributo_inexistente = 1
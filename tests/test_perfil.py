@@ -0,0 +1,32 @@
+import time
+from ..src.perfil import PerfilInicializacao
+
+# ==============================================================================
+# TESTES DO PERFIL DA INICIALIZAÇÃO
+# ==============================================================================
+
+def test_perfil_desativado_nao_registra_etapas():
+    """Sem ativar, etapa() e registrar() não medem nada."""
+    perfil = PerfilInicializacao()
+    with perfil.etapa("consulta de mídias"):
+        pass
+    perfil.registrar("imports", 0.5)
+    assert perfil.etapas() == {}
+
+def test_etapas_aninhadas_registram_tempo_proprio():
+    """Uma etapa interna é descontada da externa, e etapas de mesmo nome são somadas."""
+    perfil = PerfilInicializacao()
+    perfil.ativar()
+    perfil.registrar("imports", 0.25)
+    with perfil.etapa("usuário"):
+        with perfil.etapa("verificação do esquema"):
+            time.sleep(0.02)
+    with perfil.etapa("usuário"):
+        pass
+
+    etapas = perfil.etapas()
+    assert list(etapas) == ["imports", "verificação do esquema", "usuário"]
+    assert etapas["imports"] == 0.25
+    assert etapas["verificação do esquema"] >= 0.02
+    assert 0 <= etapas["usuário"] < 0.02
+    assert "TOTAL" in perfil.relatorio()
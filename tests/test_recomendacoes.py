@@ -0,0 +1,42 @@
+import pytest
+from datetime import datetime
+from ..src.modelos import Filme, HistoricoItem
+from ..src.catalogo import Catalogo
+from ..src.recomendacoes import MotorRecomendacoes
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def catalogo():
+    """Retorna um catálogo com filmes avaliados e não assistidos de gêneros diferentes."""
+    return Catalogo([
+        Filme("Interestelar", "Sci-Fi", 2014, "10+", [], 169, "ASSISTIDO", 9.5),
+        Filme("Parasita", "Suspense", 2019, "16+", [], 132, "ASSISTIDO", 8.0),
+        Filme("Gravidade", "Sci-Fi", 2013, "12+", [], 91, "ASSISTIDO", 7.0),
+        Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None),
+        Filme("Arrival", "Sci-Fi", 2016, "12+", [], 116, "NÃO ASSISTIDO", None),
+        Filme("Corra!", "Suspense", 2017, "14+", [], 104, "NÃO ASSISTIDO", None),
+    ])
+
+# ==============================================================================
+# TESTES DO MOTOR DE RECOMENDAÇÕES
+# ==============================================================================
+
+def test_mais_bem_avaliadas_respeita_nota_minima_e_novas_notas(catalogo):
+    """O ranking usa a nota mínima e acompanha as avaliações feitas depois de criado o motor."""
+    motor = MotorRecomendacoes(catalogo)
+    assert [m.titulo for _, m in motor.mais_bem_avaliadas(nota_minima=8.0)] == ["Interestelar", "Parasita"]
+
+    catalogo["Gravidade"].nota = 9.8
+    assert [m.titulo for _, m in motor.mais_bem_avaliadas(limite=2, nota_minima=8.0)] == ["Gravidade", "Interestelar"]
+
+def test_sugestoes_pelos_generos_do_historico(catalogo):
+    """Sugere títulos não assistidos do gênero mais frequente no histórico primeiro."""
+    data = datetime(2024, 1, 1)
+    motor = MotorRecomendacoes(catalogo, [HistoricoItem(catalogo["Interestelar"], data),
+                                          HistoricoItem(catalogo["Gravidade"], data)])
+    motor.adicionar(HistoricoItem(catalogo["Parasita"], data))
+
+    assert motor.generos_favoritos() == [("Sci-Fi", 2), ("Suspense", 1)]
+    assert [m.titulo for _, m in motor.sugestoes_por_genero()] == ["Arrival", "Duna", "Corra!"]
+    assert [m.titulo for _, m in motor.sugestoes_por_genero(limite=1)] == ["Arrival"]
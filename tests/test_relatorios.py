@@ -0,0 +1,57 @@
+
+import pytest
+from ..src.modelos import Filme, HistoricoItem
+from ..src.relatorios import MotorRelatorios
+from datetime import datetime, date
+
+# --- Fixture de Dados Comuns ---
+
+def criar_item(titulo, genero, duracao, data_conclusao):
+    """Cria um HistoricoItem de um Filme assistido."""
+    filme = Filme(titulo, genero, 2020, "L", [], duracao, "ASSISTIDO", None)
+    return HistoricoItem(filme, data_conclusao)
+
+@pytest.fixture
+def motor():
+    """Retorna um motor com itens inseridos fora de ordem cronológica."""
+    return MotorRelatorios([
+        criar_item("A", "Drama", 100, datetime(2026, 1, 5, 20, 0)),
+        criar_item("B", "Sci-Fi", 120, datetime(2026, 2, 1, 21, 0)),
+        criar_item("C", "Drama", 60, datetime(2026, 1, 1, 10, 0)),   # Fora de ordem
+        criar_item("D", "Sci-Fi", 90, datetime(2026, 1, 6, 22, 30)),
+    ])
+
+# ==============================================================================
+# TESTES DO MOTOR DE RELATÓRIOS
+# ==============================================================================
+
+def test_tempo_assistido_em_intervalo_semiaberto(motor):
+    """O intervalo é [inicio, fim): a data final não é incluída."""
+    assert motor.tempo_assistido(date(2026, 1, 1), date(2026, 2, 1)) == (250, round(250 / 60, 2))
+    assert motor.tempo_assistido(date(2026, 1, 1), date(2026, 2, 2))[0] == 370
+    assert motor.tempo_assistido(date(2025, 1, 1), date(2025, 12, 31))[0] == 0
+
+def test_quebra_por_dia_semana_e_mes(motor):
+    """As quebras cobrem o período inteiro, inclusive períodos sem consumo."""
+    por_dia = motor.por_dia(date(2026, 1, 5), date(2026, 1, 8))
+    assert por_dia == [(date(2026, 1, 5), 100), (date(2026, 1, 6), 90), (date(2026, 1, 7), 0)]
+
+    # 05/01/2026 é segunda-feira: semanas começam na segunda
+    por_semana = motor.por_semana(date(2026, 1, 1), date(2026, 1, 12))
+    assert por_semana == [(date(2025, 12, 29), 60), (date(2026, 1, 5), 190)]
+
+    por_mes = motor.por_mes(date(2026, 1, 1), date(2026, 3, 1))
+    assert por_mes == [(date(2026, 1, 1), 250), (date(2026, 2, 1), 120)]
+
+    with pytest.raises(ValueError, match="Granularidade"):
+        motor.por_periodo(date(2026, 1, 1), date(2026, 2, 1), "ano")
+
+def test_quebra_por_genero_ordenada(motor):
+    """Gêneros vêm do mais assistido para o menos assistido."""
+    assert motor.por_genero(date(2026, 1, 1), date(2026, 3, 1)) == [("Sci-Fi", 210), ("Drama", 160)]
+
+def test_adicionar_mantem_indice_atualizado(motor):
+    """Itens registrados depois da criação do motor entram nas consultas."""
+    motor.adicionar(criar_item("E", "Drama", 30, datetime(2026, 1, 6, 8, 0)))
+    assert motor.por_dia(date(2026, 1, 6), date(2026, 1, 7)) == [(date(2026, 1, 6), 120)]
+    assert len(motor) == 5
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import pytest
+from ..src.modelos import Filme
+from ..src.catalogo import Catalogo
+from ..src import servico as modulo_servico
+from ..src.servico import ServicoCatalogo, _resposta
+
+# --- Fixture de Dados Comuns ---
+
+@pytest.fixture
+def servico():
+    """Retorna um serviço com um catálogo em memória (sem carregar do banco)."""
+    filmes = [Filme("Interestelar", "Sci-Fi", 2014, "10+", [], 169, "ASSISTIDO", 9.5),
+              Filme("Duna", "Sci-Fi", 2021, "14+", [], 155, "NÃO ASSISTIDO", None)]
+    for midia_id, filme in enumerate(filmes, 1):
+        filme.id = midia_id
+    servico = ServicoCatalogo(threads=1)
+    servico.catalogo = Catalogo(filmes)
+    servico._por_id = {filme.id: filme for filme in filmes}
+    servico._trava = asyncio.Lock()
+    yield servico
+    servico._executor.shutdown()
+
+# ==============================================================================
+# TESTES DO MODO SERVIÇO (ROTAS HTTP/JSON)
+# ==============================================================================
+
+def test_consultas_respondem_da_memoria(servico):
+    """Filtros e detalhes usam o catálogo em memória e devolvem JSON serializável."""
+    status, midias = asyncio.run(servico.tratar("GET", "/midias?genero=sci-fi&status=NÃO ASSISTIDO", b""))
+    assert status == 200 and [m["titulo"] for m in midias] == ["Duna"]
+
+    status, detalhes = asyncio.run(servico.tratar("GET", "/midias/1", b""))
+    assert status == 200 and detalhes["duracao"] == 169 and detalhes["nota"] == 9.5
+    json.dumps(detalhes)
+
+def test_erros_viram_respostas_json(servico):
+    """Rotas, métodos e mídias inexistentes e corpos inválidos não derrubam o servidor."""
+    assert asyncio.run(servico.tratar("GET", "/nada", b""))[0] == 404
+    assert asyncio.run(servico.tratar("PUT", "/listas", b""))[0] == 405
+    assert asyncio.run(servico.tratar("GET", "/midias/99", b""))[0] == 404
+    assert asyncio.run(servico.tratar("GET", "/relatorios/generos?inicio=2024-01-01", b""))[0] == 400
+
+    resposta = _resposta(404, {"erro": "Não encontrada"}, manter=False)
+    assert resposta.startswith(b"HTTP/1.1 404 Not Found\r\n") and b"Connection: close" in resposta
+
+class EscritorFalso:
+    """Substitui o StreamWriter: guarda o que o servidor escreveu."""
+    def __init__(self):
+        self.enviado = b""
+    def write(self, dados):
+        self.enviado += dados
+    async def drain(self):
+        pass
+    def close(self):
+        pass
+
+def post_status(servico, midia_id, corpo):
+    return asyncio.run(servico.tratar("POST", f"/midias/{midia_id}/status", json.dumps(corpo).encode()))
+
+def test_atualizar_status_valida_antes_e_desfaz_se_a_gravacao_falhar(servico, monkeypatch):
+    """Corpo inválido não altera a mídia; nota em texto é convertida; falha ao gravar devolve 500 e desfaz."""
+    gravacoes = []
+    monkeypatch.setattr(modulo_servico, "salvar_midia", lambda midia: gravacoes.append(midia.titulo) or True)
+    duna = servico._por_id[2]
+
+    assert post_status(servico, 2, {"status": "ASSISTINDO", "nota": "abc"})[0] == 400
+    assert post_status(servico, 2, {"status": "PAUSADO", "nota": 7})[0] == 400
+    assert post_status(servico, 2, {"status": "ASSISTINDO", "nota": 11})[0] == 400
+    assert duna.status == "NÃO ASSISTIDO" and duna.nota is None and gravacoes == []
+
+    status, resumo = post_status(servico, 2, {"status": "assistindo", "nota": "8.5"})
+    assert status == 200 and resumo["status"] == "ASSISTINDO" and resumo["nota"] == 8.5 and gravacoes == ["Duna"]
+
+    monkeypatch.setattr(modulo_servico, "salvar_midia", lambda midia: False)
+    assert post_status(servico, 2, {"status": "NÃO ASSISTIDO", "nota": None})[0] == 500
+    assert duna.status == "ASSISTINDO" and duna.nota == 8.5
+
+def test_content_length_invalido_responde_400(servico):
+    """Um Content-Length que não é um inteiro não negativo recebe 400 em vez de fechar a conexão calado."""
+    async def enviar(requisicao):
+        leitor = asyncio.StreamReader()
+        leitor.feed_data(requisicao)
+        leitor.feed_eof()
+        escritor = EscritorFalso()
+        await servico.atender(leitor, escritor)
+        return escritor.enviado
+
+    for tamanho in (b"abc", b"-5"):
+        enviado = asyncio.run(enviar(b"POST /midias/2/status HTTP/1.1\r\nContent-Length: " + tamanho + b"\r\n\r\n"))
+        assert enviado.startswith(b"HTTP/1.1 400 Bad Request\r\n") and b"Content-Length inv" in enviado
@@ -0,0 +1,34 @@
+from ..src.snapshot import caminho_snapshot, ler_snapshot, gravar_snapshot
+
+# ==============================================================================
+# TESTES DO SNAPSHOT DO CATÁLOGO
+# ==============================================================================
+
+IMAGEM = {"midias": [(1, "Duna", "FILME", "Sci-Fi", 2021, "14+", 155, "ASSISTIDO", "", 9.0)],
+          "historico": [(1, 1, "2024-01-02 20:00:00", 155)], "listas": [("Favoritos", 1)]}
+
+def test_snapshot_so_vale_para_o_mesmo_estado_do_banco(tmp_path):
+    """O conteúdo volta igual apenas com o mesmo esquema, usuário, banco e contador de alterações."""
+    caminho = caminho_snapshot(str(tmp_path / "catalogo.db"), 1)
+    assert ler_snapshot(caminho, 11, 1, "abc", 7) is None
+    assert gravar_snapshot(caminho, 11, 1, "abc", 7, IMAGEM)
+
+    lido = ler_snapshot(caminho, 11, 1, "abc", 7)
+    assert lido["midias"] == IMAGEM["midias"] and lido["listas"] == IMAGEM["listas"]
+    assert ler_snapshot(caminho, 11, 1, "abc", 8) is None   #Banco alterado depois do snapshot
+    assert ler_snapshot(caminho, 11, 2, "abc", 7) is None   #Outro usuário
+    assert ler_snapshot(caminho, 11, 1, "xyz", 7) is None   #Outro arquivo de banco
+    assert ler_snapshot(caminho, 12, 1, "abc", 7) is None   #Esquema migrado
+
+def test_snapshot_corrompido_ou_truncado_e_ignorado(tmp_path):
+    """Um arquivo danificado não levanta erro: a carga volta para o SQLite."""
+    caminho = caminho_snapshot(str(tmp_path / "catalogo.db"), 1)
+    gravar_snapshot(caminho, 11, 1, "abc", 7, IMAGEM)
+    conteudo = bytearray(open(caminho, "rb").read())
+
+    conteudo[-5] ^= 0xFF
+    open(caminho, "wb").write(conteudo)
+    assert ler_snapshot(caminho, 11, 1, "abc", 7) is None
+
+    open(caminho, "wb").write(conteudo[:10])
+    assert ler_snapshot(caminho, 11, 1, "abc", 7) is None